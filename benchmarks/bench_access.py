@@ -0,0 +1,35 @@
+"""Benchmark nested attribute access on `Config`.
+
+Reports the per-access cost of `config.a.a...a` chains of increasing depth,
+repeated an increasing number of times against the same config object.
+
+    python benchmarks/bench_access.py
+"""
+import timeit
+
+from configly import Config
+
+DEPTHS = (1, 2, 4, 8, 16)
+NUMBERS = (1_000, 10_000, 100_000)
+
+
+def nested(depth):
+    value = {"leaf": 1}
+    for _ in range(depth):
+        value = {"a": value}
+    return value
+
+
+def main():
+    print("{:>6} {:>8} {:>12}".format("depth", "calls", "per call"))
+    for depth in DEPTHS:
+        config = Config(nested(depth))
+        statement = "config" + ".a" * depth + ".leaf"
+        for number in NUMBERS:
+            timer = timeit.Timer(statement, globals={"config": config})
+            elapsed = min(timer.repeat(repeat=5, number=number))
+            print("{:>6} {:>8} {:>10.3f}us".format(depth, number, elapsed * 1e6 / number))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark the time taken to import configly, with `python -X importtime`.
+
+Each import is run in a fresh interpreter. Reports the best total time of importing
+`configly` and `configly.Config` (excluding interpreter startup), along with the
+slowest modules each pulls in.
+
+    python benchmarks/bench_import.py
+"""
+
+import os
+import subprocess  # nosec
+import sys
+
+REPEAT = 5
+SLOWEST = 8
+
+STATEMENTS = [
+    "import configly",
+    "from configly import Config",
+]
+
+
+def importtime(statement):
+    """Return `{module: (self_us, cumulative_us)}` for the modules imported by `statement`."""
+    # Modules imported during interpreter startup (site, encodings, ...) are excluded.
+    baseline = _run("pass")
+    result = _run(statement)
+    return {module: times for module, times in result.items() if module not in baseline}
+
+
+def _run(statement):
+    output = subprocess.run(  # nosec
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=dict(os.environ, PYTHONPATH=_source_path()),
+        stderr=subprocess.PIPE,
+        check=True,
+        universal_newlines=True,
+    ).stderr
+
+    result = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, module = line.replace(":", "|", 1).split("|")
+        result[module.strip()] = (int(self_us), int(cumulative_us))
+    return result
+
+
+def _source_path():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(root, "src")
+
+
+def main():
+    for statement in STATEMENTS:
+        runs = [importtime(statement) for _ in range(REPEAT)]
+        best = min(runs, key=lambda run: sum(self_us for self_us, _ in run.values()))
+        total = sum(self_us for self_us, _ in best.values())
+
+        print("{}: {:.1f}ms, {} modules".format(statement, total / 1000, len(best)))
+        slowest = sorted(best.items(), key=lambda item: item[1][1], reverse=True)[:SLOWEST]
+        for module, (_, cumulative_us) in slowest:
+            print("    {:<40} {:>8.1f}ms".format(module, cumulative_us / 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Benchmark string-leaf interpolation in `post_process`.
+
+Covers long strings containing a single interpolation block, and leaves containing
+an increasing number of interpolation blocks.
+
+    python benchmarks/bench_interpolation.py
+"""
+import os
+import timeit
+
+from configly.loaders import YamlLoader
+from configly.process import post_process
+
+LENGTHS = (100, 1_000, 10_000, 100_000)
+COUNTS = (1, 10, 50, 200)
+
+
+def bench(loader, value, number):
+    timer = timeit.Timer(lambda: post_process(loader, value))
+    return min(timer.repeat(repeat=5, number=number)) * 1e6 / number
+
+
+def main():
+    os.environ.setdefault("CONFIGLY_BENCH", "value")
+    loader = YamlLoader()
+
+    print("long strings")
+    print("{:>8} {:>12}".format("length", "per leaf"))
+    for length in LENGTHS:
+        half = "x" * (length // 2)
+        value = half + "<% ENV[CONFIGLY_BENCH] %>" + half
+        print("{:>8} {:>10.1f}us".format(length, bench(loader, value, 200)))
+
+    print()
+    print("many interpolations")
+    print("{:>8} {:>12}".format("blocks", "per leaf"))
+    for count in COUNTS:
+        value = "/".join(["a<% ENV[CONFIGLY_BENCH] %>"] * count)
+        print("{:>8} {:>10.1f}us".format(count, bench(loader, value, 200)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark cold and warm starts of `Config.from_yaml` with a `ParseCache`.
+
+Generates a ~1MB yaml file, then times loading it without a cache, with an empty
+cache (cold), and with a populated one (warm).
+
+    python benchmarks/bench_parse_cache.py
+"""
+
+import os
+import shutil
+import tempfile
+import time
+
+from configly import Config
+from configly.cache import ParseCache
+
+SECTIONS = 400
+KEYS = 100
+
+
+def generate(path):
+    with open(path, "w") as f:
+        for section in range(SECTIONS):
+            f.write("section_{}:\n".format(section))
+            for key in range(KEYS):
+                f.write("  key_{}: value {} of section {}\n".format(key, key, section))
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, "config.yml")
+        generate(path)
+        # Outside of the window in which the cache doesn't trust mtimes.
+        os.utime(path, ns=(0, 0))
+        cache_dir = os.path.join(directory, "cache")
+
+        print("file size: {:.1f}MB".format(os.path.getsize(path) / 1e6))
+        print("no cache:  {:>8.1f}ms".format(timed(lambda: Config.from_yaml(path), repeat=3)))
+
+        def cold():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            Config.from_yaml(path, parse_cache=ParseCache(cache_dir))
+
+        print("cold:      {:>8.1f}ms".format(timed(cold, repeat=3)))
+
+        cache = ParseCache(cache_dir)
+        print(
+            "warm:      {:>8.1f}ms".format(timed(lambda: Config.from_yaml(path, parse_cache=cache)))
+        )
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark handing out a config's values, with `to_dict` and `snapshot`.
+
+Compares `copy.deepcopy` (as `to_dict` used to do), `to_dict`, and `snapshot`, on
+configs of increasing size. Reports the latency and memory allocated per call.
+
+    python benchmarks/bench_to_dict.py
+"""
+
+import copy
+import timeit
+import tracemalloc
+
+from configly import Config
+
+SIZES = (10, 100, 1_000)
+
+
+def config(size):
+    return Config(
+        {
+            "section_{}".format(i): {
+                "host": "host-{}".format(i),
+                "port": 5000 + i,
+                "tags": ["a", "b", "c"],
+                "options": {"timeout": 1.5, "retries": 3, "enabled": True},
+            }
+            for i in range(size)
+        }
+    )
+
+
+def latency(fn, number):
+    return min(timeit.Timer(fn).repeat(repeat=5, number=number)) * 1e6 / number
+
+
+def allocated(fn):
+    fn()
+    tracemalloc.start()
+    result = fn()  # noqa: F841
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / 1e3
+
+
+def main():
+    print("{:>8} {:>10} {:>12} {:>12}".format("sections", "method", "per call", "allocated"))
+    for size in SIZES:
+        value = config(size)
+        methods = [
+            ("deepcopy", lambda: copy.deepcopy(value._value)),
+            ("to_dict", value.to_dict),
+            ("snapshot", value.snapshot),
+        ]
+        number = max(1, 10_000 // size)
+        for name, fn in methods:
+            print(
+                "{:>8} {:>10} {:>10.1f}us {:>10.1f}KB".format(
+                    size, name, latency(fn, number), allocated(fn)
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
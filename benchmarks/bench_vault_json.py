@@ -0,0 +1,78 @@
+"""Benchmark interpolating large json payloads, as returned by `VAULT[...]`.
+
+Vault secrets are interpolated as their json encoded `data`. Compares decoding such
+payloads by quoting (validating) them, then loading them again (as `post_process`
+used to), against the single decode now done by `post_process`.
+
+    python benchmarks/bench_vault_json.py
+"""
+
+import json
+import timeit
+
+from configly.loaders import JsonLoader, YamlLoader
+from configly.process import post_process
+from configly.registry import Registry
+from configly.utilities import quote_string
+
+SIZES = (10, 100, 1_000, 10_000)
+
+
+class StubVaultInterpolator:
+    """Return secrets encoded as `VaultInterpolator` does, without a vault server."""
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def __getitem__(self, name):
+        return self.payload
+
+    def get(self, name, default=None):
+        return self.payload
+
+
+def payload(size):
+    data = {
+        "key_{}".format(i): {"user": "user_{}".format(i), "password": "x" * 32, "port": i}
+        for i in range(size)
+    }
+    return json.dumps(data)
+
+
+def bench(fn, number):
+    return min(timeit.Timer(fn).repeat(repeat=3, number=number)) * 1e3 / number
+
+
+def main():
+    print(
+        "{:>8} {:>10} {:>8} {:>12} {:>12}".format(
+            "keys", "bytes", "loader", "two-pass", "post_process"
+        )
+    )
+    for size in SIZES:
+        value = payload(size)
+        registry = Registry()
+        registry.register_interpolator("VAULT", StubVaultInterpolator(value))
+        number = max(1, 2_000 // size)
+
+        for loader in (JsonLoader(), YamlLoader()):
+
+            def two_pass():
+                return loader.load_value(quote_string(value))
+
+            def single_pass():
+                return post_process(loader, "<% VAULT[app] %>", registry=registry)
+
+            print(
+                "{:>8} {:>10} {:>8} {:>10.2f}ms {:>10.2f}ms".format(
+                    size,
+                    len(value),
+                    type(loader).__name__[:-6].lower(),
+                    bench(two_pass, number),
+                    bench(single_pass, number),
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
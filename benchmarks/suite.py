@@ -0,0 +1,664 @@
+"""Benchmark suite, covering loading, interpolation, access, `to_dict` and `refresh`.
+
+Generates synthetic configs along several axes (the number of top-level sections, their
+depth, the length of their lists, the fraction of values which are interpolated, and
+the interpolators used), varying one axis at a time from a baseline. For each config,
+times:
+
+- `Config.from_json`, `Config.from_yaml` and `Config.from_toml` (with interpolation)
+- `post_process` of the already parsed config
+- a chain of `__getitem__` down to the config's most deeply nested value
+- `to_dict` and `refresh`
+
+and records the memory allocated by (and retained after) loading the config.
+
+Named scenarios (see `SCENARIOS`) benchmark specific features on configs of their own:
+
+- `post_process`: a large routing table which is mostly free of interpolation, and a
+  deeply nested value
+- `mmap`: reading a single section of large json and yaml configs, with and without
+  `mmap=True`
+- `layers`: reloading a layered config after one of its layers changed, against reloading
+  a single file which every layer was merged into
+- `shared`: starting a worker by attaching to a published config, against loading it
+- `typed`: attribute access on (and the building of) typed configs, against `Config`
+
+Interpolated values are read through `ENV`, `FILE`, `DOCKER_SECRET` and `VAULT`, the
+latter against a local stub of Vault's http api (if `hvac` is installed). Results are
+written as json, and can be compared against those of a previous run, to flag
+regressions:
+
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --compare results.json --threshold 0.2
+    python benchmarks/suite.py --quick --case size
+    python benchmarks/suite.py --scenario post_process
+"""
+
+import argparse
+import dataclasses
+import datetime
+import gc
+import http.server
+import itertools
+import json
+import os
+import platform
+import shutil
+import subprocess  # nosec
+import sys
+import tempfile
+import threading
+import timeit
+import tracemalloc
+
+from configly import Config
+from configly.interpolators import (
+    DockerSecretInterpolator,
+    EnvVarInterpolator,
+    FileInterpolator,
+)
+from configly.loaders import JsonLoader
+from configly.process import post_process
+from configly.registry import Registry
+
+INTERPOLATORS = ("ENV", "FILE", "DOCKER_SECRET", "VAULT")
+
+# The number of distinct variables each interpolator reads, so that values are also
+# looked up more than once (as in real configs).
+VARIABLES = 50
+
+BASELINE = {
+    "size": 100,
+    "depth": 3,
+    "list_length": 5,
+    "density": 0.1,
+    "interpolators": ("ENV",),
+}
+
+AXES = {
+    "size": [10, 100, 1_000],
+    "depth": [1, 3, 8],
+    "list_length": [0, 5, 50],
+    "density": [0.0, 0.1, 0.5],
+    "interpolators": [(name,) for name in INTERPOLATORS] + [INTERPOLATORS],
+}
+
+FORMATS = {
+    "json": ("from_json", ".json"),
+    "yaml": ("from_yaml", ".yml"),
+    "toml": ("from_toml", ".toml"),
+}
+
+
+def cases(axes):
+    """Yield the parameters of each config, varying one axis at a time."""
+    seen = set()
+    for axis in axes:
+        for value in AXES[axis]:
+            params = dict(BASELINE, **{axis: value})
+            key = tuple(sorted(params.items()))
+            if key not in seen:
+                seen.add(key)
+                yield params
+
+
+def case_name(params):
+    return "size={size},depth={depth},lists={list_length},density={density},{mix}".format(
+        mix="+".join(params["interpolators"]), **params
+    )
+
+
+class Generator:
+    """Generate a config, whose interpolated values cycle through `interpolators`."""
+
+    def __init__(self, params, sources):
+        self.params = params
+        self.sources = sources
+        self.leaves = 0
+        self.interpolated = 0
+
+    def generate(self):
+        return {
+            "section_{}".format(i): self.section(i, self.params["depth"])
+            for i in range(self.params["size"])
+        }
+
+    def section(self, index, depth):
+        value = {
+            "name": self.leaf("name-{}".format(index)),
+            "port": self.leaf(5000 + index),
+            "ratio": self.leaf(0.5),
+            "enabled": self.leaf(True),
+            "tags": [self.leaf("tag-{}".format(i)) for i in range(self.params["list_length"])],
+        }
+        if depth > 1:
+            value["child"] = self.section(index, depth - 1)
+        return value
+
+    def leaf(self, value):
+        """Return `value`, or an interpolation in its place, at the configured density."""
+        density = self.params["density"]
+        self.leaves += 1
+        if int(self.leaves * density) == int((self.leaves - 1) * density):
+            return value
+
+        interpolators = self.params["interpolators"]
+        name = interpolators[self.interpolated % len(interpolators)]
+        variable = self.interpolated % VARIABLES
+        self.interpolated += 1
+        return "<% {}[{}] %>".format(name, self.sources.variable(name, variable))
+
+
+class Sources:
+    """The environment variables, files and Vault server interpolated values are read from.
+
+    Files are read relative to `directory`, which becomes the working directory.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.vault = None
+        self.cwd = os.getcwd()
+
+    def variable(self, interpolator, index):
+        if interpolator in ("ENV", "DOCKER_SECRET"):
+            return "CONFIGLY_BENCH_{}".format(index)
+        if interpolator == "FILE":
+            return "secret_{}.txt".format(index)
+        return "secret_{}".format(index)
+
+    def setup(self):
+        os.chdir(self.directory)
+        for index in range(VARIABLES):
+            path = self.variable("FILE", index)
+            with open(path, "w") as f:
+                f.write("file-value-{}".format(index))
+
+            name = self.variable("ENV", index)
+            os.environ[name] = str(index)
+            os.environ[name + "_FILE"] = path
+
+    def registry(self, interpolators):
+        registry = Registry()
+        registry.register_interpolator("ENV", EnvVarInterpolator)
+        registry.register_interpolator("FILE", FileInterpolator)
+        registry.register_interpolator("DOCKER_SECRET", DockerSecretInterpolator)
+        if "VAULT" in interpolators:
+            registry.register_interpolator("VAULT", self.vault_interpolator())
+        return registry
+
+    def vault_interpolator(self):
+        from configly.interpolators.vault import VaultInterpolator
+
+        if self.vault is None:
+            self.vault = VaultStub()
+        return VaultInterpolator(url=self.vault.url, token="bench")
+
+    def close(self):
+        os.chdir(self.cwd)
+        if self.vault is not None:
+            self.vault.close()
+
+
+class VaultStub:
+    """A local http server, serving every kv v1 secret as Vault would."""
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        # Headers and body are written separately, which Nagle's algorithm would delay.
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            name = self.path.split("?")[0].rsplit("/", 1)[-1]
+            body = json.dumps({"data": {"value": name}, "lease_duration": 0}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    def __init__(self):
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), self.Handler)
+        self.server.daemon_threads = True
+        self.url = "http://127.0.0.1:{}".format(self.server.server_address[1])
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def dump_json(value):
+    return json.dumps(value, indent=2)
+
+
+def dump_yaml(value, indent=""):
+    lines = []
+    for key, item in value.items():
+        if isinstance(item, dict):
+            lines.append("{}{}:".format(indent, key))
+            lines.append(dump_yaml(item, indent + "  "))
+        elif isinstance(item, list):
+            if not item:
+                lines.append("{}{}: []".format(indent, key))
+                continue
+            lines.append("{}{}:".format(indent, key))
+            lines.extend("{}  - {}".format(indent, json.dumps(i)) for i in item)
+        else:
+            lines.append("{}{}: {}".format(indent, key, json.dumps(item)))
+    return "\n".join(lines)
+
+
+def dump_toml(value):
+    def inline(item):
+        if isinstance(item, dict):
+            return "{{{}}}".format(
+                ", ".join("{} = {}".format(k, inline(v)) for k, v in item.items())
+            )
+        if isinstance(item, list):
+            return "[{}]".format(", ".join(inline(i) for i in item))
+        if isinstance(item, bool):
+            return "true" if item else "false"
+        return json.dumps(item)
+
+    return "\n".join("{} = {}".format(key, inline(item)) for key, item in value.items())
+
+
+DUMPS = {"json": dump_json, "yaml": dump_yaml, "toml": dump_toml}
+
+
+def seconds(fn, repeat):
+    """Return the best time of a single call to `fn`, calibrating the number of calls."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def memory(fn):
+    """Return the bytes allocated at peak while calling `fn`, and retained by its result."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn()  # noqa: F841
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, retained
+
+
+def recorder(results):
+    """Return a function which records (and prints) the measurements of a benchmark."""
+
+    def record(name, benchmark, params, **measurements):
+        results.append(dict(case=name, benchmark=benchmark, params=params, **measurements))
+        print("{:<70} {:<14} {}".format(name, benchmark, format_measurements(measurements)))
+
+    return record
+
+
+def bench_case(params, sources, directory, formats, repeat):
+    generator = Generator(params, sources)
+    value = generator.generate()
+    registry = sources.registry(params["interpolators"])
+    name = case_name(params)
+
+    results = []
+    base_record = recorder(results)
+
+    def record(benchmark, **measurements):
+        base_record(name, benchmark, params, **measurements)
+
+    paths = {}
+    for fmt in formats:
+        method, extension = FORMATS[fmt]
+        path = paths[fmt] = os.path.join(directory, "config" + extension)
+        with open(path, "w") as f:
+            f.write(DUMPS[fmt](value))
+
+        load = getattr(Config, method)
+        try:
+            load(path, registry=registry)
+        except ImportError as e:
+            print("{:<70} {:<14} skipped: {}".format(name, "load_" + fmt, e))
+            continue
+        record("load_" + fmt, seconds=seconds(lambda: load(path, registry=registry), repeat))
+
+    loader = JsonLoader()
+    record(
+        "post_process",
+        seconds=seconds(lambda: post_process(loader, value, registry=registry), repeat),
+    )
+
+    config = Config(post_process(loader, value, registry=registry))
+    keys = ["section_0"] + ["child"] * (params["depth"] - 1) + ["name"]
+
+    def access():
+        item = config
+        for key in keys:
+            item = item[key]
+        return item
+
+    record("access", seconds=seconds(access, repeat))
+    record("to_dict", seconds=seconds(config.to_dict, repeat))
+
+    config = Config.from_json(content=json.dumps(value), registry=registry)
+    record("refresh", seconds=seconds(config.refresh, repeat))
+
+    json_path = paths.get("json") or os.path.join(directory, "config.json")
+    if "json" not in paths:
+        with open(json_path, "w") as f:
+            f.write(dump_json(value))
+    peak, retained = memory(lambda: Config.from_json(json_path, registry=registry))
+    record("memory", peak_bytes=peak, retained_bytes=retained)
+    return results
+
+
+def routing_table(size):
+    routes = [
+        {"path": "/route/{}".format(i), "upstream": "svc-{}".format(i % 50), "weight": i % 7}
+        for i in range(size)
+    ]
+    return {"routes": routes, "default": {"upstream": "<% ENV[DEFAULT_UPSTREAM, fallback] %>"}}
+
+
+def nested(depth, leaf):
+    value = leaf
+    for _ in range(depth):
+        value = {"a": value}
+    return value
+
+
+def scenario_post_process(record, directory, repeat):
+    loader = JsonLoader()
+    values = [({"routes": size}, routing_table(size)) for size in (1_000, 10_000, 100_000)]
+    values.append(({"depth": 500}, nested(500, {"b": "<% ENV[DEFAULT_UPSTREAM, fallback] %>"})))
+
+    for params, value in values:
+        name = "post_process," + ",".join("{}={}".format(*item) for item in params.items())
+        record(
+            name,
+            "post_process",
+            params,
+            seconds=seconds(lambda: post_process(loader, value), repeat),
+        )
+        peak, retained = memory(lambda: post_process(loader, value))
+        record(name, "memory", params, peak_bytes=peak, retained_bytes=retained)
+
+
+def scenario_mmap(record, directory, repeat):
+    # Fewer routes for yaml, which is far slower to parse.
+    for fmt, routes in (("json", 2_000), ("yaml", 100)):
+        value = {
+            "section_{}".format(section): dict(
+                routing_table(routes), default="<% ENV[DEFAULT_UPSTREAM, fallback] %>"
+            )
+            for section in range(200)
+        }
+        method, extension = FORMATS[fmt]
+        path = os.path.join(directory, "mmap" + extension)
+        with open(path, "w") as f:
+            f.write(DUMPS[fmt](value))
+        load = getattr(Config, method)
+
+        for mmap in (False, True):
+            params = {"format": fmt, "mmap": mmap, "bytes": os.path.getsize(path)}
+            name = "mmap,format={},mmap={}".format(fmt, mmap)
+            try:
+                load(path, mmap=mmap)
+            except ImportError as e:
+                print("{:<70} {:<14} skipped: {}".format(name, "section", e))
+                continue
+
+            def section():
+                return load(path, mmap=mmap).section_7.default
+
+            record(name, "section", params, seconds=seconds(section, repeat))
+            peak, retained = memory(section)
+            record(name, "memory", params, peak_bytes=peak, retained_bytes=retained)
+
+
+def scenario_layers(record, directory, repeat):
+    base = os.path.join(directory, "base.json")
+    override = os.path.join(directory, "override.json")
+    merged = os.path.join(directory, "merged.json")
+
+    for size in (100, 1_000, 10_000):
+        value = {
+            "section_{}".format(i): {
+                "host": "host-{}".format(i),
+                "port": 5000 + i,
+                "tags": ["a", "b", "c"],
+                "options": {"timeout": 1.5, "retries": 3, "user": "<% ENV[USER, app] %>"},
+            }
+            for i in range(size)
+        }
+        write_file(base, json.dumps(value))
+        write_file(override, "{}")
+
+        # Alternate between two versions of the changed section, so every reload changes.
+        overrides = []
+        contents = []
+        for port in (1, 2):
+            overrides.append(json.dumps({"section_0": {"port": port}}))
+            value["section_0"]["port"] = port
+            contents.append(json.dumps(value))
+        write_file(merged, contents[1])
+
+        # A single file which every layer was merged into is re-parsed and re-interpolated
+        # in full, whereas a layered config only re-merges the keys of the changed layer.
+        single = Config.from_json(merged)
+        layered = Config.from_layers([base, override])
+        versions = itertools.cycle([0, 1])
+
+        def reload_single():
+            write_file(merged, contents[next(versions)])
+            single.reload()
+
+        def reload_layered():
+            write_file(override, overrides[next(versions)])
+            layered.reload()
+
+        for method, fn in (("single", reload_single), ("layered", reload_layered)):
+            params = {"sections": size, "method": method}
+            name = "layers,sections={},method={}".format(size, method)
+            record(name, "reload", params, seconds=seconds(fn, repeat))
+
+
+def scenario_shared(record, directory, repeat):
+    file = os.path.join(directory, "shared.yml")
+    path = os.path.join(directory, "shared.snapshot")
+
+    for size in (10, 100, 1_000):
+        write_file(
+            file,
+            "".join(
+                "section_{0}:\n"
+                "  host: host-{0}\n"
+                "  port: <% ENV[PORT_{0}, {0}] %>\n"
+                "  tags: [a, b, c]\n"
+                "  options: {{timeout: 1.5, retries: 3}}\n".format(i)
+                for i in range(size)
+            ),
+        )
+        Config.from_yaml(file).publish(path)
+        attached = Config.attach(path)
+
+        # A worker's startup by loading the config itself, against attaching to the values
+        # published by its parent, and an attached config's refresh when nothing changed.
+        methods = (
+            ("from_yaml", lambda: Config.from_yaml(file)),
+            ("attach", lambda: Config.attach(path)),
+            ("refresh", attached.refresh),
+        )
+        for method, fn in methods:
+            params = {"sections": size, "method": method}
+            name = "shared,sections={},method={}".format(size, method)
+            record(name, "startup", params, seconds=seconds(fn, repeat))
+
+
+def scenario_typed(record, directory, repeat):
+    for depth in (1, 4, 16):
+        schema = dataclasses.make_dataclass("Leaf", [("leaf", int)])
+        for _ in range(depth):
+            schema = dataclasses.make_dataclass("Node", [("a", schema)])
+
+        # `Config` itself, generated `__slots__` classes, and nested dataclasses.
+        kinds = (
+            ("config", lambda: Config(nested(depth, {"leaf": 1}))),
+            ("typed", lambda: Config(nested(depth, {"leaf": 1})).typed()),
+            ("schema", lambda: Config(nested(depth, {"leaf": 1})).typed(schema)),
+        )
+        for kind, build in kinds:
+            access = eval("lambda: config" + ".a" * depth + ".leaf", {"config": build()})  # nosec
+            params = {"depth": depth, "kind": kind}
+            name = "typed,depth={},kind={}".format(depth, kind)
+            record(name, "access", params, seconds=seconds(access, repeat))
+            record(name, "build", params, seconds=seconds(build, repeat))
+
+
+def write_file(path, content):
+    with open(path, "w") as f:
+        f.write(content)
+
+
+# Benchmarks of specific features, each on configs of their own.
+SCENARIOS = {
+    "post_process": scenario_post_process,
+    "mmap": scenario_mmap,
+    "layers": scenario_layers,
+    "shared": scenario_shared,
+    "typed": scenario_typed,
+}
+
+
+def format_measurements(measurements):
+    parts = []
+    for key, value in measurements.items():
+        if key == "seconds":
+            parts.append("{:>12.3f}us".format(value * 1e6))
+        else:
+            parts.append("{}={:,}".format(key, value))
+    return " ".join(parts)
+
+
+def revision():
+    """Return the git revision being benchmarked, if known."""
+    try:
+        output = subprocess.check_output(  # nosec
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode().strip()
+
+
+def compare(results, baseline, threshold):
+    """Print the change of each result against `baseline`. Returns the regressions."""
+    previous = {(r["case"], r["benchmark"]): r for r in baseline["results"]}
+    regressions = []
+    print()
+    print("{:<70} {:<14} {:>10}".format("case", "benchmark", "change"))
+    for result in results:
+        old = previous.get((result["case"], result["benchmark"]))
+        if old is None:
+            continue
+
+        metric = "seconds" if "seconds" in result else "peak_bytes"
+        if not old.get(metric):
+            continue
+        change = result[metric] / old[metric] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(result)
+        print("{:<70} {:<14} {:>+9.1%}{}".format(result["case"], result["benchmark"], change, flag))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="Write the results, as json, to this file.")
+    parser.add_argument("--compare", help="Compare against the results of a previous run.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="The relative slowdown (or growth in memory) reported as a regression.",
+    )
+    parser.add_argument("--case", action="append", choices=sorted(AXES), help="The axes to vary.")
+    parser.add_argument(
+        "--scenario", action="append", choices=sorted(SCENARIOS), help="The scenarios to run."
+    )
+    parser.add_argument(
+        "--format", action="append", choices=sorted(FORMATS), help="The formats to load."
+    )
+    parser.add_argument("--quick", action="store_true", help="Fewer repetitions, for a rough run.")
+    args = parser.parse_args(argv)
+
+    # Resolved before changing the working directory, see `Sources`.
+    for name in ("output", "compare"):
+        if getattr(args, name):
+            setattr(args, name, os.path.abspath(getattr(args, name)))
+
+    # Everything is run, unless given either axes or scenarios.
+    axes, scenarios = args.case or [], args.scenario or []
+    if not axes and not scenarios:
+        axes, scenarios = sorted(AXES), sorted(SCENARIOS)
+
+    directory = tempfile.mkdtemp()
+    sources = Sources(directory)
+    sources.setup()
+
+    results = []
+    repeat = 2 if args.quick else 5
+    try:
+        for params in cases(axes):
+            if "VAULT" in params["interpolators"]:
+                try:
+                    import hvac  # noqa: F401
+                except ImportError:
+                    print("{:<70} skipped: hvac is not installed".format(case_name(params)))
+                    continue
+
+            results.extend(
+                bench_case(params, sources, directory, args.format or list(FORMATS), repeat)
+            )
+
+        for scenario in scenarios:
+            SCENARIOS[scenario](recorder(results), directory, repeat)
+    finally:
+        sources.close()
+        shutil.rmtree(directory)
+
+    output = {
+        "metadata": {
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "revision": revision(),
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,17 @@
 # flake8: noqa
-from configly.config import Config
-from configly.interpolators import EnvVarInterpolator, FileInterpolator, Interpolator
-from configly.loaders import JsonLoader, TomlLoader, YamlLoader
+import importlib
+from typing import TYPE_CHECKING
+
+from configly.interpolators import Interpolator
+from configly.interpolators.env import EnvVarInterpolator
+from configly.interpolators.file import FileInterpolator
 from configly.registry import register_interpolator, Registry
 
+if TYPE_CHECKING:
+    # Seen by type checkers, in place of `__getattr__` below.
+    from configly.config import Config
+    from configly.loaders import JsonLoader, TomlLoader, YamlLoader
+
 register_interpolator("ENV", EnvVarInterpolator)
 register_interpolator("FILE", FileInterpolator)
 
@@ -19,3 +27,26 @@ __all__ = [
     "YamlLoader",
     "register_interpolator",
 ]
+
+# `Config` and the loaders are only imported once they're first used (PEP 562), so that
+# importing configly (for example, to register an interpolator) stays cheap.
+_LAZY_ATTRIBUTES = {
+    "Config": "configly.config",
+    "JsonLoader": "configly.loaders",
+    "TomlLoader": "configly.loaders",
+    "YamlLoader": "configly.loaders",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,301 @@
+import hashlib
+import io
+import os
+import pickle  # nosec
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """A bounded cache of values which expire, evicting the least recently used first.
+
+    Values are loaded through `get_or_load`, whose `load` callable returns both the
+    value and the number of seconds it should be cached for. A fixed `ttl` can instead
+    be given to the cache, which takes precedence. Values without a (positive) ttl are
+    not cached at all.
+
+    With `stale_while_revalidate`, an expired value continues to be returned for that
+    many seconds past its expiry, while it is reloaded in a background thread.
+
+    >>> cache = TTLCache(maxsize=2)
+    >>> cache.get_or_load("foo", lambda key: (key.upper(), 60))
+    'FOO'
+    >>> cache.get_or_load("foo", lambda key: ("unused", 60))
+    'FOO'
+    """
+
+    def __init__(self, maxsize=128, ttl=None, stale_while_revalidate=0, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.timer = timer
+
+        # key -> (value, expiry), ordered from least to most recently used.
+        self._entries = OrderedDict()
+        self._revalidating = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        entry = self._entries.get(key)
+        return entry is not None and self.timer() < entry[1]
+
+    def get_or_load(self, key, load):
+        now = self.timer()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expiry = entry
+                if now < expiry:
+                    self._entries.move_to_end(key)
+                    return value
+
+                if now < expiry + self.stale_while_revalidate:
+                    if key not in self._revalidating:
+                        self._revalidating.add(key)
+                        thread = threading.Thread(
+                            target=self._revalidate, args=(key, load), daemon=True
+                        )
+                        thread.start()
+                    return value
+
+        value, ttl = load(key)
+        self._store(key, value, ttl)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _revalidate(self, key, load):
+        try:
+            value, ttl = load(key)
+        except KeyError:
+            self.invalidate(key)
+        except Exception:
+            # Keep serving the stale value, until it falls outside of the stale window.
+            pass
+        else:
+            self._store(key, value, ttl)
+        finally:
+            with self._lock:
+                self._revalidating.discard(key)
+
+    def _store(self, key, value, ttl):
+        if self.ttl is not None:
+            ttl = self.ttl
+
+        with self._lock:
+            if not ttl or ttl <= 0:
+                self._entries.pop(key, None)
+                return
+
+            self._entries[key] = (value, self.timer() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class ParseCache:
+    """Persist parsed config files to `directory`, to skip parsing them on later loads.
+
+    Entries are keyed by the file's absolute path, the loader used to parse it, and the
+    python version. An entry is used as-is while the file's `os.stat` (mtime, size and
+    inode) is unchanged. Otherwise (or if the file was modified too recently for its
+    mtime to be trusted), the file is read and hashed, and only reparsed if its content
+    differs from that of the entry. Entries which can't be read are treated as missing,
+    and `clear` removes every entry.
+
+    Entries are pickled, so `directory` must only be writable by trusted users.
+
+    >>> import tempfile
+    >>> from configly import Config
+    >>> cache = ParseCache(tempfile.mkdtemp())
+    >>> config = Config.from_yaml("readthedocs.yml", parse_cache=cache)
+    """
+
+    version = 1
+
+    # mtimes within this window of an entry being written might not reflect later
+    # writes, on file systems with coarse timestamps.
+    racy_window_ns = 1_000_000_000
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    def load(self, loader, file):
+        """Return the parsed content of `file`, from the cache if it is current."""
+        path = os.path.abspath(file)
+        entry_path = self._entry_path(loader, path)
+        entry = self._read(entry_path)
+
+        stat = os.stat(path)
+        fingerprint = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if (
+            entry is not None
+            and entry["fingerprint"] == fingerprint
+            and stat.st_mtime_ns + self.racy_window_ns < entry["checked_ns"]
+        ):
+            return entry["value"]
+
+        with open(path, "rb") as f:
+            content = f.read()
+
+        digest = hashlib.sha256(content).hexdigest()
+        if entry is not None and entry["digest"] == digest:
+            value = entry["value"]
+        else:
+            value = loader.load(io.BytesIO(content))
+
+        self._write(
+            entry_path,
+            {
+                "fingerprint": fingerprint,
+                "checked_ns": time.time_ns(),
+                "digest": digest,
+                "value": value,
+            },
+        )
+        return value
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".pickle"):
+                os.remove(os.path.join(self.directory, name))
+
+    def _entry_path(self, loader, path):
+        loader_cls = type(loader)
+        key = "\0".join(
+            [
+                str(self.version),
+                "{}.{}".format(loader_cls.__module__, loader_cls.__qualname__),
+                "{}.{}".format(*sys.version_info[:2]),
+                path,
+            ]
+        )
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, name + ".pickle")
+
+    @staticmethod
+    def _read(entry_path):
+        try:
+            with open(entry_path, "rb") as f:
+                return pickle.load(f)  # nosec
+        except Exception:
+            return None
+
+    def _write(self, entry_path, entry):
+        # Written to a temporary file first, so concurrent readers never see a partial entry.
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, entry_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+
+class FileCache:
+    """A bounded cache of the (utf-8) text of files, only reread once they change.
+
+    Entries are keyed by the file's absolute path. As with `ParseCache`, an entry is
+    served without reading the file while its `os.stat` (mtime, size and inode) is
+    unchanged, unless it was modified too recently for its mtime to be trusted.
+
+    The least recently used entries are evicted once there are more than `maxsize` of
+    them, or once their total size exceeds `maxbytes`. Files larger than `maxbytes`
+    aren't cached at all.
+
+    >>> cache = FileCache()
+    >>> cache.read("readthedocs.yml").startswith("build:")
+    True
+    """
+
+    racy_window_ns = ParseCache.racy_window_ns
+
+    def __init__(self, maxsize=128, maxbytes=16 * 1024 * 1024):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+
+        # path -> (fingerprint, checked_ns, text, size), least to most recently used.
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        """The total size of the cached files, in bytes."""
+        return self._size
+
+    def read(self, path):
+        """Return the text of the file at `path`, from the cache if it is current."""
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.invalidate(path)
+            raise
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if (
+                entry is not None
+                and entry[0] == _fingerprint(stat)
+                and stat.st_mtime_ns + self.racy_window_ns < entry[1]
+            ):
+                self._entries.move_to_end(path)
+                return entry[2]
+
+        with open(path, "rb") as f:
+            checked_ns = time.time_ns()
+            fingerprint = _fingerprint(os.fstat(f.fileno()))
+            content = f.read()
+
+        text = content.decode("utf-8")
+        self._store(path, (fingerprint, checked_ns, text, len(content)))
+        return text
+
+    def invalidate(self, path):
+        with self._lock:
+            self._pop(os.path.abspath(path))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _store(self, path, entry):
+        size = entry[3]
+        with self._lock:
+            self._pop(path)
+            if size > self.maxbytes:
+                return
+
+            self._entries[path] = entry
+            self._size += size
+            while len(self._entries) > self.maxsize or self._size > self.maxbytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted[3]
+
+    def _pop(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._size -= entry[3]
+
+
+def _fingerprint(stat):
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
@@ -0,0 +1,58 @@
+import argparse
+import sys
+from time import perf_counter
+
+from configly.registry import registry
+
+
+def main(argv=None):
+    """Run the `configly` command line interface.
+
+    >>> main(["profile", "readthedocs.yml"])  # doctest: +ELLIPSIS
+    phase  name ...
+    read   readthedocs.yml ...
+    parse  YamlLoader ...
+    ...
+    total: ... ms
+    0
+    """
+    parser = argparse.ArgumentParser(prog="configly")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    profile_parser = commands.add_parser(
+        "profile", help="Load a config file, and print where the time loading it was spent."
+    )
+    profile_parser.add_argument("file", help="A json, toml or yaml config file.")
+    profile_parser.add_argument(
+        "--lazy", action="store_true", help="Load the config lazily, then access every value."
+    )
+    profile_parser.set_defaults(handler=profile)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.handler(args)
+    except (OSError, ValueError) as e:
+        parser.exit(1, "configly: error: {}\n".format(e))
+
+
+def profile(args):
+    from configly.config import Config
+    from configly.instrumentation import Collector
+    from configly.layers import loader_for
+
+    loader = loader_for(args.file)
+    with Collector(registry) as collector:
+        start = perf_counter()
+        config = Config.from_loader(loader, args.file, registry=registry, lazy=args.lazy)
+        config.to_dict()
+        total = perf_counter() - start
+
+    print(collector.report())
+    print()
+    print("total: {:.3f} ms".format(total * 1e3))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,15 @@
-import copy
+import io
+import threading
 from collections.abc import Mapping
-from typing import Optional
+from typing import Any, Optional, TYPE_CHECKING
 
-from configly.loaders import JsonLoader, Loader, TomlLoader, YamlLoader
-from configly.process import post_process
+from configly.loaders import JsonLoader, Loader, shared_loader, TomlLoader, YamlLoader
+from configly.process import interpolate, interpolated_leaves, post_process, Resolver
 from configly.registry import registry
+from configly.utilities import copy_tree, flatten, freeze
+
+if TYPE_CHECKING:
+    from configly.cache import ParseCache
 
 
 class Config:
@@ -15,9 +20,53 @@ class Config:
     1
     >>> config.b.c
     2
+
+    Nested values can also be looked up by their dotted path. The flattened
+    index backing these lookups is only built on the first dotted lookup.
+
+    >>> config["b.c"]
+    2
     """
 
-    def __init__(self, value=None, _src_input=None, _loader=None, _registry=registry):
+    __slots__ = (
+        "_value",
+        "_src_input",
+        "_loader",
+        "_registry",
+        "_resolver",
+        "_children",
+        "_index",
+        "_index_generation",
+        "_interpolated",
+        "_file",
+        "_layers",
+        "_shared",
+        "_generation",
+        "_lock",
+        "_snapshot",
+        "_typed",
+        "_subscriptions",
+        "_path",
+        "_origins",
+        "__weakref__",
+    )
+
+    def __init__(
+        self,
+        value=None,
+        _src_input=None,
+        _loader=None,
+        _registry=registry,
+        _resolver=None,
+        _file=None,
+        _layers=None,
+        _shared=None,
+        _generation=None,
+        _lock=None,
+        _subscriptions=None,
+        _path=(),
+        _origins=None,
+    ):
         if value is None:
             value = {}
         self._value = value
@@ -26,6 +75,54 @@ class Config:
         self._loader = _loader
         self._registry = _registry
 
+        # Lazy configs only hold the keys of `_src_input` interpolated so far in `_value`,
+        # and share a `_resolver` (until reloaded) to memoize looked up values.
+        # Nested mappings are filled in by their own child view.
+        self._resolver = _resolver
+
+        # Child views of nested mappings, built lazily by `__getitem__`.
+        self._children = {}
+
+        # Dotted path -> (keys, value) for every nested value, see `__getitem__`. Built at
+        # `_index_generation`, as refreshes of child views can change the values it holds.
+        self._index = None
+        self._index_generation = None
+
+        # (path, source value, template) for every interpolated value, see `refresh`.
+        self._interpolated = None
+
+        # The file a (top-level) config was loaded from, see `reload`.
+        self._file = _file
+
+        # The `Layer`s a layered config is merged from, see `from_layers`.
+        self._layers = _layers
+
+        # The `SharedSnapshot` a config is published to, or attached to, see `publish`.
+        self._shared = _shared
+
+        # Incremented (and shared with child views) whenever the config's values change,
+        # so that a cached snapshot can tell it's stale, see `snapshot`.
+        self._generation = [0] if _generation is None else _generation
+
+        # Held (and shared with child views) while the config's values are updated, so
+        # that refreshes and reloads from background threads don't interleave.
+        self._lock = threading.RLock() if _lock is None else _lock
+        self._snapshot = None
+
+        # Schema -> (generation, typed values), see `typed`.
+        self._typed = None
+
+        # (path, callback) for every subscription made on the config or any of its views
+        # (shared with child views, whose `_path` prefixes theirs), see `subscribe`.
+        self._subscriptions = [] if _subscriptions is None else _subscriptions
+
+        # The keys leading from the top-level config to this view.
+        self._path = _path
+
+        # The layers of the (layered) top-level config, shared with child views, by which
+        # interpolated values' loaders are chosen, see `_loader_at`.
+        self._origins = _layers if _origins is None else _origins
+
     @classmethod
     def from_loader(
         cls,
@@ -33,83 +130,863 @@ class Config:
         file: Optional[str] = None,
         content: Optional[str] = None,
         registry=registry,
+        lazy: bool = False,
+        watch: bool = False,
+        parse_cache: Optional["ParseCache"] = None,
+        mmap: bool = False,
     ):
-        result = {}
+        """Load a `file` (or `content`) with the given `loader`, into a config object.
+
+        By default every interpolated value is resolved up front. With `lazy=True`,
+        each value is instead interpolated the first time it is accessed, and then
+        memoized until the next `refresh`.
+
+        With `watch=True`, the config is reloaded in the background whenever `file`
+        changes, see `watch`.
+
+        With a `parse_cache`, the parsed content of `file` is reused from previous loads,
+        so long as the file hasn't changed. See `configly.cache.ParseCache`.
+
+        With `mmap=True` (which implies `lazy=True`), `file` is memory-mapped, and each
+        top-level section is only parsed when it's first accessed. See
+        `configly.sections.Sections`.
+        """
+        result: Any = {}
+
+        if mmap:
+            if not file or content or parse_cache is not None:
+                raise ValueError("Only a `file` can be memory-mapped, without a `parse_cache`.")
 
-        if file:
-            with open(file, "rb") as f:
-                result = loader.load(f)
+            from configly.sections import Sections
+
+            result = Sections(loader, file)
+            lazy = True
+        elif file:
+            if parse_cache is None:
+                with open(file, "rb") as f:
+                    stream: Any = f
+                    if registry.instrumented:
+                        # Read up front, so that reading and parsing are timed separately.
+                        with registry.timed("read", file):
+                            stream = io.BytesIO(f.read())
+                    with registry.timed("parse", type(loader).__name__):
+                        result = loader.load(stream)
+            else:
+                with registry.timed("parse", type(loader).__name__):
+                    result = parse_cache.load(loader, file)
 
         if content:
-            result = loader.loads(content)
+            with registry.timed("parse", type(loader).__name__):
+                result = loader.loads(content)
+
+        if lazy:
+            config = cls(
+                {},
+                _src_input=result,
+                _loader=loader,
+                _registry=registry,
+                _resolver=Resolver(registry),
+                _file=file,
+            )
+        else:
+            output = post_process(loader=loader, value=result, registry=registry)
+            config = cls(output, _src_input=result, _loader=loader, _registry=registry, _file=file)
 
-        output = post_process(loader=loader, value=result, registry=registry)
-        return cls(output, _src_input=result, _loader=loader, _registry=registry)
+        if watch:
+            config.watch()
+        return config
 
     @classmethod
     def from_yaml(
-        cls, file: Optional[str] = None, *, content: Optional[str] = None, registry=registry
+        cls,
+        file: Optional[str] = None,
+        *,
+        content: Optional[str] = None,
+        registry=registry,
+        **kwargs,
     ):
         """Open a yaml `file` and load it into the resulting config object."""
-        return cls.from_loader(YamlLoader(), file=file, content=content, registry=registry)
+        return cls.from_loader(
+            shared_loader(YamlLoader), file=file, content=content, registry=registry, **kwargs
+        )
 
     @classmethod
     def from_json(
-        cls, file: Optional[str] = None, content: Optional[str] = None, registry=registry
+        cls,
+        file: Optional[str] = None,
+        content: Optional[str] = None,
+        registry=registry,
+        **kwargs,
     ):
-        """Open a toml `file` and load it into the resulting config object."""
-        return cls.from_loader(JsonLoader(), file=file, content=content, registry=registry)
+        """Open a json `file` and load it into the resulting config object."""
+        return cls.from_loader(
+            shared_loader(JsonLoader), file=file, content=content, registry=registry, **kwargs
+        )
 
     @classmethod
     def from_toml(
-        cls, file: Optional[str] = None, content: Optional[str] = None, registry=registry
+        cls,
+        file: Optional[str] = None,
+        content: Optional[str] = None,
+        registry=registry,
+        **kwargs,
     ):
         """Open a toml `file` and load it into the resulting config object."""
-        return cls.from_loader(TomlLoader(), file=file, content=content, registry=registry)
+        return cls.from_loader(
+            shared_loader(TomlLoader), file=file, content=content, registry=registry, **kwargs
+        )
+
+    @classmethod
+    def from_layers(cls, layers, registry=registry, watch: bool = False):
+        r"""Merge an ordered list of `layers` into a single config object.
+
+        Each layer is either a file path (loaded according to its extension), or a
+        `configly.layers.Layer`. Later layers take precedence over earlier ones: mappings
+        are merged key by key, and any other value replaces the value before it.
+
+        The layers are merged (and interpolated) once, up front. `origin` returns the
+        layer any value comes from, and `reload` only re-merges the top-level keys
+        which the changed layers affect. Interpolated values are coerced by the loader
+        of the layer they come from.
+
+        >>> import tempfile
+        >>> from configly.layers import Layer
+        >>> with tempfile.NamedTemporaryFile("w", suffix=".yml", delete=False) as f:
+        ...     _ = f.write("a: 1\nb:\n  c: 2\n  d: 3")
+        >>> override = Layer(content='{"b": {"c": 4}}', loader=JsonLoader())
+        >>> config = Config.from_layers([f.name, override])
+        >>> config.to_dict()
+        {'a': 1, 'b': {'c': 4, 'd': 3}}
+        >>> config.origin("b.c") is override
+        True
+        """
+        from configly.layers import Layer, merge, mixed_loaders, post_process_layers
+
+        layers = [layer if isinstance(layer, Layer) else Layer(layer) for layer in layers]
+        if not layers:
+            raise ValueError("At least one layer is required.")
 
-    def refresh(self):
+        for layer in layers:
+            layer.load()
+
+        # The merged source is patched by `reload`, so it mustn't be any layer's own value.
+        result = dict(merge([layer.value for layer in layers]))
+
+        loader = layers[0].loader
+        if mixed_loaders(layers):
+            resolver = Resolver(registry)
+            resolver.prefetch(result)
+            output = post_process_layers(
+                result,
+                [layer.value for layer in layers],
+                [layer.loader for layer in layers],
+                resolver,
+            )
+            output = dict(output)
+        else:
+            output = post_process(loader=loader, value=result, registry=registry)
+            if output is result:
+                output = dict(output)
+
+        config = cls(output, _src_input=result, _loader=loader, _registry=registry, _layers=layers)
+        if watch:
+            config.watch()
+        return config
+
+    @classmethod
+    def attach(cls, path: str, registry=registry, watch: bool = False):
+        """Attach to the config values which another process published to `path`.
+
+        The attached config is read-only, in that its values are never interpolated:
+        `refresh` (or `reload`) instead picks up the values last published, if they're
+        newer than its own. Checking for newer values only reads the file's header. With
+        `watch=True`, newer values are picked up in the background. See `publish`.
+        """
+        from configly.shared import SharedSnapshot
+
+        shared = SharedSnapshot(path, attached=True)
+        _, value = shared.read()
+        config = cls(value, _src_input=value, _registry=registry, _shared=shared)
+        if watch:
+            config.watch()
+        return config
+
+    def publish(self, path: str):
+        """Publish the config's resolved values to `path`, for other processes to `attach` to.
+
+        This allows a parent process (for example, of a pre-fork worker pool) to parse
+        and interpolate the config once, rather than every worker doing so on its own.
+        The config is republished whenever it's refreshed or reloaded, which attached
+        configs pick up on their own `refresh`.
+
+        >>> import os, tempfile
+        >>> path = os.path.join(tempfile.mkdtemp(), "config.snapshot")
+        >>> Config({"a": {"b": 1}}).publish(path)
+        >>> Config.attach(path).a.b
+        1
+        """
+        from configly.shared import SharedSnapshot
+
+        self._resolve_all()
+        shared = SharedSnapshot(path)
+        shared.publish(self._value)
+        self._shared = shared
+
+    def refresh(self, interpolators=None):
         """Reevaluate the interpolation of variable values in the given sub-config.
 
         This will be particularly useful for values which are coming from sources
         where the value might change.
+
+        Only values which contain interpolation blocks are reevaluated, optionally
+        limited to those which use any of the given `interpolators` (by name). The
+        updated values are patched into the existing config, in place.
+
+        >>> config = Config.from_yaml(content="a: <% ENV[A, 1] %>")
+        >>> config.refresh(interpolators=["ENV"])
+        """
+        with self._lock:
+            if self._attached:
+                self._sync()
+                return
+
+            if self._lazy:
+                # The resolver and memoized values are shared with every view, so they're
+                # dropped in place, for views obtained beforehand to see it too.
+                self._resolver.invalidate(None if interpolators is None else set(interpolators))
+                for path in self._memoized_paths(interpolators):
+                    self._forget(path)
+                self._generation[0] += 1
+                self._republish()
+                return
+
+            leaves = self._interpolated_leaves(interpolators)
+            resolver = Resolver(self._registry)
+            resolver.prefetch([value for _, value in leaves])
+
+            # Every value is resolved before any is patched in, so that a failure leaves
+            # the config as it was.
+            updates = [
+                (path, interpolate(self._loader_at(path), value, resolver))
+                for path, value in leaves
+            ]
+            changed = []
+            for path, value in updates:
+                if self._subscriptions:
+                    changed.extend(self._changes(path, value))
+                self._patch(path, value)
+
+            # Only bumped once every value is patched in, so that a snapshot taken during
+            # the refresh isn't cached against the new generation.
+            self._generation[0] += 1
+            self._republish()
+            self._notify(changed)
+
+    def reload(self):
+        """Reload the config from the file it was loaded from.
+
+        Attached configs (see `attach`) instead pick up newly published values.
+
+        The reloaded config is swapped in as a whole, so concurrent readers see either
+        the old or new config. Views obtained from the config beforehand keep
+        reflecting the old one.
+
+        Layered configs (see `from_layers`) are instead patched in place, re-merging
+        only the top-level keys which changed in any of their layers.
+        """
+        with self._lock:
+            if self._attached:
+                self._sync()
+                return
+
+            if self._layers is not None:
+                self._reload_layers()
+                return
+
+            if self._file is None:
+                raise ValueError("Only configs loaded from a file can be reloaded.")
+
+            from configly.sections import Sections
+
+            other = self.from_loader(
+                self._loader,
+                file=self._file,
+                registry=self._registry,
+                lazy=self._lazy,
+                mmap=isinstance(self._src_input, Sections),
+            )
+
+            changed = self._changes((), other._value) if self._subscriptions else []
+
+            # `__getitem__` reads `_children` before anything else, so replacing it last
+            # ensures no view of the old config is cached against the new one.
+            self._src_input = other._src_input
+            self._resolver = other._resolver
+            self._value = other._value
+            self._interpolated = None
+            self._index = None
+            self._children = {}
+            self._generation[0] += 1
+            self._republish()
+            self._notify(changed)
+
+    def _reload_layers(self):
+        with self._lock:
+            from configly.layers import (
+                diff,
+                get_path,
+                merge,
+                MISSING,
+                mixed_loaders,
+                post_process_layers,
+                tag,
+                values_at,
+            )
+
+            # The layers themselves are only updated once every value has been resolved, so
+            # that a failure leaves both the config and its layers as they were.
+            loaded = [layer.read() for layer in self._layers]
+            values = [
+                layer.value if new is None else new[0] for layer, new in zip(self._layers, loaded)
+            ]
+
+            keys = {}
+            for layer, new in zip(self._layers, loaded):
+                if new is not None:
+                    keys.update((path[0], None) for path in diff(layer.value, new[0]))
+
+            mixed = mixed_loaders(self._layers)
+            loaders = [layer.loader for layer in self._layers]
+
+            src_input = dict(self._src_input)
+            paths = []
+            for key in keys:
+                value = merge([layer_value.get(key, MISSING) for layer_value in values])
+                if mixed:
+                    # A value can be unchanged, but come from a layer of another format.
+                    old = merge(
+                        [tag(layer.value.get(key, MISSING), layer.loader) for layer in self._layers]
+                    )
+                    new = merge(
+                        [
+                            tag(layer_value.get(key, MISSING), loader)
+                            for layer_value, loader in zip(values, loaders)
+                        ]
+                    )
+                    paths.extend(diff(old, new, (key,)))
+                else:
+                    paths.extend(diff(self._src_input.get(key, MISSING), value, (key,)))
+                if value is MISSING:
+                    src_input.pop(key, None)
+                else:
+                    src_input[key] = value
+
+            raw_values = [get_path(src_input, path) for path in paths]
+            resolver = Resolver(self._registry)
+            resolver.prefetch([value for value in raw_values if value is not MISSING])
+
+            # Every value is resolved before any is patched in, so that a failure leaves
+            # the config as it was.
+            updates = []
+            for path, value in zip(paths, raw_values):
+                if value is not MISSING and mixed:
+                    value = post_process_layers(value, values_at(values, path), loaders, resolver)
+                elif value is not MISSING:
+                    value = post_process(loader=self._loader, value=value, resolver=resolver)
+                updates.append((path, value))
+            for layer, new in zip(self._layers, loaded):
+                if new is not None:
+                    layer.value, layer._digest = new
+
+            if not paths:
+                return
+
+            changed = []
+            for path, value in updates:
+                if self._subscriptions:
+                    changed.extend(self._changes(path, value))
+                self._replace(path, value)
+
+            self._src_input = src_input
+            self._interpolated = None
+            self._index = None
+            self._generation[0] += 1
+            self._republish()
+            self._notify(changed)
+
+    def _replace(self, path, value):
+        """Set (or with `MISSING`, remove) the value at `path`.
+
+        Containers shared with the source (rather than copied by `post_process`) are
+        copied before being modified, so the layers they belong to are left untouched.
         """
-        update = post_process(loader=self._loader, value=self._src_input, registry=self._registry)
-        self._value.update(update)
+        from configly.layers import MISSING
+
+        container = self._value
+        src_input = self._src_input
+        invalidated = path
+        for depth, key in enumerate(path[:-1]):
+            src_input = src_input.get(key, MISSING) if isinstance(src_input, Mapping) else MISSING
+            child = container[key]
+            if child is src_input:
+                # Views of the shared container would no longer see the copy's changes.
+                child = container[key] = dict(child)
+                if invalidated is path:
+                    invalidated = path[: depth + 1]
+            container = child
+
+        if value is MISSING:
+            container.pop(path[-1], None)
+        else:
+            container[path[-1]] = value
+        self._invalidate(invalidated)
+
+    def origin(self, path):
+        """Return the layer which the value at `path` comes from, see `from_layers`.
+
+        `path` is either a dotted path, or a tuple of keys.
+        """
+        from configly.layers import get_path, MISSING
+
+        if self._layers is None:
+            raise ValueError("Only layered configs have origins.")
+
+        keys = path
+        if not isinstance(path, tuple):
+            if path in self._src_input:
+                keys = (path,)
+            else:
+                try:
+                    keys, _ = flatten(self._src_input)[path]
+                except KeyError:
+                    raise KeyError("'{}' not found in: {}.".format(path, self))
+
+        for layer in reversed(self._layers):
+            if get_path(layer.value, keys) is not MISSING:
+                return layer
+        raise KeyError("'{}' not found in: {}.".format(path, self))
+
+    def _sync(self):
+        """Swap in the values last published to the file an attached config is attached to."""
+        with self._lock:
+            loaded = self._shared.read()
+            if loaded is None:
+                return
+
+            _, value = loaded
+            changed = self._changes((), value) if self._subscriptions else []
+
+            self._src_input = value
+            self._value = value
+            self._interpolated = None
+            self._index = None
+            self._children = {}
+            self._generation[0] += 1
+            self._notify(changed)
+
+    def _republish(self):
+        if self._shared is not None:
+            self._resolve_all()
+            self._shared.publish(self._value)
+
+    @property
+    def _attached(self):
+        return self._shared is not None and self._shared.attached
+
+    def _files(self):
+        """Return the files the config is loaded from."""
+        if self._attached:
+            return [self._shared.path]
+        if self._layers is not None:
+            return [layer.file for layer in self._layers if layer.file is not None]
+        return [] if self._file is None else [self._file]
+
+    def watch(self, watcher=None):
+        """Reload the config in the background, whenever its file changes.
+
+        Files which values are interpolated from (with interpolators which implement
+        `source_path`, such as `FILE`) are also watched. See `configly.watch.Watcher`.
+        """
+        if watcher is None:
+            from configly.watch import watcher
+        watcher.watch(self)
+
+    def unwatch(self, watcher=None):
+        """Stop watching the config for changes."""
+        if watcher is None:
+            from configly.watch import watcher
+        watcher.unwatch(self)
+
+    def schedule(self, intervals, scheduler=None):
+        """Refresh the config's interpolated values in the background, per interpolator.
+
+        `intervals` maps interpolator names to the number of seconds between refreshes
+        of the values using them. Interpolators which are omitted (or given `None`) are
+        never refreshed. Values interpolated from files are better kept up to date with
+        `watch`. See `configly.schedule.Scheduler`.
+
+        >>> config = Config.from_yaml(content="a: <% ENV[A, 1] %>")
+        >>> config.schedule({"ENV": 300})
+        >>> config.unschedule()
+        """
+        if scheduler is None:
+            from configly.schedule import scheduler
+        scheduler.schedule(self, intervals)
+
+    def unschedule(self, scheduler=None):
+        """Stop refreshing the config in the background."""
+        if scheduler is None:
+            from configly.schedule import scheduler
+        scheduler.unschedule(self)
+
+    def subscribe(self, path, callback):
+        """Call `callback` whenever any value at or within `path` changes.
+
+        `path` is either a dotted path, or a tuple of keys (`()` for the whole config),
+        and needn't exist yet. Numeric segments of a dotted path are list indices, so
+        mapping keys which are numeric strings need the tuple form.
+
+        On every refresh or reload of the config (including those made by `watch` and
+        `schedule`, and those of any of its views) which changes the resolved values
+        within `path`, `callback` is called once, after the config is updated, with the
+        list of `configly.layers.Change`s within it. Subscriptions can be made on views
+        as well, and are relative to them. Either way, `Change` paths are relative to the
+        top-level config.
+
+        >>> import os
+        >>> config = Config.from_json(content='{"db": {"host": "<% ENV[HOST, a] %>"}}')
+        >>> config.db.subscribe("host", print)
+        >>> os.environ["HOST"] = "b"
+        >>> config.refresh()
+        [Change(path=('db', 'host'), old='a', new='b')]
+        >>> del os.environ["HOST"]
+        """
+        if self._lazy:
+            raise ValueError(
+                "Lazy configs can't be subscribed to, as their values aren't resolved on "
+                "refresh."
+            )
+
+        self._subscriptions.append((self._path + _keys(path), callback))
+
+    def unsubscribe(self, path, callback):
+        """Remove a subscription made by `subscribe`."""
+        keys = self._path + _keys(path)
+        self._subscriptions[:] = [
+            (subscribed, subscriber)
+            for subscribed, subscriber in self._subscriptions
+            if subscribed != keys or subscriber != callback
+        ]
+
+    def _changes(self, path, value):
+        """Return the `Change`s which setting `path` to `value` would make."""
+        from configly.layers import changes, get_path
+
+        old = get_path(self._value, path)
+        if not path:
+            # The top-level mapping is updated in place.
+            old = dict(old)
+        return changes(old, value, path)
+
+    def _notify(self, changed):
+        if not changed:
+            return
+
+        if self._path:
+            changed = [change._replace(path=self._path + change.path) for change in changed]
+
+        for keys, callback in list(self._subscriptions):
+            size = len(keys)
+            matching = [
+                change
+                for change in changed
+                if change.path[:size] == keys or keys[: len(change.path)] == change.path
+            ]
+            if matching:
+                callback(matching)
+
+    def _interpolated_leaves(self, interpolators=None):
+        if self._interpolated is None:
+            self._interpolated = list(interpolated_leaves(self._src_input))
+
+        if interpolators is None:
+            return [(path, value) for path, value, _ in self._interpolated]
+
+        return [
+            (path, value)
+            for path, value, template in self._interpolated
+            if not template.interpolator_names.isdisjoint(interpolators)
+        ]
+
+    def _memoized_paths(self, interpolators):
+        """Return the paths of a lazy config's memoized values which use `interpolators`.
+
+        With `interpolators=None`, those which use any interpolator are returned.
+
+        Only memoized values are walked, so that sources which haven't been accessed (such
+        as the unparsed sections of a memory-mapped file) are left alone.
+        """
+        paths = []
+        stack = [((), self._src_input, self._value)]
+        while stack:
+            path, src_input, value = stack.pop()
+            for key in list(value):
+                item = src_input[key]
+                if isinstance(item, Mapping):
+                    stack.append((path + (key,), item, value[key]))
+                elif any(
+                    interpolators is None
+                    or not template.interpolator_names.isdisjoint(interpolators)
+                    for _, _, template in interpolated_leaves(item)
+                ):
+                    paths.append(path + (key,))
+        return paths
+
+    def _patch(self, path, value):
+        if not path:
+            # The whole of this (sub-)config was itself an interpolated value.
+            self._value.clear()
+            self._value.update(value)
+            self._invalidate(path)
+            return
+
+        container = self._value
+        for key in path[:-1]:
+            container = container[key]
+        container[path[-1]] = value
+        self._invalidate(path)
+
+    def _loader_at(self, path):
+        """Return the loader which the interpolated value at `path` is coerced with.
+
+        Values of layered configs are coerced by the loader of the layer they come from.
+        """
+        from configly.layers import get_path, MISSING, mixed_loaders
+
+        layers = self._origins
+        if layers is None or not mixed_loaders(layers):
+            return self._loader
+
+        path = self._path + path
+        for layer in reversed(layers):
+            if get_path(layer.value, path) is not MISSING:
+                return layer.loader
+        return self._loader
+
+    def _drop_index(self):
+        self._index = None
+
+    def _forget(self, path):
+        """Drop the memoized value of a lazy config, which contains the given `path`."""
+        src_input = self._src_input
+        value = self._value
+        for depth, key in enumerate(path):
+            src_input = src_input[key]
+            if not isinstance(src_input, Mapping):
+                value.pop(key, None)
+                self._invalidate(path[: depth + 1])
+                return
+
+            value = value.get(key)
+            if value is None:
+                return
+
+    def _invalidate(self, path):
+        """Drop the cached views and indices which may include the value at `path`."""
+        view = self
+        for key in path[:-1]:
+            view._drop_index()
+            view = view._children.get(key)
+            if view is None:
+                return
+
+        view._drop_index()
+        if path:
+            view._children.pop(path[-1], None)
+        else:
+            view._children.clear()
+
+    @property
+    def _lazy(self):
+        return self._resolver is not None
 
     def to_dict(self):
         """Return a `dict` equivalent of the config object.
 
+        The result is a copy, which can be freely modified. Use `snapshot` instead to
+        share the config's values without copying them.
+
         Roughly equivalent to
         >>> dict(Config({1:1})) == Config({1:1}).to_dict()
         True
         """
-        return copy.deepcopy(self._value)
+        self._resolve_all()
+        return copy_tree(self._value)
 
-    def __iter__(self):
-        for key, value in self._value.items():
-            if isinstance(value, Mapping):
-                value = self.__class__(
-                    value,
-                    _src_input=self._src_input and self._src_input[key],
-                    _loader=self._loader,
-                    _registry=self._registry,
-                )
+    def snapshot(self):
+        """Return an immutable view of the config's current values.
+
+        Mappings are returned as read-only `MappingProxyType`, and lists as tuples. The
+        snapshot is built once, and the same object is returned until the config next
+        changes (through `refresh` or `reload`), so it can be handed out without copying.
+
+        >>> config = Config({"a": [1, {"b": 2}]})
+        >>> config.snapshot()
+        mappingproxy({'a': (1, mappingproxy({'b': 2}))})
+        >>> config.snapshot() is config.snapshot()
+        True
+        """
+        # The generation is read first, so that a concurrent change invalidates the result.
+        generation = self._generation[0]
+        cached = self._snapshot
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+
+        self._resolve_all()
+        snapshot = freeze(self._value)
+        self._snapshot = (generation, snapshot)
+        return snapshot
+
+    def typed(self, schema=None):
+        """Return the config's values as typed objects, whose fields are plain slot reads.
+
+        Without a `schema`, each mapping becomes an instance of a generated `__slots__`
+        class (one per distinct set of keys), and each list a tuple. With a dataclass (or
+        `typing.NamedTuple`) `schema`, the values are instead coerced to its annotated
+        field types, raising a `ValueError` for those which can't be. Either way, all of
+        the work happens once, here. See `configly.typed.build`.
+
+        Like `snapshot`, the same object is returned until the config next changes
+        (through `refresh` or `reload`), after which it's rebuilt.
+
+        >>> config = Config({"db": {"host": "localhost", "port": 5432}})
+        >>> config.typed().db.port
+        5432
+        >>> config.typed() is config.typed()
+        True
+        """
+        from configly.typed import build
+
+        generation = self._generation[0]
+        typed = self._typed
+        cached = None if typed is None else typed.get(schema)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+
+        self._resolve_all()
+        result = build(self._value, schema)
+        if typed is None:
+            typed = self._typed = {}
+        typed[schema] = (generation, result)
+        return result
+
+    def _resolve(self, attr):
+        item = self._src_input[attr]
+        if isinstance(item, Mapping):
+            value = {}
+        else:
+            self._resolver.prefetch(item)
+            value = post_process(loader=self._loader, value=item, resolver=self._resolver)
 
-            yield key, value
+        self._value[attr] = value
+        return value
+
+    def _resolve_all(self):
+        if not self._lazy:
+            return
+
+        for key in self._src_input:
+            value = self[key]
+            if isinstance(value, Config):
+                value._resolve_all()
+
+    def __iter__(self):
+        self._resolve_all()
+        for key in self._value:
+            yield key, self[key]
 
     def __getitem__(self, attr):
+        children = self._children
+        try:
+            return children[attr]
+        except KeyError:
+            pass
+
         try:
             value = self._value[attr]
         except KeyError:
-            raise KeyError("'{}' not found in: {}.".format(attr, self))
+            if self._lazy and attr in self._src_input:
+                value = self._resolve(attr)
+            elif not isinstance(attr, str) or "." not in attr:
+                raise KeyError("'{}' not found in: {}.".format(attr, self))
+            else:
+                return self._lookup_path(attr)
+
+        if isinstance(value, Mapping):
+            src_input = self._src_input and self._src_input[attr]
+            child = self.__class__(
+                value,
+                _src_input=src_input,
+                _loader=self._loader,
+                _registry=self._registry,
+                _resolver=self._resolver if isinstance(src_input, Mapping) else None,
+                _generation=self._generation,
+                _lock=self._lock,
+                _subscriptions=self._subscriptions,
+                _path=self._path + (attr,),
+                _origins=self._origins,
+            )
+            children[attr] = child
+            return child
+        return value
+
+    def _lookup_path(self, path):
+        generation = self._generation[0]
+        if self._lazy:
+            # A lazy config only knows its full shape through its source, which only
+            # changes on reload. Values are read through child views.
+            if self._index is None:
+                self._index = flatten(self._src_input)
+        elif self._index is None or self._index_generation != generation:
+            # The generation is shared with child views, so values they refreshed aren't
+            # served from a stale index.
+            self._index = flatten(self._value)
+            self._index_generation = generation
+
+        try:
+            keys, value = self._index[path]
+        except KeyError:
+            raise KeyError("'{}' not found in: {}.".format(path, self))
+
+        if self._lazy:
+            view = self
+            for key in keys:
+                view = view[key]
+            return view
+
+        if isinstance(value, Config):
+            # A view of a nested mapping, cached below.
+            return value
 
         if isinstance(value, Mapping):
-            return self.__class__(
+            src_input = self._src_input
+            for key in keys:
+                src_input = src_input and src_input[key]
+
+            child = self.__class__(
                 value,
-                _src_input=self._src_input and self._src_input[attr],
+                _src_input=src_input,
                 _loader=self._loader,
                 _registry=self._registry,
+                _generation=self._generation,
+                _lock=self._lock,
+                _subscriptions=self._subscriptions,
+                _path=self._path + keys,
+                _origins=self._origins,
             )
+            # Cached within the index (rather than `_children`), so it's dropped with it.
+            self._index[path] = (keys, child)
+            return child
         return value
 
     def __getattr__(self, name):
@@ -117,13 +994,23 @@ class Config:
             return self[name]
         except KeyError as e:
             if hasattr(self._value, name):
+                self._resolve_all()
                 return getattr(self._value, name)
             raise AttributeError(str(e))
 
     def __eq__(self, other):
+        self._resolve_all()
         if isinstance(other, type(self)):
+            other._resolve_all()
             return self._value == other._value
         return self._value == other
 
     def __repr__(self):
         return "{0.__class__.__name__}({0._value})".format(self)
+
+
+def _keys(path):
+    """Return the keys of a dotted `path` (or tuple of keys), see `Config.subscribe`."""
+    if isinstance(path, tuple):
+        return path
+    return tuple(int(key) if key.isdigit() and key.isascii() else key for key in path.split("."))
@@ -0,0 +1,148 @@
+import threading
+from collections import namedtuple
+from time import perf_counter
+
+from configly.registry import registry as default_registry
+
+Event = namedtuple("Event", ["phase", "name", "duration", "cached"])
+Event.__doc__ = """A single timed step of loading a config, as passed to a registry's hooks.
+
+The `phase` is one of:
+
+- "read": reading a config file, `name` being the file.
+- "parse": parsing a config, `name` being the loader.
+- "interpolate": a call to `post_process`.
+- "prefetch": a batch of values fetched by `Resolver.prefetch`, `name` being the
+  interpolator.
+- "lookup": looking up an interpolated value, `name` being the interpolator.
+- "coerce": coercing an interpolated string into a value, `name` being the loader.
+
+`duration` is in seconds. `cached` tells whether a "lookup" or "coerce" was answered
+from the memoized values of the current pass (with a `duration` of 0), and is `None`
+for other phases. The first lookup of a prefetched value isn't `cached`, its duration
+being part of the "prefetch" instead.
+"""
+
+PHASES = ("read", "parse", "interpolate", "prefetch", "lookup", "coerce")
+
+
+class Timer:
+    """Emit the duration of a block, to every hook of a registry. See `Registry.timed`."""
+
+    __slots__ = ("registry", "phase", "name", "cached", "start")
+
+    def __init__(self, registry, phase, name, cached):
+        self.registry = registry
+        self.phase = phase
+        self.name = name
+        self.cached = cached
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.registry.emit(self.phase, self.name, perf_counter() - self.start, self.cached)
+
+
+class Stats:
+    """The aggregated events of a single phase and name, see `Collector`."""
+
+    __slots__ = ("calls", "hits", "misses", "total")
+
+    def __init__(self):
+        self.calls = 0
+        self.hits = 0
+        self.misses = 0
+        self.total = 0.0
+
+    @property
+    def hit_rate(self):
+        """The fraction of calls answered from memoized values, if applicable."""
+        if not self.hits and not self.misses:
+            return None
+        return self.hits / (self.hits + self.misses)
+
+    def __repr__(self):
+        return "{0.__class__.__name__}(calls={0.calls}, hits={0.hits}, total={0.total:.6f})".format(
+            self
+        )
+
+
+class Collector:
+    r"""Aggregate the timings, call counts and cache hits of a registry's events.
+
+    Used as a context manager, the collector is added as a hook of `registry` for the
+    duration of the block.
+
+    >>> from configly import Config
+    >>> with Collector() as collector:
+    ...     config = Config.from_yaml(content="a: <% ENV[A, 1] %>\nb: <% ENV[A, 1] %>")
+    >>> collector.stats[("lookup", "ENV")].hit_rate
+    0.5
+    """
+
+    def __init__(self, registry=default_registry):
+        self.registry = registry
+
+        # (phase, name) -> `Stats`.
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        key = (event.phase, event.name)
+        with self._lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = Stats()
+
+            stats.calls += 1
+            stats.total += event.duration
+            if event.cached is True:
+                stats.hits += 1
+            elif event.cached is False:
+                stats.misses += 1
+
+    def __enter__(self):
+        self.registry.add_hook(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.registry.remove_hook(self)
+
+    def clear(self):
+        with self._lock:
+            self.stats.clear()
+
+    def report(self):
+        """Return the collected stats, as a table ordered by phase."""
+        header = ("phase", "name", "calls", "hit rate", "total ms", "mean ms")
+        rows = []
+        for (phase, name), stats in sorted(self.stats.items(), key=_report_order):
+            hit_rate = stats.hit_rate
+            rows.append(
+                (
+                    phase,
+                    "" if name is None else str(name),
+                    str(stats.calls),
+                    "" if hit_rate is None else "{:.0%}".format(hit_rate),
+                    "{:.3f}".format(stats.total * 1e3),
+                    "{:.3f}".format(stats.total * 1e3 / stats.calls),
+                )
+            )
+
+        widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+        lines = []
+        for row in [header] + rows:
+            cells = [
+                cell.ljust(width) if i < 2 else cell.rjust(width)
+                for i, (cell, width) in enumerate(zip(row, widths))
+            ]
+            lines.append("  ".join(cells).rstrip())
+        return "\n".join(lines)
+
+
+def _report_order(item):
+    (phase, name), stats = item
+    rank = PHASES.index(phase) if phase in PHASES else len(PHASES)
+    return rank, phase, -stats.total
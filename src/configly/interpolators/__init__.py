@@ -1,4 +1,7 @@
 import abc
+import importlib
+
+_MISSING = object()
 
 
 class Interpolator(abc.ABC):
@@ -6,8 +9,14 @@ class Interpolator(abc.ABC):
 
     It is not required to subclass `Interpolator`, but it *does* provide the interface
     and ensures the class implements it.
+
+    Interpolators whose lookups are slow (for example, network calls) can set
+    `max_concurrency` above 1, to have all of their values for a given config
+    fetched up front, through `get_many`.
     """
 
+    max_concurrency = 1
+
     @abc.abstractmethod
     def __getitem__(self, name):
         """Override this method to implement a method to get the value for a piece of config.
@@ -25,10 +34,59 @@ class Interpolator(abc.ABC):
         except KeyError:
             return default
 
+    def source_path(self, name):
+        """Return the path of the file from which `name` is read, if there is one.
+
+        Configs watching for changes (see `Config.watch`) also watch these files.
+        """
+        return None
+
+    def get_many(self, names):
+        """Return a `dict` of the values of those `names` which exist.
+
+        By default, values are looked up by up to `max_concurrency` concurrent threads.
+        Override this method for sources which support fetching values in bulk.
+        """
+        names = list(names)
+
+        def lookup(name):
+            try:
+                return self[name]
+            except KeyError:
+                return _MISSING
+
+        max_workers = min(getattr(self, "max_concurrency", 1), len(names))
+        if max_workers > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                values = list(executor.map(lookup, names))
+        else:
+            values = [lookup(name) for name in names]
+
+        return {name: value for name, value in zip(names, values) if value is not _MISSING}
+
+
+# The bundled interpolators are only imported once they're first used, see `__getattr__`.
+_LAZY_ATTRIBUTES = {
+    "DockerSecretInterpolator": "configly.interpolators.docker_secret",
+    "EnvVarInterpolator": "configly.interpolators.env",
+    "FileInterpolator": "configly.interpolators.file",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
 
-# isort: split
-from configly.interpolators.docker_secret import DockerSecretInterpolator  # noqa
-from configly.interpolators.env import EnvVarInterpolator  # noqa
-from configly.interpolators.file import FileInterpolator  # noqa
 
 __all__ = ["EnvVarInterpolator", "FileInterpolator", "DockerSecretInterpolator", "Interpolator"]
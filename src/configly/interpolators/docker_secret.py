@@ -20,6 +20,9 @@ class DockerSecretInterpolator(Interpolator):
 
         return os.environ[name]
 
+    def source_path(self, name):
+        return os.environ.get(f"{name.upper()}_FILE")
+
     @classmethod
     def register(cls, registry=registry, overwrite=False):
         registry.register_interpolator("DOCKER_SECRET", cls, overwrite=overwrite)
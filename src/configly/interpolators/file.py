@@ -1,16 +1,29 @@
-import functools
-import os
-
 from configly.interpolators import Interpolator
 
 
 class FileInterpolator(Interpolator):
     yaml_safe = False
 
-    @functools.lru_cache()
+    # The contents of the files read by every instance, see `configly.cache.FileCache`.
+    # Created on first use, so that importing configly stays cheap.
+    _cache = None
+
+    @property
+    def cache(self):
+        if FileInterpolator._cache is None:
+            from configly.cache import FileCache
+
+            FileInterpolator._cache = FileCache()
+        return FileInterpolator._cache
+
     def __getitem__(self, name):
-        if not os.path.exists(name):
-            raise KeyError("{} file does not exist.")
+        try:
+            return self.cache.read(name)
+        except (FileNotFoundError, NotADirectoryError):
+            raise KeyError("{} file does not exist.".format(name))
+
+    def source_path(self, name):
+        return name
 
-        with open(name, mode="rb") as f:
-            return f.read().decode("utf-8")
+    def invalidate(self, name):
+        self.cache.invalidate(name)
@@ -5,22 +5,62 @@ from configly.registry import register_interpolator
 
 
 class VaultInterpolator(Interpolator):
-    def __init__(self, **kwargs):
+    """Interpolate secrets from a (kv v1) Vault secrets engine.
+
+    Keyword arguments are passed through to the underlying `hvac.Client`. Unless a
+    `session` is given, the client uses a keep-alive session whose connection pool
+    fits `max_concurrency` concurrent requests, as made by `get_many`.
+
+    Secrets are read from Vault on every lookup, unless given a `cache`. A
+    `configly.cache.TTLCache` holds on to each secret for its `lease_duration`
+    (or the cache's own `ttl`, if set), so that periodic refreshes of a config
+    only read secrets from Vault once they've expired.
+
+    >>> from configly.cache import TTLCache
+    >>> vault = VaultInterpolator(cache=TTLCache(maxsize=256, stale_while_revalidate=30))
+    """
+
+    max_concurrency = 8
+
+    def __init__(self, max_concurrency=None, cache=None, **kwargs):
         try:
             import hvac
         except ImportError:
             raise ImportError("Try installing `configly[vault]` to use the vault interpolator")
 
+        if max_concurrency is not None:
+            self.max_concurrency = max_concurrency
+
+        if "session" not in kwargs:
+            kwargs["session"] = self._session(self.max_concurrency)
+
+        self.cache = cache
         self.client = hvac.Client(**kwargs)
 
+    @staticmethod
+    def _session(pool_size):
+        import requests
+
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_size)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
     def __getitem__(self, name):
+        if self.cache is None:
+            value, _ = self._read_secret(name)
+            return value
+        return self.cache.get_or_load(name, self._read_secret)
+
+    def _read_secret(self, name):
         import hvac
 
         try:
             result = self.client.secrets.kv.v1.read_secret(name)
         except hvac.exceptions.InvalidPath:
             raise KeyError(name)
-        return json.dumps(result["data"])
+        return json.dumps(result["data"]), result.get("lease_duration")
 
 
 register_interpolator("VAULT", VaultInterpolator)
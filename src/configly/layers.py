@@ -0,0 +1,291 @@
+import hashlib
+import io
+import os
+from collections import namedtuple
+from collections.abc import Mapping
+
+from configly.loaders import JsonLoader, shared_loader, TomlLoader, YamlLoader
+
+MISSING = object()
+
+LOADERS = {
+    ".json": JsonLoader,
+    ".toml": TomlLoader,
+    ".yaml": YamlLoader,
+    ".yml": YamlLoader,
+}
+
+
+class Layer:
+    """A single source of a layered config, see `Config.from_layers`.
+
+    A layer is read from a `file` or from `content`. Unless given, the `loader` is
+    chosen by the file's extension. A missing `optional` file is an empty layer.
+    """
+
+    def __init__(self, file=None, content=None, loader=None, optional=False):
+        if loader is None:
+            if file is None:
+                raise ValueError("A `loader` is required for layers without a file.")
+            loader = loader_for(file)
+
+        self.file = file
+        self.content = content
+        self.loader = loader
+        self.optional = optional
+
+        # The parsed content of the layer, and the digest of its source, see `load`.
+        self.value = MISSING
+        self._digest = None
+
+    def __repr__(self):
+        if self.file is not None:
+            return "{}({!r})".format(self.__class__.__name__, self.file)
+        return "{}(content={!r})".format(self.__class__.__name__, self.content)
+
+    def load(self):
+        """(Re)load the layer. Returns whether its content changed since the last load."""
+        loaded = self.read()
+        if loaded is None:
+            return False
+
+        self.value, self._digest = loaded
+        return True
+
+    def read(self):
+        """Return the layer's parsed content and its digest, or `None` if it's unchanged.
+
+        Unlike `load`, the layer itself is left as it was.
+        """
+        if self.file is None:
+            raw = self.content.encode("utf-8") if isinstance(self.content, str) else self.content
+        else:
+            try:
+                with open(self.file, "rb") as f:
+                    raw = f.read()
+            except FileNotFoundError:
+                if not self.optional:
+                    raise
+                raw = None
+
+        digest = None if raw is None else hashlib.sha256(raw).digest()
+        if self.value is not MISSING and digest == self._digest:
+            return None
+
+        value = {} if raw is None else self.loader.load(io.BytesIO(raw))
+        if value is None:
+            value = {}
+        if not isinstance(value, Mapping):
+            raise ValueError("Layer {!r} does not contain a mapping.".format(self))
+        return value, digest
+
+
+def loader_for(file):
+    """Return the loader for `file`, by its extension.
+
+    >>> loader_for("config.yml")  # doctest: +ELLIPSIS
+    <configly.loaders.YamlLoader object at ...>
+    """
+    _, extension = os.path.splitext(file)
+    try:
+        loader_cls = LOADERS[extension.lower()]
+    except KeyError:
+        raise ValueError("Unable to determine the loader for {}.".format(file))
+    return shared_loader(loader_cls)
+
+
+def merge(values):
+    """Deep merge `values`, in order. Returns `MISSING` if no value is present.
+
+    Mappings are merged key by key. Any other value replaces whatever precedes it, as
+    does a mapping following a non-mapping. Subtrees which only one value contributes
+    to are shared with that value, rather than copied.
+
+    >>> merge([{"a": {"b": 1, "c": 2}, "d": [1]}, {"a": {"c": 3}, "d": [2]}])
+    {'a': {'b': 1, 'c': 3}, 'd': [2]}
+    """
+    values = [value for value in _kept(values) if value is not MISSING]
+    if not values:
+        return MISSING
+    if len(values) == 1:
+        return values[0]
+
+    keys = {}
+    for value in values:
+        keys.update(dict.fromkeys(value))
+    return {key: merge([value.get(key, MISSING) for value in values]) for key in keys}
+
+
+def surviving(values):
+    """Return the part of each of `values` which `merge` keeps, or `MISSING` if none is.
+
+    Merging the parts is equivalent to merging `values` themselves.
+
+    >>> surviving([{"a": 1, "b": {"c": 2, "d": 3}}, {"b": {"c": 4}}])
+    [{'a': 1, 'b': {'d': 3}}, {'b': {'c': 4}}]
+    """
+    kept = _kept(values)
+    mappings = [index for index, value in enumerate(kept) if isinstance(value, Mapping)]
+    if len(mappings) <= 1:
+        return kept
+
+    keys = {}
+    for index in mappings:
+        keys.update(dict.fromkeys(kept[index]))
+
+    parts = {index: {} for index in mappings}
+    for key in keys:
+        items = surviving([kept[index].get(key, MISSING) for index in mappings])
+        for index, item in zip(mappings, items):
+            if item is not MISSING:
+                parts[index][key] = item
+    return [parts.get(index, MISSING) for index in range(len(kept))]
+
+
+def values_at(values, path):
+    """Return the value at `path` within each of `values`, as far as `merge` keeps it.
+
+    >>> values = values_at([{"a": {"b": 1}}, {"a": 2}, {"a": {"b": 3}}], ("a", "b"))
+    >>> values[0] is values[1] is MISSING, values[2]
+    (True, 3)
+    """
+    for key in path:
+        values = [
+            value.get(key, MISSING) if isinstance(value, Mapping) else MISSING
+            for value in _kept(values)
+        ]
+    return values
+
+
+def _kept(values):
+    """Return `values`, with those which `merge` drops replaced by `MISSING`.
+
+    A non-mapping replaces everything preceding it, as does a mapping following a
+    non-mapping.
+    """
+    kept = [MISSING] * len(values)
+    mappings = True
+    for index, value in enumerate(values):
+        if value is MISSING:
+            continue
+
+        mapping = isinstance(value, Mapping)
+        if not (mapping and mappings):
+            kept = [MISSING] * len(values)
+        kept[index] = value
+        mappings = mapping
+    return kept
+
+
+def mixed_loaders(layers):
+    """Return whether `layers` have loaders of different types.
+
+    Each loader coerces interpolated values by its own format's rules, see
+    `post_process_layers`.
+    """
+    return len({type(layer.loader) for layer in layers}) > 1
+
+
+def tag(value, loader):
+    """Pair each of the (non-mapping) values within `value` with the type of `loader`.
+
+    Unlike their values, the merge of tagged values also differs wherever a value comes
+    from a layer of another format.
+
+    >>> tag({"a": 1}, JsonLoader())
+    {'a': (<class 'configly.loaders.JsonLoader'>, 1)}
+    """
+    if value is MISSING:
+        return value
+    if isinstance(value, Mapping):
+        return {key: tag(item, loader) for key, item in value.items()}
+    return (type(loader), value)
+
+
+def post_process_layers(value, values, loaders, resolver):
+    """Interpolate `value`, the merge of `values`, each with the loader of its own value.
+
+    `loaders` are the loaders of each of `values`. Only the parts of each value which
+    `merge` keeps are interpolated (see `surviving`), so overridden values are never
+    looked up.
+    """
+    from configly.process import post_process
+
+    parts = [
+        part if part is MISSING else post_process(loader, part, resolver=resolver)
+        for loader, part in zip(loaders, surviving(values))
+    ]
+    return _merge_parts(value, parts)
+
+
+def _merge_parts(value, parts):
+    """Merge the `surviving` `parts` of `value`, with its keys in the same order."""
+    parts = [part for part in parts if part is not MISSING]
+    if len(parts) == 1:
+        return parts[0]
+
+    # Only mappings survive alongside one another.
+    return {
+        key: _merge_parts(item, [part.get(key, MISSING) for part in parts])
+        for key, item in value.items()
+    }
+
+
+def diff(old, new, path=()):
+    """Yield the paths at which `old` and `new` differ.
+
+    Mappings are compared key by key, any other values are compared as a whole.
+
+    >>> list(diff({"a": {"b": 1, "c": 2}}, {"a": {"b": 1, "c": 3}, "d": 4}))
+    [('a', 'c'), ('d',)]
+    """
+    if old is new:
+        return
+
+    if isinstance(old, Mapping) and isinstance(new, Mapping):
+        for key in list(old) + [key for key in new if key not in old]:
+            yield from diff(old.get(key, MISSING), new.get(key, MISSING), path + (key,))
+    elif old is MISSING or new is MISSING or old != new:
+        yield path
+
+
+Change = namedtuple("Change", ["path", "old", "new"])
+Change.__doc__ = """A changed value, as passed to subscribers, see `Config.subscribe`.
+
+`path` is the tuple of keys of the value, and `old` and `new` are its resolved values
+(`MISSING` for keys which were added or removed).
+"""
+
+
+def changes(old, new, path=()):
+    """Return the `Change`s at each of the paths where `old` and `new` differ, see `diff`.
+
+    >>> changes({"a": 1, "b": 2}, {"a": 1, "b": 3}, ("x",))
+    [Change(path=('x', 'b'), old=2, new=3)]
+    """
+    start = len(path)
+    return [
+        Change(changed, get_path(old, changed[start:]), get_path(new, changed[start:]))
+        for changed in diff(old, new, path)
+    ]
+
+
+def get_path(value, path):
+    """Return the value at `path` within nested mappings (and lists), or `MISSING`.
+
+    >>> get_path({"a": [1, {"b": 2}]}, ("a", 1, "b"))
+    2
+    """
+    for key in path:
+        if isinstance(value, Mapping):
+            if key not in value:
+                return MISSING
+        elif not (
+            isinstance(value, (list, tuple))
+            and isinstance(key, int)
+            and not isinstance(key, bool)
+            and 0 <= key < len(value)
+        ):
+            return MISSING
+        value = value[key]
+    return value
@@ -1,18 +1,42 @@
+import functools
 import importlib
 import json
+import re
+import threading
 from typing import TypeVar
 
+# Matches the numbers accepted by `json`, see `json.scanner.NUMBER_RE`.
+JSON_NUMBER_REGEX = re.compile(r"(-?(?:0|[1-9]\d*))(\.\d+)?([eE][-+]?\d+)?")
+JSON_WHITESPACE = " \t\n\r"
+JSON_CONSTANTS = {"true": True, "false": False, "null": None}
+
+TOML_INTEGER_REGEX = re.compile(r"[+-]?(?:0|[1-9][0-9]*)")
+TOML_WHITESPACE = " \t"
+TOML_CONSTANTS = {"true": True, "false": False}
+
 
 class YamlLoader:
+    # Whether `load_value` decodes (strict) json, exactly as `json.loads` does.
+    json_compatible = True
+
     def __init__(self):
         try:
             from ruamel.yaml import YAML
         except ImportError:
             raise ImportError("Install `configly[yaml]` to use the yaml loader.")
 
-        yaml = YAML(typ="safe")
+        self._yaml = YAML
+        self._local = threading.local()
 
-        self.decoder = yaml
+    @property
+    def decoder(self):
+        # `YAML` instances aren't safe to share between threads, so each thread which
+        # uses the loader gets its own.
+        try:
+            return self._local.decoder
+        except AttributeError:
+            decoder = self._local.decoder = self._yaml(typ="safe")
+            return decoder
 
     def load(self, value):
         return self.decoder.load(value)
@@ -25,6 +49,8 @@ class YamlLoader:
 
 
 class JsonLoader:
+    json_compatible = True
+
     def __init__(self):
         self.decoder = json.JSONDecoder()
 
@@ -35,26 +61,71 @@ class JsonLoader:
         return json.loads(value)
 
     def load_value(self, value):
+        """Decode `value` as json, or return it as-is if it isn't valid json.
+
+        Plain strings and simple scalars are classified up front, so the decoder
+        (and its exception path) is only used for quoted strings and structured values.
+
+        >>> loader = JsonLoader()
+        >>> [loader.load_value(v) for v in ["4", "-1.5e3", "true", "null", "foo", '["a"]']]
+        [4, -1500.0, True, None, 'foo', ['a']]
+        """
+        stripped = value.strip(JSON_WHITESPACE)
+        if not stripped:
+            return value
+
+        first = stripped[0]
+        if stripped.isdigit() and stripped.isascii() and (first != "0" or len(stripped) == 1):
+            return int(stripped)
+
+        if first in "-0123456789":
+            match = JSON_NUMBER_REGEX.fullmatch(stripped)
+            if match is not None:
+                integer, fraction, exponent = match.groups()
+                if fraction or exponent:
+                    return float(integer + (fraction or "") + (exponent or ""))
+                return int(integer)
+            if stripped != "-Infinity":
+                return value
+        elif stripped in JSON_CONSTANTS:
+            return JSON_CONSTANTS[stripped]
+        elif first not in '"[{' and stripped not in ("NaN", "Infinity"):
+            return value
+
         try:
             return self.decoder.decode(value)
         except ValueError:
             return value
 
 
-def _tomli_parse_value(loader, value):
-    return loader._parser.parse_value(value, 0, float)[1]
+def _tomli_decoder(loader):
+    parse_value = loader._parser.parse_value
+
+    def decode(value):
+        pos, result = parse_value(value, 0, float)
+        if value[pos:].strip(TOML_WHITESPACE):
+            raise ValueError("Unexpected trailing content: {}".format(value))
+        return result
+
+    return decode
 
 
-def _toml_parse_value(loader, value):
+def _toml_decoder(loader):
     decoder = loader.TomlDecoder()
-    return decoder.load_value(value)[0]
+
+    def decode(value):
+        return decoder.load_value(value)[0]
+
+    return decode
 
 
 class TomlLoader:
+    json_compatible = False
+
     _packages = [
-        ("tomllib", _tomli_parse_value),
-        ("tomli", _tomli_parse_value),
-        ("toml", _toml_parse_value),
+        ("tomllib", _tomli_decoder),
+        ("tomli", _tomli_decoder),
+        ("toml", _toml_decoder),
     ]
 
     def __init__(self):
@@ -66,7 +137,7 @@ class TomlLoader:
             except ImportError:
                 continue
             else:
-                decoder = package_decoder
+                decoder = package_decoder(loader)
                 break
 
         if loader is None:
@@ -85,10 +156,45 @@ class TomlLoader:
         return self.loader.loads(value)
 
     def load_value(self, value):
+        """Decode `value` as a toml value, or return it as-is if it isn't one.
+
+        As with `JsonLoader.load_value`, plain strings and simple scalars are classified
+        without the decoder. Values are only decoded if the whole value is valid.
+
+        >>> loader = TomlLoader()
+        >>> [loader.load_value(v) for v in ["4", "true", "info", "5 apples", "[1, 2]"]]
+        [4, True, 'info', '5 apples', [1, 2]]
+        """
+        if not value:
+            return value
+
+        first = value[0]
+        if first in "+-0123456789":
+            stripped = value.rstrip(TOML_WHITESPACE)
+            if TOML_INTEGER_REGEX.fullmatch(stripped):
+                return int(stripped)
+        elif first in "tf":
+            return TOML_CONSTANTS.get(value.rstrip(TOML_WHITESPACE), value)
+        elif first in "in":
+            if value.rstrip(TOML_WHITESPACE) not in ("inf", "nan"):
+                return value
+        elif first not in "\"'[{":
+            return value
+
         try:
-            return self.decoder(self.loader, value)
+            return self.decoder(value)
         except ValueError:
             return value
 
 
 Loader = TypeVar("Loader", YamlLoader, JsonLoader, TomlLoader)
+
+
+@functools.lru_cache(maxsize=None)
+def shared_loader(loader_cls):
+    """Return the process-wide instance of `loader_cls`, constructing it on first use.
+
+    >>> shared_loader(JsonLoader) is shared_loader(JsonLoader)
+    True
+    """
+    return loader_cls()
@@ -1,64 +1,339 @@
-import re
+import functools
+import operator
 from collections.abc import Iterable, Mapping
+from time import perf_counter
 
+from configly.interpolators import Interpolator
 from configly.registry import registry
-from configly.utilities import quote_string
+from configly.template import compile_template
+from configly.utilities import NOT_JSON, quote_and_decode
 
-INTERPOLATION_REGEX = re.compile(r"(.*)\<%\s*(\w+)\[([\w.]+)(?:,\s*(.+))?\]\s*%>(.*)")
+_MISSING = object()
 
 
-def post_process(loader, value, registry=registry):
-    if isinstance(value, Mapping):
-        result = {}
-        for key, item in value.items():
-            result[key] = post_process(loader, item, registry=registry)
+class Resolver:
+    """Look up interpolated values, for the duration of a single `post_process` pass.
+
+    Each distinct value is only looked up once per pass, so a value referenced from
+    many places in a config costs a single lookup. A new pass (for example through
+    `Config.refresh`) uses a new `Resolver`, and therefore sees updated values.
+
+    Interpolators which declare a `max_concurrency` greater than 1 have their values
+    fetched up front by `prefetch`, in a single call to their `get_many`. All other
+    values are fetched one at a time, as they are encountered.
+
+    The coercion of interpolated strings into concrete values is memoized as well,
+    see `load_value`.
+    """
+
+    def __init__(self, registry=registry):
+        self.registry = registry
+
+        # (interpolator name, var name[, default]) -> value, or the raised exception.
+        self.cache = {}
+
+        # The keys of `cache` fetched by `prefetch`, and not looked up since. Their first
+        # lookup isn't a cache hit, since `prefetch` only fetched them ahead of it.
+        self.prefetched = set()
+
+        # (loader, interpolated string) -> coerced value.
+        self.values = {}
+
+    def interpolator(self, name):
+        try:
+            return self.registry.interpolators[name]
+        except KeyError:
+            raise ValueError("Unrecognized interpolator type: {}".format(name))
+
+    def lookup(self, interpolator_name, var_name, default=_MISSING):
+        """Return the value of `var_name`, raising a `KeyError` if it does not exist."""
+        key = (interpolator_name, var_name)
+        if key in self.cache:
+            cached = key not in self.prefetched
+            if not cached:
+                self.prefetched.discard(key)
+            self.registry.emit("lookup", interpolator_name, cached=cached)
+            result = self.cache[key]
+            if isinstance(result, KeyError) and default is not _MISSING:
+                return default
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        interpolator = self.interpolator(interpolator_name)
+        if default is _MISSING:
+            try:
+                with self.registry.timed("lookup", interpolator_name, cached=False):
+                    result = interpolator[var_name]
+            except KeyError as e:
+                self.cache[key] = e
+                raise
+        else:
+            # Interpolators may implement `get` differently than `__getitem__`, so its
+            # result is memoized separately, per default.
+            key = (interpolator_name, var_name, default)
+            if key in self.cache:
+                self.registry.emit("lookup", interpolator_name, cached=True)
+                return self.cache[key]
+            with self.registry.timed("lookup", interpolator_name, cached=False):
+                result = interpolator.get(var_name, default)
+
+        self.cache[key] = result
         return result
 
-    elif isinstance(value, Iterable) and not isinstance(value, str):
-        result = []
-        for item in value:
-            result.append(post_process(loader, item, registry=registry))
+    def load_value(self, loader, value):
+        """Coerce `value` through `loader.load_value`, memoized by the `value` string.
+
+        Only hashable (and therefore immutable) results are memoized, since a memoized
+        result is shared by every value coerced from the same string.
+        """
+        key = (loader, value)
+        try:
+            result = self.values[key]
+        except KeyError:
+            pass
+        else:
+            self.registry.emit("coerce", type(loader).__name__, cached=True)
+            return result
+
+        with self.registry.timed("coerce", type(loader).__name__, cached=False):
+            result = loader.load_value(value)
+        try:
+            hash(result)
+        except TypeError:
+            return result
+
+        self.values[key] = result
         return result
 
-    else:
-        # Repeatedly evaluate the string until there are no interpolation blocks
-        while True:
-            # The post-interpolation of previous values might coerce them into
-            # concrete values, on which no further processing is necessary.
-            if not isinstance(value, str):
-                break
+    def invalidate(self, interpolators=None):
+        """Forget the memoized values of the given `interpolators` (by name), or all of them."""
+        if interpolators is None:
+            self.cache.clear()
+            self.prefetched.clear()
+            return
 
-            match = re.match(INTERPOLATION_REGEX, value)
-            if not match:
-                break
+        for key in [key for key in self.cache if key[0] in interpolators]:
+            del self.cache[key]
+            self.prefetched.discard(key)
 
-            groups = match.groups()
-            pre, interpolation_type, var_name, default, post = groups
-
-            if interpolation_type not in registry.interpolators:
-                raise ValueError("Unrecognized interpolator type: {}".format(interpolation_type))
-
-            interpolator = registry.interpolators[interpolation_type]
-            if default is None:
-                try:
-                    var_value = interpolator[var_name]
-                except KeyError:
-                    raise ValueError(
-                        "The requested {} value '{}' was not found".format(
-                            interpolation_type.lower(), var_name
-                        )
-                    )
+    def prefetch(self, value):
+        """Concurrently fetch the values interpolated anywhere within `value`."""
+        concurrent = {
+            name: interpolator
+            for name, interpolator in self.registry.interpolators.items()
+            if getattr(interpolator, "max_concurrency", 1) > 1
+        }
+        if not concurrent:
+            return
+
+        requests = {}
+        for _, _, template in interpolated_leaves(value):
+            for interpolation in template.interpolations:
+                key = (interpolation.interpolator, interpolation.var_name)
+                if interpolation.interpolator in concurrent and key not in self.cache:
+                    var_names = requests.setdefault(interpolation.interpolator, {})
+                    var_names[interpolation.var_name] = None
+
+        batches = [
+            (name, list(var_names)) for name, var_names in requests.items() if len(var_names) > 1
+        ]
+        if not batches:
+            return
+
+        # Each interpolator's batch is fetched in parallel with those of other interpolators.
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=len(batches)) as executor:
+            for (name, _), (results, duration) in zip(
+                batches, executor.map(self._fetch_batch, batches)
+            ):
+                self.registry.emit("prefetch", name, duration)
+                for var_name, result in results.items():
+                    self.cache[(name, var_name)] = result
+                    self.prefetched.add((name, var_name))
+
+    def _fetch_batch(self, batch):
+        """Return the results of a batch, and the time it took to fetch them."""
+        start = perf_counter()
+        results = self._fetch_results(batch)
+        return results, perf_counter() - start
+
+    def _fetch_results(self, batch):
+        name, var_names = batch
+        interpolator = self.registry.interpolators[name]
+
+        get_many = getattr(interpolator, "get_many", None)
+        if get_many is None:
+            get_many = functools.partial(Interpolator.get_many, interpolator)
+
+        try:
+            values = get_many(var_names)
+        except Exception as e:
+            return {var_name: e for var_name in var_names}
+
+        return {
+            var_name: values[var_name] if var_name in values else KeyError(var_name)
+            for var_name in var_names
+        }
+
+
+def interpolated_leaves(value):
+    """Yield the path, value and compiled template of every interpolated string in `value`.
+
+    >>> list(interpolated_leaves({"a": ["b", "<% ENV[c] %>"]}))
+    [(('a', 1), '<% ENV[c] %>', Template((Interpolation('ENV', 'c', None),)))]
+    """
+    stack = [((), value)]
+    while stack:
+        path, value = stack.pop()
+        if isinstance(value, Mapping):
+            stack.extend((path + (key,), item) for key, item in value.items())
+        elif isinstance(value, str):
+            if "<%" in value:
+                template = compile_template(value)
+                if template.interpolations:
+                    yield path, value, template
+        elif isinstance(value, (list, tuple)):
+            stack.extend((path + (index,), item) for index, item in enumerate(value))
+
+
+def post_process(loader, value, registry=registry, resolver=None):
+    """Interpolate every value within `value`.
+
+    `value` is traversed iteratively, so deeply nested values can't exceed the recursion
+    limit. Only containers which (transitively) hold an interpolated value are rebuilt.
+    Other dicts and lists are shared with `value`, rather than copied.
+
+    >>> from configly.loaders import JsonLoader
+    >>> value = {"a": ["b"], "c": {"d": "<% ENV[e, f] %>"}}
+    >>> result = post_process(JsonLoader(), value)
+    >>> result
+    {'a': ['b'], 'c': {'d': 'f'}}
+    >>> result["a"] is value["a"], result["c"] is value["c"]
+    (True, False)
+    """
+    prefetch = resolver is None
+    if prefetch:
+        resolver = Resolver(registry)
+
+    with resolver.registry.timed("interpolate"):
+        if prefetch:
+            resolver.prefetch(value)
+        return _post_process(loader, value, resolver)
+
+
+def _post_process(loader, value, resolver):
+    if not _is_container(value):
+        return interpolate(loader, value, resolver=resolver)
+
+    # Frames hold a container, its keys (if a mapping), its items, an iterator over its
+    # items, and the results of those processed so far.
+    stack = [_frame(value)]
+    while True:
+        container, keys, items, remaining, results = stack[-1]
+        for item in remaining:
+            if isinstance(item, str):
+                if "<%" in item:
+                    item = interpolate(loader, item, resolver=resolver)
+                results.append(item)
+            elif _is_container(item):
+                stack.append(_frame(item))
+                break
             else:
-                var_value = interpolator.get(var_name, default)
+                results.append(item)
+        else:
+            stack.pop()
+            if type(container) in (dict, list) and all(map(operator.is_, results, items)):
+                result = container
+            elif keys is None:
+                result = results
+            else:
+                result = dict(zip(keys, results))
+
+            if not stack:
+                return result
+            stack[-1][4].append(result)
+
 
-            result = pre + var_value + post
-            if len(result) and not result[0].isalnum():
-                # If the first character of `pre` is not alphanumeric, safely quote the result.
-                result = quote_string(result)
+def _is_container(value):
+    if isinstance(value, Mapping):
+        return True
+    return isinstance(value, Iterable) and not isinstance(value, str)
+
+
+def _frame(container):
+    if isinstance(container, Mapping):
+        keys, items = list(container.keys()), list(container.values())
+    else:
+        keys, items = None, container if type(container) is list else list(container)
+    return container, keys, items, iter(items), []
+
+
+def interpolate(loader, value, resolver):
+    """Evaluate the interpolation blocks of a single (non-container) value."""
+    # Repeatedly evaluate the string until there are no interpolation blocks, since
+    # interpolated values may themselves contain interpolation blocks.
+    while isinstance(value, str) and "<%" in value:
+        template = compile_template(value)
+        if not template.interpolations:
+            break
+
+        result, yaml_safe = render(template, resolver)
+        decoded = NOT_JSON
+        if len(result) and not result[0].isalnum():
+            # If the first character of the result is not alphanumeric, safely quote it.
+            result, decoded = quote_and_decode(result)
 
-            if getattr(interpolator, "yaml_safe", True):
-                value = loader.load_value(result)
+        # The post-interpolation value might be coerced into a concrete value, on
+        # which no further processing is necessary.
+        if yaml_safe:
+            if decoded is not NOT_JSON and getattr(loader, "json_compatible", False):
+                # Quoting already decoded the value, so it needn't be parsed again.
+                value = decoded
             else:
-                value = result
+                value = resolver.load_value(loader, result)
+        else:
+            value = result
+
+    return value
+
+
+def render(template, resolver):
+    """Join the segments of a `template` into a string.
+
+    Returns the rendered string, and whether every interpolator which contributed to
+    it is `yaml_safe`.
+    """
+    parts = []
+    yaml_safe = True
+    for segment in template.segments:
+        if isinstance(segment, str):
+            parts.append(segment)
+            continue
+
+        interpolation_type = segment.interpolator
+        interpolator = resolver.interpolator(interpolation_type)
+        default = segment.default
+        if default is None:
+            try:
+                var_value = resolver.lookup(interpolation_type, segment.var_name)
+            except KeyError:
+                raise ValueError(
+                    "The requested {} value '{}' was not found".format(
+                        interpolation_type.lower(), segment.var_name
+                    )
+                )
+        elif default.literal is not None:
+            var_value = resolver.lookup(interpolation_type, segment.var_name, default.literal)
+        else:
+            # Nested interpolations within a default are only evaluated when needed.
+            try:
+                var_value = resolver.lookup(interpolation_type, segment.var_name)
+            except KeyError:
+                var_value, _ = render(default, resolver)
+
+        parts.append(var_value)
+        yaml_safe = yaml_safe and getattr(interpolator, "yaml_safe", True)
 
-        return value
+    return "".join(parts), yaml_safe
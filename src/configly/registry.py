@@ -17,6 +17,9 @@ class Registry:
     def __init__(self):
         self._interpolators = {}
 
+        # Instrumentation hooks, see `add_hook`.
+        self._hooks = ()
+
     @property
     def interpolators(self):
         return MappingProxyType(self._interpolators)
@@ -45,6 +48,59 @@ class Registry:
 
         self._interpolators[name] = instance
 
+    def add_hook(self, hook):
+        """Add an instrumentation hook, called with an `Event` for every timed step.
+
+        Configs loaded through the registry time reading and parsing their files, each
+        interpolator lookup and each coercion of an interpolated value. See
+        `configly.instrumentation.Event` for the events, and
+        `configly.instrumentation.Collector` to aggregate them.
+        """
+        self._hooks = self._hooks + (hook,)
+
+    def remove_hook(self, hook):
+        self._hooks = tuple(h for h in self._hooks if h != hook)
+
+    @property
+    def instrumented(self):
+        """Whether any instrumentation hooks were added."""
+        return bool(self._hooks)
+
+    def emit(self, phase, name=None, duration=0.0, cached=None):
+        """Call every hook with an `Event`, if any hooks were added."""
+        if not self._hooks:
+            return
+
+        from configly.instrumentation import Event
+
+        event = Event(phase, name, duration, cached)
+        for hook in self._hooks:
+            hook(event)
+
+    def timed(self, phase, name=None, cached=None):
+        """Return a context manager, which `emit`s the duration of its block.
+
+        Without any hooks, nothing is timed.
+        """
+        if not self._hooks:
+            return _NOT_TIMED
+
+        from configly.instrumentation import Timer
+
+        return Timer(self, phase, name, cached)
+
+
+class _NotTimed:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NOT_TIMED = _NotTimed()
 
 registry = Registry()
 register_interpolator = registry.register_interpolator
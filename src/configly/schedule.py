@@ -0,0 +1,169 @@
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+import weakref
+
+logger = logging.getLogger(__name__)
+
+
+class Schedule:
+    """The refresh state of a single interpolator, for a single scheduled config."""
+
+    def __init__(self, config, name, interval):
+        self.config = weakref.ref(config)
+        self.key = id(config)
+        self.name = name
+        self.interval = interval
+        self.failures = 0
+        self.due = None
+
+
+class Scheduler:
+    """Refresh configs' interpolated values in the background, from a single thread.
+
+    Each interpolator a config is scheduled with is refreshed every `interval` seconds
+    (see `Config.schedule`), through `Config.refresh(interpolators=...)`, so values of
+    other interpolators are left alone. Interpolators due at the same time are
+    refreshed together.
+
+    Every delay (including the first) is randomly spread by up to `jitter` (a fraction
+    of the delay), so that processes started together don't refresh in lockstep.
+
+    A refresh which fails leaves the config's values as they were, and is retried after
+    `backoff` seconds, doubling on every consecutive failure, up to the interpolator's
+    own interval.
+    """
+
+    def __init__(self, jitter=0.1, backoff=1.0):
+        self.jitter = jitter
+        self.backoff = backoff
+
+        # id(config) -> {interpolator name: `Schedule`}.
+        self._schedules = {}
+
+        # (due, sequence, `Schedule`), the sequence breaking ties between equal due times.
+        self._queue = []
+        self._sequence = itertools.count()
+        self._random = random.Random()
+
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def __contains__(self, config):
+        return id(config) in self._schedules
+
+    def schedule(self, config, intervals):
+        if config._lazy:
+            raise ValueError(
+                "Lazy configs can't be scheduled, as values which failed to refresh "
+                "wouldn't be kept."
+            )
+
+        interpolators = config._registry.interpolators
+        unknown = sorted(name for name in intervals if name not in interpolators)
+        if unknown:
+            raise ValueError("Unknown interpolator(s): {}.".format(", ".join(unknown)))
+
+        now = time.monotonic()
+        schedules = {}
+        for name, interval in intervals.items():
+            if not interval:
+                # Never refreshed, such as `ENV` values.
+                continue
+
+            schedule = Schedule(config, name, interval)
+            schedule.due = now + self._delay(interval)
+            schedules[name] = schedule
+
+        with self._condition:
+            self._schedules[id(config)] = schedules
+            for schedule in schedules.values():
+                self._push(schedule)
+
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="configly-scheduler", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+
+    def unschedule(self, config):
+        with self._condition:
+            self._schedules.pop(id(config), None)
+            self._condition.notify()
+
+    def _push(self, schedule):
+        heapq.heappush(self._queue, (schedule.due, next(self._sequence), schedule))
+
+    def _delay(self, delay):
+        return delay * (1 + self._random.uniform(-self.jitter, self.jitter))
+
+    def _run(self):
+        while True:
+            with self._condition:
+                due = self._pop_due()
+                while not due:
+                    if not self._queue:
+                        self._thread = None
+                        return
+
+                    self._condition.wait(self._queue[0][0] - time.monotonic())
+                    due = self._pop_due()
+
+            # Group the interpolators due for the same config, into a single refresh.
+            by_config = {}
+            for schedule in due:
+                by_config.setdefault(schedule.key, []).append(schedule)
+
+            for schedules in by_config.values():
+                self._refresh(schedules)
+
+    def _pop_due(self):
+        """Pop the schedules which are due, dropping those which were unscheduled."""
+        now = time.monotonic()
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            _, _, schedule = heapq.heappop(self._queue)
+            if self._schedules.get(schedule.key, {}).get(schedule.name) is not schedule:
+                continue
+
+            if schedule.config() is None:
+                self._schedules.pop(schedule.key, None)
+                continue
+            due.append(schedule)
+        return due
+
+    def _refresh(self, schedules):
+        config = schedules[0].config()
+        names = [schedule.name for schedule in schedules]
+
+        if config is None:
+            return
+
+        try:
+            with config._lock:
+                if config._interpolated_leaves(names):
+                    config.refresh(interpolators=names)
+        except Exception:
+            logger.exception("Unable to refresh values from %s", ", ".join(names))
+            failed = True
+        else:
+            failed = False
+
+        now = time.monotonic()
+        with self._condition:
+            for schedule in schedules:
+                if failed:
+                    schedule.failures += 1
+                    delay = min(self.backoff * 2 ** (schedule.failures - 1), schedule.interval)
+                else:
+                    schedule.failures = 0
+                    delay = schedule.interval
+                schedule.due = now + self._delay(delay)
+                self._push(schedule)
+
+
+scheduler = Scheduler()
@@ -0,0 +1,279 @@
+import codecs
+import io
+import json
+import mmap
+import os
+import re
+import weakref
+from collections.abc import Mapping
+
+from configly.loaders import JsonLoader, YamlLoader
+
+JSON_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+JSON_STRING_REGEX = re.compile(JSON_STRING, re.DOTALL)
+
+
+def _json_content(depth):
+    """Return a pattern matching json up to the next unbalanced bracket.
+
+    Strings, and containers nested up to `depth` levels deep, are skipped over whole.
+    Each alternative starts with a distinct character, so a failed match can't
+    backtrack catastrophically.
+    """
+    plain = rb'[^"{}\[\]]*'
+    special = JSON_STRING
+    if depth:
+        inner = _json_content(depth - 1)
+        special += rb"|\{" + inner + rb"\}|\[" + inner + rb"\]"
+    return plain + rb"(?:(?:" + special + rb")" + plain + rb")*"
+
+
+# Everything up to the next unmatched bracket, see `_json_value_end`.
+JSON_CONTENT_REGEX = re.compile(_json_content(2), re.DOTALL)
+JSON_SCALAR_REGEX = re.compile(rb"[^,}\]\s]*")
+JSON_WHITESPACE_REGEX = re.compile(rb"[ \t\n\r]*")
+
+# Lines starting at the first column, each of which starts a top-level section.
+YAML_LINE_REGEX = re.compile(rb"^[^ \t\r\n#][^\r\n]*", re.MULTILINE)
+YAML_KEY_REGEX = re.compile(
+    rb"""(
+        "(?:[^"\\\r\n]|\\.)*"
+        | '(?:[^'\r\n]|'')*'
+        | [^\s#'"?:,\[\]{}&*!|>%@`<-][^\r\n]*?
+    )[ \t]*:(?:[ \t]|$)""",
+    re.VERBOSE,
+)
+# Constructs which can't be split into independent sections: anchors and aliases
+# (which may refer across sections), merge keys, directives and multiple documents.
+YAML_UNSUPPORTED_REGEX = re.compile(rb"(?:^|[\s\[{,])[&*][^\s]|^(?:---|\.\.\.|%|<<)", re.MULTILINE)
+
+
+class Sections(Mapping):
+    """A read-only mapping of a file's top-level keys, to their values.
+
+    The file is memory-mapped and indexed on construction, without being parsed. Each
+    section (the value of a top-level key) is parsed from its byte range of the file
+    the first time it's accessed, so that sections which are never accessed never sit in
+    memory as text or objects.
+
+    Json and yaml files are supported. Documents which can't be split into independent
+    sections (such as yaml using anchors), are parsed as a whole instead.
+
+    The file should be replaced (rather than modified in place) while mapped. Sections
+    accessed after the file was modified in place raise a `ValueError`.
+
+    >>> import tempfile
+    >>> with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+    ...     _ = f.write('{"foo": 1, "bar": {"baz": [1, 2]}}')
+    >>> sections = Sections(JsonLoader(), f.name)
+    >>> list(sections)
+    ['foo', 'bar']
+    >>> sections["bar"]
+    {'baz': [1, 2]}
+    """
+
+    def __init__(self, loader, file):
+        if isinstance(loader, JsonLoader):
+            index = index_json
+        elif isinstance(loader, YamlLoader):
+            index = index_yaml
+        else:
+            raise ValueError("Only json and yaml files can be memory-mapped.")
+
+        self.loader = loader
+        self.file = file
+
+        # The file stays open, so changes to the mapped file (rather than a file which
+        # has since replaced it) can be detected, see `_check`.
+        fd = os.open(file, os.O_RDONLY)
+        weakref.finalize(self, os.close, fd)
+        self._fd = fd
+
+        stat = os.fstat(fd)
+        self._fingerprint = (stat.st_mtime_ns, stat.st_size)
+        if stat.st_size:
+            self._buffer = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        else:
+            self._buffer = b""
+
+        start = len(codecs.BOM_UTF8) if self._buffer[:3] == codecs.BOM_UTF8 else 0
+
+        # key -> (start, end) byte offsets, or None once parsed into `_values`.
+        spans = index(self._buffer, start, loader)
+        self._values = {}
+        if spans is None:
+            self._load_all()
+        else:
+            self._spans = spans
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+
+        span = self._spans[key]
+        self._check()
+
+        start, end = span
+        text = self._buffer[start:end].decode("utf-8")
+        if isinstance(self.loader, JsonLoader):
+            value = self.loader.loads(text)
+        else:
+            try:
+                result = self.loader.loads(text)
+            except Exception:
+                result = None
+
+            if not isinstance(result, Mapping) or list(result) != [key]:
+                # The section's boundaries were misidentified, so the file is loaded as a
+                # whole instead (which raises any error in the file itself).
+                self._load_all()
+                return self._values[key]
+            value = result[key]
+
+        self._values[key] = value
+        return value
+
+    def __contains__(self, key):
+        return key in self._spans
+
+    def __iter__(self):
+        return iter(self._spans)
+
+    def __len__(self):
+        return len(self._spans)
+
+    def __repr__(self):
+        return "{}({!r})".format(self.__class__.__name__, self.file)
+
+    @property
+    def parsed(self):
+        """The sections parsed so far, as a dict."""
+        return dict(self._values)
+
+    def _check(self):
+        stat = os.fstat(self._fd)
+        if (stat.st_mtime_ns, stat.st_size) != self._fingerprint:
+            raise ValueError(
+                "{} was modified after being loaded, it must be reloaded.".format(self.file)
+            )
+
+    def _load_all(self):
+        self._check()
+        value = self.loader.load(io.BytesIO(self._buffer[:]))
+        if value is None:
+            value = {}
+
+        if not isinstance(value, Mapping):
+            raise ValueError("Only files containing a mapping can be memory-mapped.")
+
+        self._values = dict(value)
+        self._spans = dict.fromkeys(value)
+
+
+def index_json(buffer, pos, loader=None):
+    """Return the byte range of the value of each top-level key of a json object.
+
+    Returns `None` for anything but a well-formed object.
+
+    >>> index_json(b'{"a": {"b": "}"}, "c": 1}', 0)
+    {'a': (6, 16), 'c': (23, 24)}
+    """
+    pos = _skip_whitespace(buffer, pos)
+    if _char(buffer, pos) != b"{":
+        return None
+
+    spans = {}
+    pos = _skip_whitespace(buffer, pos + 1)
+    if _char(buffer, pos) == b"}":
+        return spans
+
+    while True:
+        match = JSON_STRING_REGEX.match(buffer, pos)
+        if match is None:
+            return None
+        key = json.loads(match.group().decode("utf-8"))
+
+        pos = _skip_whitespace(buffer, match.end())
+        if _char(buffer, pos) != b":":
+            return None
+
+        start = _skip_whitespace(buffer, pos + 1)
+        end = _json_value_end(buffer, start)
+        if end is None:
+            return None
+        spans[key] = (start, end)
+
+        pos = _skip_whitespace(buffer, end)
+        char = _char(buffer, pos)
+        if char == b"}":
+            return spans
+        if char != b",":
+            return None
+        pos = _skip_whitespace(buffer, pos + 1)
+
+
+def _json_value_end(buffer, pos):
+    char = _char(buffer, pos)
+    if char == b'"':
+        match = JSON_STRING_REGEX.match(buffer, pos)
+        return match and match.end()
+
+    if char not in (b"{", b"["):
+        end = JSON_SCALAR_REGEX.match(buffer, pos).end()
+        return end if end > pos else None
+
+    depth = 0
+    while True:
+        char = _char(buffer, pos)
+        if not char:
+            return None
+
+        depth += 1 if char in b"{[" else -1
+        pos += 1
+        if depth == 0:
+            return pos
+        pos = JSON_CONTENT_REGEX.match(buffer, pos).end()
+
+
+def _char(buffer, pos):
+    end = pos + 1
+    return buffer[pos:end]
+
+
+def _skip_whitespace(buffer, pos):
+    return JSON_WHITESPACE_REGEX.match(buffer, pos).end()
+
+
+def index_yaml(buffer, pos, loader):
+    r"""Return the byte range of each top-level key's section of a yaml block mapping.
+
+    Each section spans from its key's line, up to the next key's line. Returns `None` if
+    the document can't be split into sections which can be parsed independently.
+
+    >>> index_yaml(b"a:\n  b: 1\n# c\n'd': 2\n", 0, YamlLoader())
+    {'a': (0, 14), 'd': (14, 21)}
+    """
+    if YAML_UNSUPPORTED_REGEX.search(buffer, pos):
+        return None
+
+    starts = []
+    for line in YAML_LINE_REGEX.finditer(buffer, pos):
+        match = YAML_KEY_REGEX.match(line.group())
+        if match is None:
+            return None
+        starts.append((line.start(), match.group(1)))
+
+    spans = {}
+    ends = [start for start, _ in starts[1:]] + [len(buffer)]
+    for (start, key_text), end in zip(starts, ends):
+        # Keys are parsed by the loader itself, to handle quoting and non-string keys.
+        key = next(iter(loader.loads(key_text.decode("utf-8") + ": null")))
+        if key in spans:
+            return None
+        spans[key] = (start, end)
+
+    if not spans and buffer[pos:].strip():
+        return None
+    return spans
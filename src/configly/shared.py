@@ -0,0 +1,100 @@
+import mmap
+import os
+import pickle  # nosec
+import struct
+import tempfile
+
+MAGIC = b"configly"
+
+# The magic bytes, the generation, and the length of the pickled values which follow.
+HEADER = struct.Struct(">8sQQ")
+
+
+class SharedSnapshot:
+    """A config's resolved values, published to a file for other processes to attach to.
+
+    A parent process `publish`es the values once, and each worker process `read`s them
+    back, rather than every process parsing and interpolating the config itself. Each
+    publish replaces the file as a whole, with an incremented generation in its header,
+    so checking for a newer generation only reads the header.
+
+    Placing the file on a memory-backed file system (such as `/dev/shm`) keeps it out of
+    disk entirely. The values are pickled, so the file must only be writable by trusted
+    users.
+
+    >>> import os, tempfile
+    >>> shared = SharedSnapshot(os.path.join(tempfile.mkdtemp(), "config.snapshot"))
+    >>> shared.publish({"a": 1})
+    1
+    >>> SharedSnapshot(shared.path).read()
+    (1, {'a': 1})
+    """
+
+    def __init__(self, path, attached=False):
+        self.path = path
+        self.attached = attached
+
+        # The generation last published or read, see `read`.
+        self.generation = None
+
+    def __repr__(self):
+        return "{}({!r})".format(self.__class__.__name__, self.path)
+
+    def publish(self, value):
+        """Replace the published values with `value`. Returns its generation."""
+        generation = (self.current_generation() or 0) + 1
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+        # Written to a temporary file first, so readers never see a partial snapshot.
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(HEADER.pack(MAGIC, generation, len(payload)))
+                f.write(payload)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+        self.generation = generation
+        return generation
+
+    def current_generation(self):
+        """Return the generation of the published values, or `None` if there are none."""
+        try:
+            with open(self.path, "rb") as f:
+                header = f.read(HEADER.size)
+        except FileNotFoundError:
+            return None
+        return _unpack(header, self.path)[0]
+
+    def read(self):
+        """Return the published generation and values, or `None` if already read."""
+        with open(self.path, "rb") as f:
+            header = f.read(HEADER.size)
+            generation, size = _unpack(header, self.path)
+            if generation == self.generation:
+                return None
+
+            # The values are unpickled straight out of the page cache, without first
+            # being copied into a bytes object.
+            start = HEADER.size
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                if len(buffer) != start + size:
+                    raise ValueError("{} is truncated.".format(self.path))
+                with memoryview(buffer) as view, view[start:] as payload:
+                    value = pickle.loads(payload)  # nosec
+
+        self.generation = generation
+        return generation, value
+
+
+def _unpack(header, path):
+    if len(header) != HEADER.size:
+        raise ValueError("{} is not a published config.".format(path))
+
+    magic, generation, size = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError("{} is not a published config.".format(path))
+    return generation, size
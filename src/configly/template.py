@@ -0,0 +1,172 @@
+import functools
+import re
+
+HEAD_REGEX = re.compile(r"<%\s*(\w+)\[([\w.]+)(?:(\]\s*%>)|,)")
+TAIL_REGEX = re.compile(r"\]\s*%>")
+
+
+class Interpolation:
+    """A single `<% NAME[var_name, default] %>` block of a template."""
+
+    __slots__ = ("interpolator", "var_name", "default")
+
+    def __init__(self, interpolator, var_name, default=None):
+        self.interpolator = interpolator
+        self.var_name = var_name
+        self.default = default
+
+    def __eq__(self, other):
+        if not isinstance(other, Interpolation):
+            return NotImplemented
+        return (self.interpolator, self.var_name, self.default) == (
+            other.interpolator,
+            other.var_name,
+            other.default,
+        )
+
+    def __repr__(self):
+        return "{0.__class__.__name__}({0.interpolator!r}, {0.var_name!r}, {0.default!r})".format(
+            self
+        )
+
+
+class Template:
+    """A string value, split into its literal and interpolated segments.
+
+    The `default` of an interpolation is itself a `Template`, so interpolations may be
+    nested within the default of another.
+
+    >>> compile_template("a<% ENV[b, 1] %>c")
+    Template(('a', Interpolation('ENV', 'b', Template(('1',))), 'c'))
+    """
+
+    __slots__ = ("segments", "interpolations", "interpolator_names")
+
+    def __init__(self, segments):
+        self.segments = tuple(segments)
+        self.interpolations = tuple(s for s in self.segments if isinstance(s, Interpolation))
+
+        # The names of every interpolator used, including within defaults.
+        names = set()
+        for interpolation in self.interpolations:
+            names.add(interpolation.interpolator)
+            if interpolation.default is not None:
+                names.update(interpolation.default.interpolator_names)
+        self.interpolator_names = frozenset(names)
+
+    def walk(self):
+        """Yield every interpolation of the template, including those within defaults."""
+        for interpolation in self.interpolations:
+            yield interpolation
+            if interpolation.default is not None:
+                yield from interpolation.default.walk()
+
+    @property
+    def literal(self):
+        """Return the template's text, when it has no interpolations.
+
+        >>> compile_template("foo").literal
+        'foo'
+        >>> compile_template("<% ENV[foo] %>").literal is None
+        True
+        """
+        if self.interpolations:
+            return None
+        return "".join(self.segments)
+
+    def __eq__(self, other):
+        if not isinstance(other, Template):
+            return NotImplemented
+        return self.segments == other.segments
+
+    def __repr__(self):
+        return "{0.__class__.__name__}({0.segments!r})".format(self)
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_template(value: str) -> Template:
+    """Tokenize `value` into a `Template`, once per distinct string.
+
+    Text which merely resembles an interpolation block is kept as a literal.
+
+    >>> compile_template("<% ENV[a, <% ENV[b] %>] %>!")
+    Template((Interpolation('ENV', 'a', Template((Interpolation('ENV', 'b', None),))), '!'))
+
+    >>> compile_template("<% ENV[a,] %>")
+    Template(('<% ENV[a,] %>',))
+    """
+    segments, _ = _parse(value, 0, nested=False)
+    return Template(segments)
+
+
+def _parse(source, pos, nested):
+    segments = []
+    literal_start = pos
+
+    while True:
+        start = source.find("<%", pos)
+
+        if nested:
+            # Within a default, the first unmatched `] %>` closes the enclosing block.
+            tail = TAIL_REGEX.search(source, pos)
+            if tail is None:
+                return None, pos
+
+            end = tail.start()
+            if start == -1 or end < start:
+                _append_literal(segments, source[literal_start:end])
+                return segments, tail.end()
+
+        if start == -1:
+            break
+
+        head = HEAD_REGEX.match(source, start)
+        if head is None:
+            pos = start + 2
+            continue
+
+        interpolator, var_name, closed = head.groups()
+        if closed:
+            default = None
+            end = head.end()
+        else:
+            default_segments, end = _parse(source, head.end(), nested=True)
+            default_segments = _strip_default(default_segments)
+            if not default_segments:
+                pos = start + 2
+                continue
+            default = Template(default_segments)
+
+        _append_literal(segments, source[literal_start:start])
+        segments.append(Interpolation(interpolator, var_name, default))
+        pos = literal_start = end
+
+    _append_literal(segments, source[literal_start:])
+    return segments, len(source)
+
+
+def _append_literal(segments, literal):
+    if not literal:
+        return
+
+    if segments and isinstance(segments[-1], str):
+        segments[-1] += literal
+    else:
+        segments.append(literal)
+
+
+def _strip_default(segments):
+    """Drop the whitespace following the comma which precedes a default.
+
+    A default consisting solely of whitespace retains a single character of it.
+    """
+    if not segments or not isinstance(segments[0], str):
+        return segments
+
+    first = segments[0]
+    stripped = first.lstrip()
+    if stripped:
+        return [stripped] + segments[1:]
+    if len(segments) > 1:
+        return segments[1:]
+    return [first[-1]]
@@ -0,0 +1,273 @@
+import dataclasses
+import functools
+import keyword
+import types
+import typing
+from collections.abc import Mapping
+
+_MISSING = object()
+
+TRUE_STRINGS = frozenset(["true", "yes", "on", "1"])
+FALSE_STRINGS = frozenset(["false", "no", "off", "0"])
+
+# The type of PEP 604 unions (such as `int | None`), on python 3.10+.
+UnionType = getattr(types, "UnionType", None)
+
+
+class Accessor(Mapping):
+    """Base class of the classes generated by `build`, one per distinct set of keys.
+
+    Each key is stored in a slot, so that attribute access is a plain slot read. Keys
+    which aren't valid attribute names (or which clash with the names of mapping
+    methods, such as `items`) are only accessible by `[key]`. Accessors are read-only
+    mappings: iterating one yields its keys.
+    """
+
+    __slots__ = ()
+
+    # The keys of the mapping, and key -> the slot it's stored in.
+    _keys: typing.Tuple = ()
+    _slot_names: typing.Dict = {}
+
+    def __getitem__(self, key):
+        try:
+            slot_name = self._slot_names[key]
+        except (KeyError, TypeError):
+            raise KeyError("'{}' not found in: {}.".format(key, self))
+        return getattr(self, slot_name)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("{} is read-only.".format(self.__class__.__name__))
+
+    def __reduce__(self):
+        return (_rebuild, (self._keys, tuple(self[key] for key in self._keys)))
+
+    def __repr__(self):
+        return "{}({})".format(
+            self.__class__.__name__,
+            ", ".join("{}={!r}".format(key, self[key]) for key in self._keys),
+        )
+
+
+@functools.lru_cache(maxsize=1024)
+def accessor_class(keys):
+    """Return the `Accessor` subclass for the given (tuple of) keys, generated once.
+
+    >>> cls = accessor_class(("a", "b-c"))
+    >>> cls.__slots__
+    ('a', '_1')
+    """
+    slot_names = {}
+    for index, key in enumerate(keys):
+        if (
+            isinstance(key, str)
+            and key.isidentifier()
+            and not keyword.iskeyword(key)
+            and not key.startswith("_")
+            and not hasattr(Accessor, key)
+        ):
+            slot_names[key] = key
+        else:
+            slot_names[key] = "_{}".format(index)
+
+    namespace = {
+        "__slots__": tuple(slot_names.values()),
+        "_keys": keys,
+        "_slot_names": slot_names,
+    }
+    return type("TypedConfig", (Accessor,), namespace)
+
+
+def _rebuild(keys, values):
+    instance = object.__new__(accessor_class(keys))
+    for key, value in zip(keys, values):
+        object.__setattr__(instance, instance._slot_names[key], value)
+    return instance
+
+
+def build(value, schema=None):
+    """Convert a resolved config value into typed accessors, or instances of `schema`.
+
+    Without a `schema`, mappings become instances of generated `Accessor` classes, and
+    lists become tuples.
+
+    >>> config = build({"db": {"host": "localhost", "ports": [1, 2]}})
+    >>> config.db.host
+    'localhost'
+    >>> config.db.ports
+    (1, 2)
+
+    A `schema` is a dataclass (or `typing.NamedTuple`), whose fields are coerced to
+    their annotated types. Nested dataclasses, `List`, `Tuple`, `Dict` and `Optional`
+    (or other `Union`, including `int | None`) annotations are followed. Keys which
+    aren't fields are ignored.
+
+    >>> @dataclasses.dataclass
+    ... class Database:
+    ...     host: str
+    ...     port: int = 5432
+    >>> build({"host": "localhost", "port": "5433"}, Database)
+    Database(host='localhost', port=5433)
+    """
+    if schema is None:
+        return _build_accessor(value)
+    return _coerce(value, schema, ())
+
+
+def _build_accessor(value):
+    # Built bottom-up through an explicit stack, so deeply nested values can't exceed the
+    # recursion limit. Frames hold a container, its keys (if a mapping), its remaining
+    # items, and the results of those converted so far.
+    def frame(container):
+        if isinstance(container, Mapping):
+            return container, tuple(container), iter(container.values()), []
+        return container, None, iter(container), []
+
+    if not _is_container(value):
+        return value
+
+    stack = [frame(value)]
+    while True:
+        _, keys, remaining, results = stack[-1]
+        for item in remaining:
+            if _is_container(item):
+                stack.append(frame(item))
+                break
+            results.append(item)
+        else:
+            stack.pop()
+            result = tuple(results) if keys is None else _rebuild(keys, results)
+            if not stack:
+                return result
+            stack[-1][3].append(result)
+
+
+def _is_container(value):
+    return isinstance(value, (Mapping, list, tuple))
+
+
+def _coerce(value, tp, path):
+    if tp is typing.Any or tp is object:
+        return value
+
+    if dataclasses.is_dataclass(tp) or _is_namedtuple(tp):
+        return _coerce_schema(value, tp, path)
+
+    origin = getattr(tp, "__origin__", None)
+    args = getattr(tp, "__args__", None) or ()
+
+    if origin is typing.Union or (UnionType is not None and isinstance(tp, UnionType)):
+        if value is None and type(None) in args:
+            return None
+
+        errors = []
+        for arg in args:
+            if arg is type(None):
+                continue
+            try:
+                return _coerce(value, arg, path)
+            except ValueError as e:
+                errors.append(str(e))
+        raise ValueError("; ".join(errors))
+
+    if origin in (list, tuple, set, frozenset):
+        if isinstance(value, (str, bytes, Mapping)) or not isinstance(value, typing.Iterable):
+            raise _error(value, tp, path)
+
+        items = list(value)
+        if origin is tuple and args and (len(args) != 2 or args[1] is not Ellipsis):
+            if len(items) != len(args):
+                raise _error(value, tp, path)
+            return tuple(
+                _coerce(item, arg, path + (i,)) for i, (item, arg) in enumerate(zip(items, args))
+            )
+
+        item_type = args[0] if args else typing.Any
+        return origin(_coerce(item, item_type, path + (i,)) for i, item in enumerate(items))
+
+    if origin in (dict, Mapping, typing.Mapping):
+        if not isinstance(value, Mapping):
+            raise _error(value, tp, path)
+        key_type, value_type = args if args else (typing.Any, typing.Any)
+        return {
+            _coerce(key, key_type, path): _coerce(item, value_type, path + (key,))
+            for key, item in value.items()
+        }
+
+    if origin is not None or not isinstance(tp, type):
+        # Annotations which can't be checked (such as `Literal`), are passed through.
+        return value
+
+    return _coerce_type(value, tp, path)
+
+
+def _coerce_type(value, tp, path):
+    if tp is bool:
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value.lower() in TRUE_STRINGS | FALSE_STRINGS:
+            return value.lower() in TRUE_STRINGS
+        if isinstance(value, int) and value in (0, 1):
+            return bool(value)
+        raise _error(value, tp, path)
+
+    if isinstance(value, tp) and not (tp is int and isinstance(value, bool)):
+        return value
+
+    if tp in (int, float) and (isinstance(value, bool) or not isinstance(value, (str, int, float))):
+        raise _error(value, tp, path)
+    if tp is int and isinstance(value, float) and not value.is_integer():
+        raise _error(value, tp, path)
+    if tp is str and not isinstance(value, (int, float)):
+        raise _error(value, tp, path)
+
+    try:
+        return tp(value)
+    except (TypeError, ValueError):
+        raise _error(value, tp, path)
+
+
+def _coerce_schema(value, schema, path):
+    if not isinstance(value, Mapping):
+        raise _error(value, schema, path)
+
+    hints = typing.get_type_hints(schema)
+    if dataclasses.is_dataclass(schema):
+        fields = [
+            (field.name, _required(field)) for field in dataclasses.fields(schema) if field.init
+        ]
+    else:
+        fields = [(name, name not in schema._field_defaults) for name in schema._fields]
+
+    kwargs = {}
+    for name, required in fields:
+        item = value.get(name, _MISSING)
+        if item is _MISSING:
+            if required:
+                raise ValueError("{}: missing required field.".format(_dotted(path + (name,))))
+            continue
+        kwargs[name] = _coerce(item, hints.get(name, typing.Any), path + (name,))
+    return schema(**kwargs)
+
+
+def _required(field):
+    return field.default is dataclasses.MISSING and field.default_factory is dataclasses.MISSING
+
+
+def _is_namedtuple(tp):
+    return isinstance(tp, type) and issubclass(tp, tuple) and hasattr(tp, "_fields")
+
+
+def _error(value, tp, path):
+    name = getattr(tp, "__name__", None) or str(tp)
+    return ValueError("{}: expected {}, got {!r}.".format(_dotted(path), name, value))
+
+
+def _dotted(path):
+    return ".".join(str(key) for key in path) or "<root>"
@@ -1,4 +1,31 @@
+import copy
+import datetime
 import json
+from collections.abc import Mapping, Set
+from types import MappingProxyType
+from typing import List, Tuple
+
+
+class _NotStrictJson(ValueError):
+    pass
+
+
+def _unique_pairs(pairs):
+    result = dict(pairs)
+    if len(result) != len(pairs):
+        raise _NotStrictJson()
+    return result
+
+
+def _reject_constant(constant):
+    raise _NotStrictJson()
+
+
+# Decodes only json which every json compatible loader decodes identically, i.e. without
+# duplicate keys, or the `NaN`/`Infinity` extensions accepted by `json.loads`.
+_strict_decoder = json.JSONDecoder(object_pairs_hook=_unique_pairs, parse_constant=_reject_constant)
+
+NOT_JSON = object()
 
 
 def quote_string(value: str):
@@ -19,6 +46,21 @@ def quote_string(value: str):
     >>> quote_string('{"log_level": "INFO"}')
     '{"log_level": "INFO"}'
     """
+    return quote_and_decode(value)[0]
+
+
+def quote_and_decode(value: str):
+    """Quote `value` as `quote_string` does, also returning the json value it decodes to.
+
+    `value` is decoded at most once. The decoded value is `NOT_JSON` if `value` was
+    already quoted, or isn't strictly valid json (see `_strict_decoder`).
+
+    >>> quote_and_decode('{"a": [1]}')
+    ('{"a": [1]}', {'a': [1]})
+
+    >>> quote_and_decode(">foo")
+    ('">foo"', '>foo')
+    """
     if (value.startswith('"') and value.endswith('"')) or (
         value.startswith("'") and value.endswith("'")
     ):
@@ -26,13 +68,159 @@ def quote_string(value: str):
         #   Single quotes aren't always accepted as valid syntax.
         #   And just because a value is surrounded by quotes, does not mean it is correctly quoted.
         #   In that case we would rely on the user of this fn to raise a helpful error.
-        return value
+        return value, NOT_JSON
 
     try:
-        json.loads(value)
+        return value, _strict_decoder.decode(value)
+    except _NotStrictJson:
+        pass
     except json.decoder.JSONDecodeError:
         # If the value is unable to load via json.loads, this means we have to quote it
-        # and perform any necessary escaping.
-        return json.dumps(value)
+        # and perform any necessary escaping. The quoted value decodes to `value` itself.
+        return json.dumps(value), value
+
+    # Valid json, albeit with extensions which loaders might decode differently.
+    try:
+        json.loads(value)
+    except json.decoder.JSONDecodeError:
+        return json.dumps(value), value
+    return value, NOT_JSON
+
+
+def flatten(value: Mapping):
+    """Index every nested value of a mapping by its dotted path.
+
+    Each entry maps to the tuple of keys leading to the value, and the value itself.
+
+    >>> index = flatten({"a": 1, "b": {"c": 2}})
+    >>> index["b.c"]
+    (('b', 'c'), 2)
 
+    >>> sorted(index)
+    ['a', 'b', 'b.c']
+    """
+    index = {}
+    stack: List[Tuple[tuple, str, Mapping]] = [((), "", value)]
+    while stack:
+        keys, prefix, mapping = stack.pop()
+        for key, item in mapping.items():
+            item_keys = keys + (key,)
+            path = "{}{}".format(prefix, key)
+            index[path] = (item_keys, item)
+
+            if isinstance(item, Mapping):
+                stack.append((item_keys, path + ".", item))
+    return index
+
+
+# Leaf values which are immutable, and so never need to be copied.
+IMMUTABLE_TYPES = frozenset(
+    [
+        type(None),
+        bool,
+        bytes,
+        complex,
+        datetime.date,
+        datetime.datetime,
+        datetime.time,
+        float,
+        int,
+        str,
+    ]
+)
+
+
+def freeze(value):
+    """Return an immutable equivalent of `value`.
+
+    Mappings become read-only `MappingProxyType`, lists (and tuples) become tuples, and
+    sets become frozensets.
+
+    >>> frozen = freeze({"a": [1, {"b": 2}]})
+    >>> frozen["a"]
+    (1, mappingproxy({'b': 2}))
+    """
+    return _rebuild(value, _frozen_mapping, tuple, _freeze_leaf)
+
+
+def copy_tree(value):
+    """Return a deep copy of `value`, which is much faster than `copy.deepcopy`.
+
+    Containers keep their type: dicts (and subclasses such as `OrderedDict`) and lists
+    are copied, while tuples are shared unless they hold mutable items. Immutable leaf
+    values are shared rather than copied, anything else is copied with `copy.deepcopy`.
+    Unlike `copy.deepcopy`, a value referenced from multiple places is copied for each.
+
+    >>> value = {"a": [1, {"b": 2}], "c": (3, 4)}
+    >>> result = copy_tree(value)
+    >>> result == value, result["a"][1] is value["a"][1], result["c"] is value["c"]
+    (True, False, True)
+    """
+    # Each container is shallow copied, then its mutable items are replaced by copies.
+    root = [value]
+    stack = [(root, 0)]
+    while stack:
+        container, key = stack.pop()
+        item = container[key]
+        if type(item) is dict:
+            result = item.copy()
+            items = result.items()
+        elif type(item) is list:
+            result = list(item)
+            items = enumerate(result)
+        elif isinstance(item, dict):
+            # A shallow copy keeps the subclass, along with any of its attributes.
+            result = copy.copy(item)
+            items = result.items()
+        elif type(item) is tuple and all(type(i) in IMMUTABLE_TYPES for i in item):
+            continue
+        else:
+            container[key] = copy.deepcopy(item)
+            continue
+
+        container[key] = result
+        for key, item in items:
+            if type(item) not in IMMUTABLE_TYPES:
+                stack.append((result, key))
+    return root[0]
+
+
+def _frozen_mapping(items):
+    return MappingProxyType(dict(items))
+
+
+def _freeze_leaf(value):
+    if isinstance(value, Set) and not isinstance(value, frozenset):
+        return frozenset(value)
     return value
+
+
+def _rebuild(value, mapping_type, sequence_type, leaf):
+    """Rebuild the mappings and lists within `value`, iteratively."""
+    if isinstance(value, Mapping):
+        stack = [(value, list(value.keys()), iter(list(value.values())), [])]
+    elif isinstance(value, (list, tuple)):
+        stack = [(value, None, iter(value), [])]
+    else:
+        return leaf(value)
+
+    while True:
+        container, keys, remaining, results = stack[-1]
+        for item in remaining:
+            if isinstance(item, Mapping):
+                stack.append((item, list(item.keys()), iter(list(item.values())), []))
+                break
+            elif isinstance(item, (list, tuple)):
+                stack.append((item, None, iter(item), []))
+                break
+            results.append(leaf(item))
+        else:
+            stack.pop()
+            if keys is None:
+                result = sequence_type(results)
+            else:
+                result = mapping_type(zip(keys, results))
+
+            if not stack:
+                return result
+            stack[-1][3].append(result)
@@ -0,0 +1,273 @@
+import ctypes
+import ctypes.util
+import hashlib
+import logging
+import os
+import select
+import threading
+import time
+import weakref
+
+from configly.process import interpolated_leaves
+from configly.sections import Sections
+
+logger = logging.getLogger(__name__)
+
+# inotify(7) event masks.
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# Files are digested in chunks of this many bytes, so that large (for example,
+# memory-mapped) files are never read into memory whole.
+DIGEST_CHUNK_SIZE = 1 << 20
+
+
+class Inotify:
+    """A minimal binding to inotify(7), used to wake the watcher as soon as a file changes.
+
+    Directories (rather than files) are watched, so that files which are replaced
+    (by editors, or symlink swaps like kubernetes' mounted secrets) are still noticed.
+    """
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "Unable to initialize inotify")
+
+        self.libc = libc
+        self.fd = fd
+        self.directories = set()
+
+    @classmethod
+    def create(cls):
+        """Return an `Inotify`, or `None` on platforms where it is unavailable."""
+        try:
+            return cls()
+        except (AttributeError, OSError, TypeError):
+            return None
+
+    def add(self, directory):
+        if directory in self.directories:
+            return
+
+        if self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK) >= 0:
+            self.directories.add(directory)
+
+    def wait(self, timeout):
+        """Block until any watched directory changes, or `timeout` seconds pass."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if readable:
+            # The events themselves are irrelevant, the watcher stats its files regardless.
+            try:
+                while os.read(self.fd, 65536):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self):
+        os.close(self.fd)
+
+
+class Watch:
+    """The state of a single watched config."""
+
+    def __init__(self, config):
+        self.config = weakref.ref(config)
+        self.targets = watch_targets(config)
+        self.fingerprints = fingerprint(self.targets)
+        self.digest = digest(self.targets)
+        self.changed_at = None
+        self.sections = parsed_sections(config)
+
+
+class Watcher:
+    """Reload configs whenever their files change, from a single background thread.
+
+    Each config's source file is watched, along with any file it interpolates from
+    (for interpolators implementing `source_path`, such as `FILE` and `DOCKER_SECRET`).
+
+    Files are checked every `interval` seconds, or as soon as they change on platforms
+    supporting inotify. A config is reloaded once its files have stopped changing for
+    `debounce` seconds, and only if their content actually differs from the last load.
+    """
+
+    def __init__(self, interval=1.0, debounce=0.25, use_inotify=True):
+        self.interval = interval
+        self.debounce = debounce
+        self.use_inotify = use_inotify
+
+        self._watches = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def __contains__(self, config):
+        return id(config) in self._watches
+
+    def watch(self, config):
+        if not config._files():
+            raise ValueError("Only configs loaded from a file can be watched.")
+
+        watch = Watch(config)
+        with self._lock:
+            self._watches[id(config)] = watch
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="configly-watcher", daemon=True
+                )
+                self._thread.start()
+
+    def unwatch(self, config):
+        with self._lock:
+            self._watches.pop(id(config), None)
+
+    def _run(self):
+        notifier = Inotify.create() if self.use_inotify else None
+        try:
+            while True:
+                with self._lock:
+                    watches = list(self._watches.items())
+                    if not watches:
+                        self._thread = None
+                        return
+
+                pending = False
+                for key, watch in watches:
+                    pending = self._check(key, watch, notifier) or pending
+
+                timeout = self.debounce if pending else self.interval
+                if notifier is None:
+                    time.sleep(timeout)
+                else:
+                    notifier.wait(timeout)
+        finally:
+            if notifier is not None:
+                notifier.close()
+
+    def _check(self, key, watch, notifier):
+        """Reload the watched config, if due. Returns whether a reload is pending."""
+        config = watch.config()
+        if config is None:
+            with self._lock:
+                self._watches.pop(key, None)
+            return False
+
+        sections = parsed_sections(config)
+        if sections != watch.sections:
+            # Sections parsed since may interpolate from files which weren't yet watched.
+            watch.sections = sections
+            watch.targets = watch_targets(config)
+            watch.fingerprints = fingerprint(watch.targets)
+            watch.digest = digest(watch.targets)
+
+        if notifier is not None:
+            for path in watch.targets:
+                notifier.add(os.path.dirname(os.path.abspath(path)))
+
+        now = time.monotonic()
+        fingerprints = fingerprint(watch.targets)
+        if fingerprints != watch.fingerprints:
+            watch.fingerprints = fingerprints
+            watch.changed_at = now
+
+        if watch.changed_at is None:
+            return False
+
+        if now - watch.changed_at < self.debounce:
+            return True
+        watch.changed_at = None
+
+        new_digest = digest(watch.targets)
+        if new_digest == watch.digest:
+            return False
+
+        for targets in watch.targets.values():
+            for interpolator, var_name in targets:
+                invalidate = getattr(interpolator, "invalidate", None)
+                if invalidate is not None:
+                    invalidate(var_name)
+
+        try:
+            with config._lock:
+                config.reload()
+                if config._layers is not None:
+                    # Layered configs only re-merge values which changed within their layers,
+                    # so values interpolated from watched files are refreshed separately.
+                    watched = [i for targets in watch.targets.values() for i, _ in targets]
+                    names = [
+                        name
+                        for name, interpolator in config._registry.interpolators.items()
+                        if any(interpolator is i for i in watched)
+                    ]
+                    if names:
+                        config.refresh(interpolators=names)
+        except Exception:
+            logger.exception("Unable to reload config from %s", ", ".join(config._files()))
+            return False
+
+        watch.digest = new_digest
+        watch.targets = watch_targets(config)
+        watch.fingerprints = fingerprint(watch.targets)
+        watch.sections = parsed_sections(config)
+        return False
+
+
+def watch_targets(config):
+    """Return the files a config is loaded from, mapped to the interpolations reading them.
+
+    Only the sections of memory-mapped configs which were already parsed are searched.
+    """
+    targets = {file: [] for file in config._files()}
+    interpolators = config._registry.interpolators
+    src_input = config._src_input
+    if isinstance(src_input, Sections):
+        src_input = src_input.parsed
+
+    for _, _, template in interpolated_leaves(src_input):
+        for interpolation in template.walk():
+            interpolator = interpolators.get(interpolation.interpolator)
+            source_path = getattr(interpolator, "source_path", None)
+            path = source_path and source_path(interpolation.var_name)
+            if path:
+                targets.setdefault(path, []).append((interpolator, interpolation.var_name))
+    return targets
+
+
+def parsed_sections(config):
+    """Return the number of parsed sections of a memory-mapped config, or `None`."""
+    src_input = config._src_input
+    return len(src_input.parsed) if isinstance(src_input, Sections) else None
+
+
+def fingerprint(paths):
+    result = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            result[path] = None
+        else:
+            result[path] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    return result
+
+
+def digest(paths):
+    result = hashlib.sha256()
+    for path in sorted(paths):
+        result.update(os.fsencode(path) + b"\0")
+        try:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(DIGEST_CHUNK_SIZE), b""):
+                    result.update(chunk)
+        except OSError:
+            result.update(b"\0missing")
+    return result.digest()
+
+
+watcher = Watcher()
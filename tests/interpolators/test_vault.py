@@ -5,14 +5,16 @@ from unittest.mock import mock_open, patch
 import pytest
 import responses
 
+from configly.cache import TTLCache
 from configly.config import Config, post_process
 from configly.interpolators.vault import VaultInterpolator
 from configly.loaders import YamlLoader
+from configly.registry import Registry
 
 yaml = YamlLoader()
 
 
-def mock_key_value(key, value=None, status=200):
+def mock_key_value(key, value=None, status=200, lease_duration=None):
     if value is None:
         status = 404
 
@@ -21,7 +23,10 @@ def mock_key_value(key, value=None, status=200):
         value = new_value
 
     def request_callback(_):
-        return (status, {"X-Vault-Index": ""}, json.dumps({"data": json.loads(json.dumps(value))}))
+        body = {"data": json.loads(json.dumps(value))}
+        if lease_duration is not None:
+            body["lease_duration"] = lease_duration
+        return (status, {"X-Vault-Index": ""}, json.dumps(body))
 
     responses.add_callback(
         responses.GET, f"http://localhost:8200/v1/secret/{key}", callback=request_callback
@@ -79,3 +84,89 @@ def test_missing_key_default():
     input = {"bar": "<% VAULT[bar, 5] %>"}
     config = Config(post_process(yaml, input))
     assert config.bar == 5
+
+
+@responses.activate
+def test_cache_uses_lease_duration():
+    now = 0
+    update = mock_key_value("bar", 4, lease_duration=60)
+    vault = VaultInterpolator(cache=TTLCache(timer=lambda: now))
+
+    assert vault["bar"] == "4"
+    update(5)
+    assert vault["bar"] == "4"
+    assert len(responses.calls) == 1
+
+    now = 61
+    assert vault["bar"] == "5"
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_cache_without_lease_duration():
+    update = mock_key_value("bar", 4)
+    vault = VaultInterpolator(cache=TTLCache())
+
+    assert vault["bar"] == "4"
+    update(5)
+    assert vault["bar"] == "5"
+
+
+@responses.activate
+def test_cache_configured_ttl():
+    now = 0
+    update = mock_key_value("bar", 4)
+    vault = VaultInterpolator(cache=TTLCache(ttl=10, timer=lambda: now))
+
+    assert vault["bar"] == "4"
+    update(5)
+    now = 9
+    assert vault["bar"] == "4"
+    now = 10
+    assert vault["bar"] == "5"
+
+
+@responses.activate
+def test_cache_missing_key():
+    mock_key_value("bar", status=404)
+    vault = VaultInterpolator(cache=TTLCache(ttl=10))
+
+    with pytest.raises(KeyError):
+        vault["bar"]
+    with pytest.raises(KeyError):
+        vault["bar"]
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_get_many():
+    mock_key_value("foo", 1)
+    mock_key_value("bar", 2)
+    mock_key_value("baz", status=404)
+
+    vault = VaultInterpolator()
+    assert vault.get_many(["foo", "bar", "baz"]) == {"foo": "1", "bar": "2"}
+
+
+def test_session_pool_fits_concurrency():
+    vault = VaultInterpolator(max_concurrency=16)
+    adapter = vault.client.adapter.session.get_adapter("http://localhost:8200")
+    assert adapter._pool_maxsize == 16
+
+
+@responses.activate
+def test_post_process_fetches_in_bulk():
+    mock_key_value("foo", 1)
+    mock_key_value("bar", 2)
+
+    vault = VaultInterpolator()
+    registry = Registry()
+    registry.register_interpolator("VAULT", vault)
+
+    input = {"foo": "<% VAULT[foo] %>", "bar": ["<% VAULT[bar] %>", "<% VAULT[foo] %>"]}
+    with patch.object(vault, "get_many", wraps=vault.get_many) as get_many:
+        result = post_process(yaml, input, registry=registry)
+
+    assert result == {"foo": 1, "bar": [2, 1]}
+    get_many.assert_called_once_with(["foo", "bar"])
+    assert len(responses.calls) == 2
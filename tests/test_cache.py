@@ -0,0 +1,280 @@
+import os
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from configly.cache import FileCache, ParseCache, TTLCache
+from configly.config import Config
+from configly.interpolators import FileInterpolator
+from configly.loaders import YamlLoader
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def loader(ttl=10):
+    calls = []
+
+    def load(key):
+        calls.append(key)
+        return "{}{}".format(key, len(calls)), ttl
+
+    return load, calls
+
+
+class TestTTLCache:
+    def test_expiry(self):
+        clock = Clock()
+        cache = TTLCache(timer=clock)
+        load, calls = loader()
+
+        assert cache.get_or_load("a", load) == "a1"
+        assert cache.get_or_load("a", load) == "a1"
+        assert "a" in cache
+
+        clock.now = 10
+        assert "a" not in cache
+        assert cache.get_or_load("a", load) == "a2"
+        assert calls == ["a", "a"]
+
+    def test_no_ttl_is_not_cached(self):
+        cache = TTLCache()
+        load, calls = loader(ttl=None)
+
+        cache.get_or_load("a", load)
+        cache.get_or_load("a", load)
+        assert len(cache) == 0
+        assert calls == ["a", "a"]
+
+    def test_fixed_ttl_overrides_loaded_ttl(self):
+        clock = Clock()
+        cache = TTLCache(ttl=100, timer=clock)
+        load, calls = loader(ttl=None)
+
+        cache.get_or_load("a", load)
+        clock.now = 99
+        cache.get_or_load("a", load)
+        assert calls == ["a"]
+
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2)
+        load, calls = loader()
+
+        cache.get_or_load("a", load)
+        cache.get_or_load("b", load)
+        cache.get_or_load("a", load)
+        cache.get_or_load("c", load)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+
+    def test_stale_while_revalidate(self):
+        clock = Clock()
+        cache = TTLCache(stale_while_revalidate=5, timer=clock)
+        load, calls = loader()
+        revalidated = threading.Event()
+
+        def slow_load(key):
+            result = load(key)
+            revalidated.set()
+            return result
+
+        cache.get_or_load("a", load)
+
+        clock.now = 12
+        assert cache.get_or_load("a", slow_load) == "a1"
+        assert revalidated.wait(1)
+
+        for _ in range(100):
+            if "a" in cache:
+                break
+            time.sleep(0.01)
+        assert cache.get_or_load("a", load) == "a2"
+
+    def test_outside_stale_window(self):
+        clock = Clock()
+        cache = TTLCache(stale_while_revalidate=5, timer=clock)
+        load, calls = loader()
+
+        cache.get_or_load("a", load)
+        clock.now = 15
+        assert cache.get_or_load("a", load) == "a2"
+
+
+class TestParseCache:
+    @pytest.fixture
+    def config_file(self, tmp_path):
+        path = tmp_path / "config.yml"
+        path.write_text("foo: 1")
+        # Outside of the window in which mtimes aren't trusted.
+        os.utime(path, ns=(0, 0))
+        return path
+
+    def test_hit_skips_parsing(self, tmp_path, config_file):
+        cache = ParseCache(str(tmp_path / "cache"))
+        loader = YamlLoader()
+
+        assert cache.load(loader, str(config_file)) == {"foo": 1}
+        with patch.object(loader, "load") as load:
+            assert cache.load(loader, str(config_file)) == {"foo": 1}
+        load.assert_not_called()
+
+    def test_changed_content_is_reparsed(self, tmp_path, config_file):
+        cache = ParseCache(str(tmp_path / "cache"))
+        loader = YamlLoader()
+        cache.load(loader, str(config_file))
+
+        config_file.write_text("foo: 2")
+        assert cache.load(loader, str(config_file)) == {"foo": 2}
+
+    def test_touched_file_is_not_reparsed(self, tmp_path, config_file):
+        cache = ParseCache(str(tmp_path / "cache"))
+        loader = YamlLoader()
+        cache.load(loader, str(config_file))
+
+        os.utime(config_file, ns=(1, 1))
+        with patch.object(loader, "load") as load:
+            assert cache.load(loader, str(config_file)) == {"foo": 1}
+        load.assert_not_called()
+
+    def test_recently_modified_file_is_verified(self, tmp_path, config_file):
+        cache = ParseCache(str(tmp_path / "cache"))
+        loader = YamlLoader()
+
+        now = time.time_ns()
+        os.utime(config_file, ns=(now, now))
+        cache.load(loader, str(config_file))
+
+        # Same size and mtime, but different content.
+        config_file.write_text("foo: 3")
+        os.utime(config_file, ns=(now, now))
+        assert cache.load(loader, str(config_file)) == {"foo": 3}
+
+    def test_corrupt_entry_is_ignored(self, tmp_path, config_file):
+        directory = tmp_path / "cache"
+        cache = ParseCache(str(directory))
+        cache.load(YamlLoader(), str(config_file))
+
+        for entry in directory.iterdir():
+            entry.write_bytes(b"garbage")
+        assert cache.load(YamlLoader(), str(config_file)) == {"foo": 1}
+
+    def test_clear(self, tmp_path, config_file):
+        directory = tmp_path / "cache"
+        cache = ParseCache(str(directory))
+        cache.load(YamlLoader(), str(config_file))
+        assert len(list(directory.iterdir())) == 1
+
+        cache.clear()
+        assert len(list(directory.iterdir())) == 0
+
+    def test_from_loader(self, tmp_path, config_file):
+        cache = ParseCache(str(tmp_path / "cache"))
+        Config.from_yaml(str(config_file), parse_cache=cache)
+
+        with patch("configly.loaders.YamlLoader.load") as load:
+            config = Config.from_yaml(str(config_file), parse_cache=cache)
+        load.assert_not_called()
+        assert config.foo == 1
+
+
+class TestFileCache:
+    def write(self, path, content, mtime_ns=0):
+        path.write_text(content)
+        # Outside of the window in which mtimes aren't trusted, unless changed.
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+        return str(path)
+
+    def test_hit_skips_reading(self, tmp_path):
+        cache = FileCache()
+        path = self.write(tmp_path / "secret.txt", "one")
+
+        assert cache.read(path) == "one"
+        with patch("builtins.open") as open_:
+            assert cache.read(path) == "one"
+        open_.assert_not_called()
+
+    def test_changed_file_is_reread(self, tmp_path):
+        cache = FileCache()
+        path = self.write(tmp_path / "secret.txt", "one")
+        cache.read(path)
+
+        self.write(tmp_path / "secret.txt", "two", mtime_ns=1)
+        assert cache.read(path) == "two"
+
+    def test_recently_modified_file_is_reread(self, tmp_path):
+        cache = FileCache()
+        path = str(tmp_path / "secret.txt")
+        (tmp_path / "secret.txt").write_text("one")
+        cache.read(path)
+
+        # Same size, and (on file systems with coarse timestamps) possibly the same mtime.
+        (tmp_path / "secret.txt").write_text("two")
+        assert cache.read(path) == "two"
+
+    def test_missing_file(self, tmp_path):
+        cache = FileCache()
+        path = self.write(tmp_path / "secret.txt", "one")
+        cache.read(path)
+
+        os.remove(path)
+        with pytest.raises(FileNotFoundError):
+            cache.read(path)
+        assert len(cache) == 0
+
+    def test_bounded_by_count(self, tmp_path):
+        cache = FileCache(maxsize=2)
+        paths = [self.write(tmp_path / str(i), "x") for i in range(3)]
+        for path in paths:
+            cache.read(path)
+
+        assert len(cache) == 2
+        assert cache.size == 2
+
+    def test_bounded_by_bytes(self, tmp_path):
+        cache = FileCache(maxbytes=10)
+        small = self.write(tmp_path / "small", "x" * 4)
+        medium = self.write(tmp_path / "medium", "x" * 6)
+        large = self.write(tmp_path / "large", "x" * 11)
+
+        cache.read(small)
+        cache.read(medium)
+        assert (len(cache), cache.size) == (2, 10)
+
+        # Too large to be cached at all.
+        assert cache.read(large) == "x" * 11
+        assert (len(cache), cache.size) == (2, 10)
+
+        cache.read(small)
+        cache.read(self.write(tmp_path / "other", "x"))
+        assert (len(cache), cache.size) == (2, 5)
+
+    def test_invalidate(self, tmp_path):
+        cache = FileCache()
+        path = self.write(tmp_path / "secret.txt", "one")
+        cache.read(path)
+
+        cache.invalidate(path)
+        assert (len(cache), cache.size) == (0, 0)
+
+    def test_refresh_rereads_changed_files(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(FileInterpolator, "_cache", FileCache())
+        self.write(tmp_path / "a.txt", "a1")
+        self.write(tmp_path / "b.txt", "b1")
+
+        config = Config.from_yaml(content="a: <% FILE[a.txt] %>\nb: <% FILE[b.txt] %>")
+        self.write(tmp_path / "b.txt", "b2", mtime_ns=1)
+
+        with patch("builtins.open", wraps=open) as open_:
+            config.refresh()
+        assert config.to_dict() == {"a": "a1", "b": "b2"}
+        assert [call[0][0] for call in open_.call_args_list] == [str(tmp_path / "b.txt")]
@@ -1,9 +1,13 @@
 import textwrap
+import threading
+from collections import OrderedDict
 from unittest.mock import mock_open, patch
 
 import pytest
 
 from configly.config import Config
+from configly.layers import Change, MISSING
+from configly.registry import Registry
 
 
 def test_empty_config():
@@ -70,6 +74,80 @@ class TestConfig:
         result = Config({"foo": "bar"}).to_dict()
         assert result == {"foo": "bar"}
 
+    def test_to_dict_is_a_copy(self):
+        config = Config({"foo": {"bar": [1, {"baz": 2}]}})
+        result = config.to_dict()
+        result["foo"]["bar"][1]["baz"] = 3
+        assert config.foo.bar[1]["baz"] == 2
+
+    def test_to_dict_keeps_container_types(self):
+        value = {"t": (1, 2), "o": OrderedDict(a=[1]), "n": (1, [2])}
+        result = Config(value).to_dict()
+        assert result == value
+        assert type(result["t"]) is tuple
+        assert type(result["o"]) is OrderedDict
+        assert type(result["n"]) is tuple
+        assert result["o"]["a"] is not value["o"]["a"]
+        assert result["n"][1] is not value["n"][1]
+
+    def test_snapshot(self):
+        config = Config({"foo": {"bar": [1, {"baz": 2}]}})
+        snapshot = config.snapshot()
+        assert snapshot == {"foo": {"bar": (1, {"baz": 2})}}
+        assert config.snapshot() is snapshot
+
+        with pytest.raises(TypeError):
+            snapshot["foo"]["bar"] = 1
+
+    @patch("os.environ", new={"bar": "1"})
+    def test_snapshot_changes_on_refresh(self):
+        config = Config.from_yaml(content="foo:\n  bar: <% ENV[bar] %>\nbaz: 1")
+        foo = config.foo
+        snapshot, foo_snapshot = config.snapshot(), foo.snapshot()
+
+        with patch("os.environ", new={"bar": "2"}):
+            foo.refresh()
+
+        assert snapshot == {"foo": {"bar": 1}, "baz": 1}
+        assert config.snapshot() == {"foo": {"bar": 2}, "baz": 1}
+        assert foo_snapshot == {"bar": 1}
+        assert foo.snapshot() == {"bar": 2}
+
+    def test_snapshot_during_refresh(self):
+        entered, release = threading.Event(), threading.Event()
+
+        class BlockingInterpolator:
+            value = "1"
+
+            def __getitem__(self, name):
+                if self.value != "1":
+                    entered.set()
+                    release.wait(2)
+                return self.value
+
+            def get(self, name, default=None):
+                return self[name]
+
+        registry = Registry()
+        interpolator = BlockingInterpolator()
+        registry.register_interpolator("BLOCK", interpolator)
+        config = Config.from_yaml(content="a: <% BLOCK[a] %>", registry=registry)
+
+        interpolator.value = "2"
+        refresh = threading.Thread(target=config.refresh)
+        refresh.start()
+        assert entered.wait(2)
+
+        # Taken while the refresh is still resolving values.
+        assert config.snapshot() == {"a": 1}
+        assert config.typed().a == 1
+
+        release.set()
+        refresh.join(2)
+        assert config.to_dict() == {"a": 2}
+        assert config.snapshot() == {"a": 2}
+        assert config.typed().a == 2
+
     def test_iterable(self):
         config = Config({"foo": "bar", "bar": {"nested": 4}})
 
@@ -94,6 +172,27 @@ class TestConfig:
         with pytest.raises(KeyError):
             config["bar"]
 
+    def test_nested_lookup_is_cached(self):
+        config = Config({"foo": {"bar": {"baz": 4}}})
+        assert config.foo.bar is config.foo.bar
+        assert config["foo"] is config.foo
+
+    def test_dotted_lookup(self):
+        config = Config({"db": {"pool": {"size": 5}}, "a.b": 1})
+        assert config["db.pool.size"] == 5
+        assert config["db.pool"] == Config({"size": 5})
+        assert config["db.pool"] is config["db.pool"]
+        assert config["a.b"] == 1
+
+    def test_dotted_lookup_missing(self):
+        config = Config({"db": {"pool": {"size": 5}}})
+        with pytest.raises(KeyError):
+            config["db.pool.missing"]
+
+    def test_slots(self):
+        config = Config({"foo": "bar"})
+        assert not hasattr(config, "__dict__")
+
     def test_attribute_passthrough(self):
         config = Config({"bar": 4})
         assert list(config.items()) == [("bar", 4)]
@@ -142,3 +241,330 @@ class TestConfig:
         config.foo.refresh()
 
         assert config == Config({"foo": {"bar": 4}})
+
+    @patch(
+        "builtins.open",
+        new=mock_open(
+            read_data=textwrap.dedent(
+                """
+                foo:
+                    bar: <% ENV[bar, 4] %>
+                """
+            )
+        ),
+    )
+    def test_refresh_updates_cached_children(self):
+        config = Config.from_yaml("foo.yml")
+        foo = config.foo
+
+        with patch("os.environ", new={"bar": "5"}):
+            config.refresh()
+
+        assert config.foo is foo
+        assert foo.bar == 5
+
+    def test_refresh_by_interpolator(self):
+        content = textwrap.dedent(
+            """
+            foo:
+                bar: <% ENV[bar, 1] %>
+                baz: [a, {qux: "<% FILE[qux.txt, 2] %>"}]
+            literal: 3
+            """
+        )
+        config = Config.from_yaml(content=content)
+        assert config["foo.baz"] == ["a", {"qux": "2"}]
+
+        with patch("os.environ", new={"bar": "5"}):
+            with patch("os.path.exists", return_value=False):
+                config.refresh(interpolators=["FILE"])
+                assert config.foo.bar == 1
+
+                config.refresh(interpolators=["ENV"])
+                assert config.foo.bar == 5
+                assert config["foo.bar"] == 5
+
+    def test_refresh_failure_leaves_config_untouched(self):
+        values = {"foo": "1", "bar": "2"}
+        registry = Registry()
+        registry.register_interpolator("DICT", values)
+
+        config = Config.from_yaml(
+            content="foo: <% DICT[foo] %>\nbar: <% DICT[bar] %>\n", registry=registry
+        )
+
+        values["foo"] = "5"
+        del values["bar"]
+        with pytest.raises(ValueError):
+            config.refresh()
+
+        assert config == {"foo": 1, "bar": 2}
+
+    def test_dotted_lookup_after_child_refresh(self):
+        with patch("os.environ", new={"b": "1", "c": '{"d": 1}'}):
+            config = Config.from_yaml(content="a:\n  b: <% ENV[b] %>\n  c: <% ENV[c] %>")
+        assert config["a.b"] == 1
+        assert config["a.c.d"] == 1
+        c = config["a.c"]
+        assert config["a.c"] is c
+
+        with patch("os.environ", new={"b": "2", "c": '{"d": 2}'}):
+            config.a.refresh()
+
+        assert config.a.b == 2
+        assert config["a.b"] == 2
+        assert config["a.c"].d == 2
+        assert config["a.c.d"] == 2
+
+    def test_refresh_and_reload_dont_interleave(self, tmp_path):
+        entered, release = threading.Event(), threading.Event()
+
+        class BlockingInterpolator:
+            block = False
+
+            def __getitem__(self, name):
+                if self.block:
+                    entered.set()
+                    release.wait(2)
+                return name
+
+            def get(self, name, default=None):
+                return self[name]
+
+        registry = Registry()
+        interpolator = BlockingInterpolator()
+        registry.register_interpolator("BLOCK", interpolator)
+
+        path = tmp_path / "config.yml"
+        path.write_text("a: <% BLOCK[x] %>\nb: 1")
+        config = Config.from_yaml(str(path), registry=registry)
+
+        interpolator.block = True
+        errors = []
+
+        def run(method):
+            try:
+                method()
+            except Exception as e:
+                errors.append(e)
+
+        refresh = threading.Thread(target=run, args=(config.refresh,))
+        refresh.start()
+        assert entered.wait(2)
+
+        path.write_text("c: 2")
+        reload = threading.Thread(target=run, args=(config.reload,))
+        reload.start()
+        reload.join(0.1)
+        assert reload.is_alive()
+
+        release.set()
+        refresh.join(2)
+        reload.join(2)
+        assert errors == []
+        assert config.to_dict() == {"c": 2}
+
+    def test_refresh_interpolated_mapping(self):
+        with patch("os.environ", new={"foo": '{"bar": 1}'}):
+            config = Config.from_yaml(content="foo: <% ENV[foo] %>")
+        foo = config.foo
+
+        with patch("os.environ", new={"foo": '{"bar": 2}'}):
+            foo.refresh()
+
+        assert config.foo.bar == 2
+
+
+class TestSubscribe:
+    content = "db:\n  host: <% ENV[host] %>\n  port: 1\ncache:\n  size: <% ENV[size] %>"
+
+    @patch("os.environ", new={"host": "a", "size": "1"})
+    def test_only_changed_subtrees(self):
+        config = Config.from_yaml(content=self.content)
+        db, cache, whole = [], [], []
+        config.subscribe("db", db.append)
+        config.subscribe("cache.size", cache.append)
+        config.subscribe((), whole.append)
+
+        with patch("os.environ", new={"host": "b", "size": "1"}):
+            config.refresh()
+
+        assert db == [[Change(("db", "host"), "a", "b")]]
+        assert cache == []
+        assert whole == db
+
+    @patch("os.environ", new={"host": "a", "size": "1"})
+    def test_unchanged(self):
+        config = Config.from_yaml(content=self.content)
+        changes = []
+        config.subscribe("db", changes.append)
+
+        config.refresh()
+        assert changes == []
+
+    @patch("os.environ", new={"x": "1"})
+    def test_list_leaves(self):
+        config = Config.from_yaml(content="a:\n  - <% ENV[x] %>\n  - 2")
+        changes = []
+        config.subscribe("a", changes.append)
+
+        config.refresh()
+        assert changes == []
+
+        with patch("os.environ", new={"x": "3"}):
+            config.refresh()
+        assert changes == [[Change(("a", 0), 1, 3)]]
+
+    @patch("os.environ", new={"x": "1"})
+    def test_dotted_list_index(self):
+        config = Config.from_yaml(content="a:\n  - <% ENV[x] %>\n  - 2")
+        changes = []
+        config.subscribe("a.0", changes.append)
+        config.subscribe("a.1", changes.append)
+
+        with patch("os.environ", new={"x": "3"}):
+            config.refresh()
+        assert changes == [[Change(("a", 0), 1, 3)]]
+
+        config.unsubscribe("a.0", changes.append)
+        config.refresh()
+        assert changes == [[Change(("a", 0), 1, 3)]]
+
+    @patch("os.environ", new={"host": "a", "size": "1"})
+    def test_view_subscriptions(self):
+        config = Config.from_yaml(content=self.content)
+        db, whole = [], []
+        config.db.subscribe("host", db.append)
+        config.subscribe((), whole.append)
+
+        with patch("os.environ", new={"host": "b", "size": "1"}):
+            config.refresh()
+        assert db == [[Change(("db", "host"), "a", "b")]]
+
+        with patch("os.environ", new={"host": "c", "size": "1"}):
+            config.db.refresh()
+        assert db[1:] == whole[1:] == [[Change(("db", "host"), "b", "c")]]
+
+        config.db.unsubscribe("host", db.append)
+        with patch("os.environ", new={"host": "d", "size": "1"}):
+            config.refresh()
+        assert len(db) == 2
+        assert len(whole) == 3
+
+    @patch("os.environ", new={"host": "a", "size": "1"})
+    def test_callback_sees_updated_config(self):
+        config = Config.from_yaml(content=self.content)
+        hosts = []
+        config.subscribe("db.host", lambda changes: hosts.append(config.db.host))
+
+        with patch("os.environ", new={"host": "b", "size": "1"}):
+            config.refresh(interpolators=["ENV"])
+        assert hosts == ["b"]
+
+    def test_structural_changes(self):
+        with patch("os.environ", new={"db": '{"host": "a", "port": 1}'}):
+            config = Config.from_yaml(content="db: <% ENV[db] %>")
+
+        changes = []
+        config.subscribe("db.pool", changes.append)
+        config.subscribe("db.port", changes.append)
+
+        with patch("os.environ", new={"db": '{"host": "a", "pool": 2}'}):
+            config.refresh()
+
+        assert changes == [
+            [Change(("db", "pool"), MISSING, 2)],
+            [Change(("db", "port"), 1, MISSING)],
+        ]
+
+    @patch("os.environ", new={"host": "a", "size": "1"})
+    def test_unsubscribe(self):
+        config = Config.from_yaml(content=self.content)
+        changes = []
+        config.subscribe("db", changes.append)
+        config.unsubscribe("db", changes.append)
+
+        with patch("os.environ", new={"host": "b", "size": "1"}):
+            config.refresh()
+        assert changes == []
+
+    def test_reload(self, tmp_path):
+        path = tmp_path / "config.json"
+        path.write_text('{"a": {"b": 1}, "c": 2}')
+        config = Config.from_json(str(path))
+        changes = []
+        config.subscribe("a", changes.append)
+
+        path.write_text('{"a": {"b": 1}, "c": 3}')
+        config.reload()
+        assert changes == []
+
+        path.write_text('{"a": {"b": 2}, "c": 3}')
+        config.reload()
+        assert changes == [[Change(("a", "b"), 1, 2)]]
+
+    def test_lazy(self):
+        config = Config.from_yaml(content="a: 1", lazy=True)
+        with pytest.raises(ValueError):
+            config.subscribe("a", print)
+
+
+class TestLazyConfig:
+    content = textwrap.dedent(
+        """
+        foo:
+            bar: <% ENV[bar] %>
+        baz:
+            qux: <% ENV[qux] %>
+        """
+    )
+
+    @patch("os.environ", new={"bar": "1"})
+    def test_unaccessed_values_are_not_interpolated(self):
+        config = Config.from_yaml(content=self.content, lazy=True)
+        assert config.foo.bar == 1
+
+        with pytest.raises(ValueError):
+            config.baz.qux
+
+    @patch("os.environ", new={"bar": "1", "qux": "2"})
+    def test_values_are_memoized_until_refresh(self):
+        config = Config.from_yaml(content=self.content, lazy=True)
+        assert config.foo.bar == 1
+
+        with patch("os.environ", new={"bar": "3", "qux": "2"}):
+            assert config.foo.bar == 1
+            config.refresh()
+            assert config.foo.bar == 3
+
+    @patch("os.environ", new={"bar": "1", "qux": "2"})
+    def test_refresh_updates_held_views(self):
+        config = Config.from_yaml(content=self.content, lazy=True)
+        foo = config.foo
+        assert foo.bar == 1
+
+        with patch("os.environ", new={"bar": "3", "qux": "2"}):
+            config.refresh()
+            assert foo.bar == 3
+            assert config.to_dict() == {"foo": {"bar": 3}, "baz": {"qux": 2}}
+
+    @patch("os.environ", new={"bar": "1", "qux": "2"})
+    def test_refresh_by_interpolator(self):
+        config = Config.from_yaml(content=self.content, lazy=True)
+        assert config.foo.bar == 1
+
+        with patch("os.environ", new={"bar": "3", "qux": "2"}):
+            config.refresh(interpolators=["FILE"])
+            assert config.foo.bar == 1
+
+            config.refresh(interpolators=["ENV"])
+            assert config.foo.bar == 3
+
+    @patch("os.environ", new={"bar": "1", "qux": "2"})
+    def test_whole_config_operations(self):
+        config = Config.from_yaml(content=self.content, lazy=True)
+        assert config["baz.qux"] == 2
+        assert config.to_dict() == {"foo": {"bar": 1}, "baz": {"qux": 2}}
+        assert config.snapshot() == {"foo": {"bar": 1}, "baz": {"qux": 2}}
+        assert config == Config({"foo": {"bar": 1}, "baz": {"qux": 2}})
+        assert dict(config.foo.items()) == {"bar": 1}
@@ -0,0 +1,72 @@
+import json
+import os
+import subprocess  # nosec
+import sys
+
+import pytest
+
+import configly
+
+SOURCE_PATH = os.path.dirname(os.path.dirname(configly.__file__))
+
+
+def imported_modules(statement):
+    """Return the modules newly imported by `statement`, in a fresh interpreter."""
+    script = "; ".join(
+        [
+            "import json, sys",
+            "before = set(sys.modules)",
+            statement,
+            "print(json.dumps(sorted(set(sys.modules) - before)))",
+        ]
+    )
+    output = subprocess.check_output(  # nosec
+        [sys.executable, "-c", script], env=dict(os.environ, PYTHONPATH=SOURCE_PATH)
+    )
+    return set(json.loads(output))
+
+
+def test_import_is_minimal():
+    modules = imported_modules("import configly")
+    assert modules == {
+        "configly",
+        "configly.interpolators",
+        "configly.interpolators.env",
+        "configly.interpolators.file",
+        "configly.registry",
+    }
+
+
+def test_config_import_skips_optional_modules():
+    modules = imported_modules("from configly import Config")
+    assert "configly.config" in modules
+
+    for module in [
+        "concurrent.futures",
+        "configly.cache",
+        "configly.interpolators.docker_secret",
+        "configly.watch",
+        "ctypes",
+        "hvac",
+        "ruamel",
+        "tomli",
+        "toml",
+    ]:
+        assert module not in modules
+
+
+def test_lazy_attributes():
+    from configly.interpolators import DockerSecretInterpolator
+    from configly.interpolators.docker_secret import (
+        DockerSecretInterpolator as expected,
+    )
+
+    assert DockerSecretInterpolator is expected
+    assert "DockerSecretInterpolator" in dir(configly.interpolators)
+    assert configly.Config is configly.config.Config
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError) as e:
+        configly.Unknown
+    assert "Unknown" in str(e.value)
@@ -0,0 +1,135 @@
+import pytest
+
+from configly.cli import main
+from configly.config import Config
+from configly.instrumentation import Collector
+from configly.interpolators import EnvVarInterpolator
+from configly.registry import Registry
+
+
+class BatchInterpolator:
+    max_concurrency = 4
+
+    def __getitem__(self, name):
+        return name
+
+    def get(self, name, default=None):
+        return name
+
+    def get_many(self, names):
+        return {name: name for name in names}
+
+
+@pytest.fixture
+def registry():
+    registry = Registry()
+    registry.register_interpolator("ENV", EnvVarInterpolator)
+    return registry
+
+
+class TestHooks:
+    def test_events(self, tmp_path, monkeypatch, registry):
+        monkeypatch.setenv("A", "1")
+        path = tmp_path / "config.yml"
+        path.write_text("a: <% ENV[A] %>\nb: <% ENV[A] %>\nc: <% ENV[B, 2] %>")
+
+        events = []
+        registry.add_hook(events.append)
+        config = Config.from_yaml(str(path), registry=registry)
+        assert config.to_dict() == {"a": 1, "b": 1, "c": 2}
+
+        summary = [(event.phase, event.name, event.cached) for event in events]
+        assert summary == [
+            ("read", str(path), None),
+            ("parse", "YamlLoader", None),
+            ("lookup", "ENV", False),
+            ("coerce", "YamlLoader", False),
+            ("lookup", "ENV", True),
+            ("coerce", "YamlLoader", True),
+            ("lookup", "ENV", False),
+            ("coerce", "YamlLoader", False),
+            ("interpolate", None, None),
+        ]
+        assert all(event.duration >= 0 for event in events)
+
+    def test_prefetch(self, registry):
+        registry.register_interpolator("BATCH", BatchInterpolator())
+
+        events = []
+        registry.add_hook(events.append)
+        Config.from_json(
+            content='{"a": "<% BATCH[a] %>", "b": "<% BATCH[b] %>"}', registry=registry
+        )
+        assert [event.name for event in events if event.phase == "prefetch"] == ["BATCH"]
+
+    def test_remove_hook(self, registry):
+        events = []
+        registry.add_hook(events.append)
+        registry.remove_hook(events.append)
+
+        assert not registry.instrumented
+        Config.from_json(content='{"a": 1}', registry=registry)
+        assert events == []
+
+    def test_hook_errors_propagate(self, registry):
+        def hook(event):
+            raise RuntimeError()
+
+        registry.add_hook(hook)
+        with pytest.raises(RuntimeError):
+            Config.from_json(content='{"a": 1}', registry=registry)
+
+
+class TestCollector:
+    def test_stats(self, monkeypatch, registry):
+        monkeypatch.setenv("A", "1")
+        with Collector(registry) as collector:
+            Config.from_yaml(content="a: <% ENV[A] %>\nb: <% ENV[A] %>", registry=registry)
+        assert not registry.instrumented
+
+        lookups = collector.stats[("lookup", "ENV")]
+        assert (lookups.calls, lookups.hits, lookups.misses) == (2, 1, 1)
+        assert lookups.hit_rate == 0.5
+        assert collector.stats[("parse", "YamlLoader")].hit_rate is None
+
+    def test_prefetched_lookups(self, registry):
+        registry.register_interpolator("BATCH", BatchInterpolator())
+        with Collector(registry) as collector:
+            Config.from_json(
+                content='{"a": "<% BATCH[a] %>", "b": "<% BATCH[b] %>", "c": "<% BATCH[a] %>"}',
+                registry=registry,
+            )
+
+        # Only the second lookup of `a` is a hit, prefetching `a` and `b` being misses.
+        lookups = collector.stats[("lookup", "BATCH")]
+        assert (lookups.calls, lookups.hits, lookups.misses) == (3, 1, 2)
+
+    def test_report(self, registry):
+        with Collector(registry) as collector:
+            Config.from_yaml(content="a: <% ENV[A, 1] %>", registry=registry)
+
+        lines = collector.report().splitlines()
+        assert lines[0].startswith("phase")
+        phases = [line.split()[0] for line in lines[1:]]
+        assert phases == ["parse", "interpolate", "lookup", "coerce"]
+
+        collector.clear()
+        assert collector.report().splitlines()[1:] == []
+
+
+class TestProfileCommand:
+    def test_profile(self, tmp_path, capsys):
+        path = tmp_path / "config.toml"
+        path.write_text('a = "<% ENV[A, 1] %>"')
+
+        assert main(["profile", str(path), "--lazy"]) == 0
+        output = capsys.readouterr().out
+        assert "TomlLoader" in output
+        assert "lookup" in output
+        assert "total:" in output
+
+    def test_unknown_file_type(self, tmp_path, capsys):
+        with pytest.raises(SystemExit) as e:
+            main(["profile", str(tmp_path / "config.ini")])
+        assert e.value.code == 1
+        assert "config.ini" in capsys.readouterr().err
@@ -0,0 +1,276 @@
+import datetime
+import gc
+import weakref
+
+import pytest
+
+from configly.config import Config
+from configly.layers import Change, changes, diff, Layer, merge, MISSING, surviving
+from configly.loaders import JsonLoader, YamlLoader
+from tests.utils import CountingJsonLoader, write
+
+
+class TestMerge:
+    def test_nested(self):
+        assert merge([{"a": {"b": 1}}, {"a": {"c": 2}}, {"d": 3}]) == {
+            "a": {"b": 1, "c": 2},
+            "d": 3,
+        }
+
+    def test_scalar_replaces_mapping(self):
+        assert merge([{"a": {"b": 1}}, {"a": 2}]) == {"a": 2}
+
+    def test_mapping_replaces_scalar(self):
+        assert merge([{"a": {"b": 1}}, {"a": 2}, {"a": {"c": 3}}]) == {"a": {"c": 3}}
+
+    def test_lists_are_replaced(self):
+        assert merge([{"a": [1, 2]}, {"a": [3]}]) == {"a": [3]}
+
+    def test_single_contributor_is_shared(self):
+        b = {"c": 1}
+        result = merge([{"a": 1, "b": b}, {"a": 2}])
+        assert result["b"] is b
+
+    def test_missing(self):
+        assert merge([MISSING, MISSING]) is MISSING
+        assert merge([MISSING, 1]) == 1
+
+
+@pytest.mark.parametrize(
+    "values, expected",
+    [
+        (
+            [{"a": {"b": 1, "c": 2}}, {"a": {"c": 3}, "d": 4}],
+            [{"a": {"b": 1}}, {"a": {"c": 3}, "d": 4}],
+        ),
+        ([{"a": {"b": 1}}, {"a": 2}, {"a": {"c": 3}}], [{}, {}, {"a": {"c": 3}}]),
+        ([{"a": {"b": 1}}, {"a": 2}], [{}, {"a": 2}]),
+        ([{"a": 1}, MISSING, {"b": 2}], [{"a": 1}, MISSING, {"b": 2}]),
+        ([{"a": {}}, {"a": {}}], [{"a": {}}, {"a": {}}]),
+    ],
+)
+def test_surviving(values, expected):
+    parts = surviving(values)
+    assert parts == expected
+    assert merge(parts) == merge(values)
+
+
+def test_diff():
+    old = {"a": {"b": 1, "c": [1]}, "d": 1}
+    new = {"a": {"b": 1, "c": [2]}, "e": 1}
+    assert list(diff(old, new)) == [("a", "c"), ("d",), ("e",)]
+
+
+def test_changes():
+    assert changes({"a": {"b": 1}}, {"a": 2}, ("x",)) == [Change(("x", "a"), {"b": 1}, 2)]
+    assert changes({"a": 1}, {"a": 1}) == []
+
+
+class TestLayer:
+    def test_loader_from_extension(self, tmp_path):
+        layer = Layer(write(tmp_path / "a.yaml", "a: 1"))
+        assert isinstance(layer.loader, YamlLoader)
+
+    def test_unknown_extension(self):
+        with pytest.raises(ValueError):
+            Layer("config.ini")
+
+    def test_content_requires_loader(self):
+        with pytest.raises(ValueError):
+            Layer(content="a: 1")
+
+    def test_load_detects_changes(self, tmp_path):
+        path = write(tmp_path / "a.json", '{"a": 1}')
+        layer = Layer(path)
+        assert layer.load() is True
+        assert layer.load() is False
+
+        write(tmp_path / "a.json", '{"a": 2}')
+        assert layer.load() is True
+        assert layer.value == {"a": 2}
+
+    def test_optional_missing_file(self, tmp_path):
+        layer = Layer(str(tmp_path / "missing.json"), optional=True)
+        layer.load()
+        assert layer.value == {}
+
+    def test_required_missing_file(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            Layer(str(tmp_path / "missing.json")).load()
+
+    def test_non_mapping(self):
+        with pytest.raises(ValueError):
+            Layer(content="[1]", loader=JsonLoader()).load()
+
+
+class TestFromLayers:
+    def test_merged(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PORT", "8080")
+        base = write(tmp_path / "base.yml", "db:\n  host: localhost\n  port: 5432\nname: app")
+        local = write(tmp_path / "local.json", '{"db": {"port": "<% ENV[PORT] %>"}}')
+
+        config = Config.from_layers([base, local])
+        assert config.to_dict() == {"db": {"host": "localhost", "port": 8080}, "name": "app"}
+        assert config.db.port == 8080
+        assert config["db.host"] == "localhost"
+
+    def test_requires_layers(self):
+        with pytest.raises(ValueError):
+            Config.from_layers([])
+
+    def test_mixed_loaders(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("DATE", "2020-01-01")
+        base = write(tmp_path / "base.yml", "a: <% ENV[DATE] %>\nb: <% ENV[DATE] %>\nc:\n  d: 1")
+        override = write(tmp_path / "override.json", '{"b": "<% ENV[DATE] %>"}')
+
+        # Each value is coerced by its own layer's format, as yaml has dates but json doesn't.
+        config = Config.from_layers([base, override])
+        expected = {"a": datetime.date(2020, 1, 1), "b": "2020-01-01", "c": {"d": 1}}
+        assert config.to_dict() == expected
+
+        config.refresh()
+        config.c.refresh()
+        assert config.to_dict() == expected
+
+        write(tmp_path / "override.json", '{"c": {"e": "<% ENV[DATE] %>"}}')
+        config.reload()
+        assert config.to_dict() == {
+            "a": datetime.date(2020, 1, 1),
+            "b": datetime.date(2020, 1, 1),
+            "c": {"d": 1, "e": "2020-01-01"},
+        }
+
+    def test_views_dont_keep_config_alive(self, tmp_path):
+        base = write(tmp_path / "base.yml", "a:\n  b: 1")
+        override = write(tmp_path / "override.json", '{"a": {"c": 2}}')
+
+        config = Config.from_layers([base, override])
+        config.a.refresh()
+        ref = weakref.ref(config)
+
+        # Freed as soon as it's unreferenced, rather than by the cyclic garbage collector.
+        gc.disable()
+        try:
+            del config
+            assert ref() is None
+        finally:
+            gc.enable()
+
+    def test_layers_are_untouched(self, tmp_path):
+        base = Layer(write(tmp_path / "base.json", '{"a": {"b": 1}, "c": {"d": 1}}'))
+        override = Layer(write(tmp_path / "override.json", '{"a": {"b": 2}}'))
+
+        config = Config.from_layers([base, override])
+        write(tmp_path / "override.json", '{"a": {"b": 3}, "c": {"e": 2}}')
+        config.reload()
+
+        assert base.value == {"a": {"b": 1}, "c": {"d": 1}}
+        assert config.to_dict() == {"a": {"b": 3}, "c": {"d": 1, "e": 2}}
+
+    def test_origin(self, tmp_path):
+        base = Layer(write(tmp_path / "base.yml", "a:\n  b: 1\n  c: 2\nd: 3"))
+        override = Layer(content='{"a": {"c": 4}}', loader=JsonLoader())
+
+        config = Config.from_layers([base, override])
+        assert config.origin("a.b") is base
+        assert config.origin("a.c") is override
+        assert config.origin(("a", "c")) is override
+        assert config.origin("a") is override
+        assert config.origin("d") is base
+
+        with pytest.raises(KeyError):
+            config.origin("a.e")
+
+    def test_origin_requires_layers(self):
+        with pytest.raises(ValueError):
+            Config({"a": 1}).origin("a")
+
+
+class TestReloadLayers:
+    def test_only_changed_keys_are_remerged(self, tmp_path):
+        base = write(tmp_path / "base.json", '{"a": {"b": 1}, "c": {"d": 2}}')
+        override = write(tmp_path / "override.json", '{"a": {"b": 3}}')
+
+        config = Config.from_layers([base, override])
+        a, c = config.a, config.c
+
+        write(tmp_path / "override.json", '{"a": {"b": 4}}')
+        config.reload()
+
+        assert config.a.b == 4
+        assert config.a is not a
+        assert config.c is c
+        assert config.origin("a.b").file == override
+
+    def test_removed_keys(self, tmp_path):
+        base = write(tmp_path / "base.json", '{"a": 1}')
+        override = write(tmp_path / "override.json", '{"a": 2, "b": {"c": 3}}')
+
+        config = Config.from_layers([base, override])
+        write(tmp_path / "override.json", "{}")
+        config.reload()
+
+        assert config.to_dict() == {"a": 1}
+        with pytest.raises(KeyError):
+            config["b.c"]
+
+    def test_unchanged_layers_are_not_reparsed(self, tmp_path):
+        loader = CountingJsonLoader()
+        base = Layer(write(tmp_path / "base.txt", '{"a": 1}'), loader=loader)
+
+        config = Config.from_layers([base])
+        assert loader.calls == [b'{"a": 1}']
+
+        config.reload()
+        assert loader.calls == [b'{"a": 1}']
+
+    def test_interpolated(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("A", "1")
+        base = write(tmp_path / "base.yml", "a: <% ENV[A] %>\nb: <% ENV[A] %>")
+        override = write(tmp_path / "override.yml", "c: 1")
+
+        config = Config.from_layers([base, override])
+        monkeypatch.setenv("A", "2")
+        write(tmp_path / "override.yml", "a: <% ENV[A] %>x")
+        config.reload()
+
+        assert config.to_dict() == {"a": "2x", "b": 1}
+
+    def test_snapshot_changes(self, tmp_path):
+        path = write(tmp_path / "base.json", '{"a": 1}')
+        config = Config.from_layers([path])
+        snapshot = config.snapshot()
+
+        write(tmp_path / "base.json", '{"a": 2}')
+        config.reload()
+        assert config.snapshot() is not snapshot
+        assert config.snapshot()["a"] == 2
+
+    def test_failure_leaves_config(self, tmp_path):
+        base = write(tmp_path / "base.yml", "a: 1")
+        config = Config.from_layers([base])
+
+        write(tmp_path / "base.yml", "a: <% ENV[MISSING_VARIABLE] %>")
+        with pytest.raises(ValueError):
+            config.reload()
+        assert config.a == 1
+
+        # The failed reload isn't mistaken for having been applied.
+        write(tmp_path / "base.yml", "a: <% ENV[MISSING_VARIABLE, 2] %>")
+        config.reload()
+        assert config.a == 2
+
+    def test_subscribers(self, tmp_path):
+        base = write(tmp_path / "base.json", '{"a": {"b": 1}, "c": {"d": 2}}')
+        override = write(tmp_path / "override.json", "{}")
+
+        config = Config.from_layers([base, override])
+        a, c = [], []
+        config.subscribe("a", a.append)
+        config.subscribe("c", c.append)
+
+        write(tmp_path / "override.json", '{"a": {"b": 3}}')
+        config.reload()
+
+        assert a == [[Change(("a", "b"), 1, 3)]]
+        assert c == []
@@ -1,9 +1,10 @@
 import sys
+import threading
 from unittest.mock import patch
 
 import pytest
 
-from configly.loaders import JsonLoader, TomlLoader, YamlLoader
+from configly.loaders import JsonLoader, shared_loader, TomlLoader, YamlLoader
 
 
 @patch.dict("sys.modules", {"toml": None, "tomli": None, "tomllib": None})
@@ -61,3 +62,56 @@ def test_json_loads():
     loader = JsonLoader()
     result = loader.loads('{"meow": 4}')
     assert result == {"meow": 4}
+
+
+def test_yaml_decoder_per_thread():
+    loader = YamlLoader()
+    decoders = []
+    thread = threading.Thread(target=lambda: decoders.append(loader.decoder))
+    thread.start()
+    thread.join()
+
+    assert loader.decoder is loader.decoder
+    assert decoders[0] is not loader.decoder
+
+
+def test_shared_loader():
+    assert shared_loader(YamlLoader) is shared_loader(YamlLoader)
+    assert shared_loader(YamlLoader) is not YamlLoader()
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("4", 4),
+        (" -4.5e1 ", -45.0),
+        ("true", True),
+        ("null", None),
+        ("-Infinity", float("-inf")),
+        ('"4"', "4"),
+        ('{"a": [1]}', {"a": [1]}),
+        ("4 apples", "4 apples"),
+        ("truest", "truest"),
+        ("", ""),
+    ],
+)
+def test_json_load_value(value, expected):
+    assert JsonLoader().load_value(value) == expected
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("4", 4),
+        ("+4 ", 4),
+        ("1_000", 1000),
+        ("false", False),
+        ("'4'", "4"),
+        ("[1, 2]", [1, 2]),
+        ("info", "info"),
+        ("4 apples", "4 apples"),
+        ("", ""),
+    ],
+)
+def test_toml_load_value(value, expected):
+    assert TomlLoader().load_value(value) == expected
@@ -1,10 +1,13 @@
-import textwrap
-from unittest.mock import mock_open, patch
+import threading
+import time
+from unittest.mock import patch
 
 import pytest
 
 from configly.config import Config, post_process
-from configly.loaders import YamlLoader
+from configly.loaders import TomlLoader, YamlLoader
+from configly.registry import Registry
+from tests.utils import CountingJsonLoader
 
 yaml = YamlLoader()
 
@@ -47,9 +50,9 @@ class Test_post_process:
         with pytest.raises(ValueError):
             post_process(yaml, input_)
 
-    @patch("builtins.open", new=mock_open(read_data=textwrap.dedent("woah!").encode("utf-8")))
-    @patch("os.path.exists", return_value=True)
-    def test_file_loader_file_exists(self, _):
+    def test_file_loader_file_exists(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "foo.txt").write_text("woah!")
         input_ = {"file": "<% FILE[foo.txt, 1] %>"}
         config = Config(post_process(yaml, input_))
         assert config.file == "woah!"
@@ -141,3 +144,209 @@ class Test_post_process_type_interpretation:
         input_ = {"foo": "<% ENV[foo] %>+<% ENV[bar] %>=<% ENV[baz] %>"}
         config = Config(post_process(yaml, input_))
         assert config.to_dict() == {"foo": "one+two=three"}
+
+    @patch("os.environ", new={"bar": "two"})
+    def test_nested_default_interpolation(self):
+        input_ = {"foo": "<% ENV[foo, <% ENV[bar] %>] %>", "baz": "<% ENV[bar, <% ENV[qux] %>] %>"}
+        config = Config(post_process(yaml, input_))
+        assert config.to_dict() == {"foo": "two", "baz": "two"}
+
+    @patch("os.environ", new={"foo": "<% ENV[bar] %>", "bar": "5"})
+    def test_interpolated_value_is_interpolated(self):
+        input_ = {"foo": "<% ENV[foo] %>"}
+        config = Config(post_process(yaml, input_))
+        assert config.foo == 5
+
+    def test_malformed_block_is_literal(self):
+        input_ = {"foo": "<% ENV[foo,] %>"}
+        config = Config(post_process(yaml, input_))
+        assert config.foo == "<% ENV[foo,] %>"
+
+
+class Test_post_process_concurrency:
+    class SlowInterpolator:
+        max_concurrency = 4
+
+        def __init__(self):
+            self.lock = threading.Lock()
+            self.active = 0
+            self.peak = 0
+
+        def __getitem__(self, name):
+            with self.lock:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            time.sleep(0.01)
+            with self.lock:
+                self.active -= 1
+
+            if name.startswith("missing"):
+                raise KeyError(name)
+            return name
+
+        def get(self, name, default=None):
+            try:
+                return self[name]
+            except KeyError:
+                return default
+
+    def test_concurrent_lookups(self):
+        registry = Registry()
+        interpolator = self.SlowInterpolator()
+        registry.register_interpolator("SLOW", interpolator)
+
+        input_ = {"foo": ["<% SLOW[value{}] %>".format(i) for i in range(8)]}
+        config = Config(post_process(yaml, input_, registry=registry))
+
+        assert config.foo == ["value{}".format(i) for i in range(8)]
+        assert 1 < interpolator.peak <= 4
+
+    def test_concurrent_missing_values(self):
+        registry = Registry()
+        registry.register_interpolator("SLOW", self.SlowInterpolator())
+
+        input_ = {"foo": "<% SLOW[missing1, 5] %>", "bar": "<% SLOW[missing2] %>"}
+        with pytest.raises(ValueError):
+            post_process(yaml, input_, registry=registry)
+
+        input_ = {"foo": "<% SLOW[missing1, 5] %>", "bar": "<% SLOW[present] %>"}
+        assert post_process(yaml, input_, registry=registry) == {"foo": 5, "bar": "present"}
+
+
+class Test_post_process_memoization:
+    class CountingInterpolator:
+        def __init__(self):
+            self.calls = 0
+
+        def __getitem__(self, name):
+            self.calls += 1
+            return name
+
+        def get(self, name, default=None):
+            return self[name]
+
+    def test_repeated_values_are_looked_up_once(self):
+        registry = Registry()
+        interpolator = self.CountingInterpolator()
+        registry.register_interpolator("COUNT", interpolator)
+
+        input_ = {
+            "foo": "<% COUNT[a] %>",
+            "bar": ["<% COUNT[a] %>", "x<% COUNT[a] %>"],
+            "baz": {"qux": "<% COUNT[b] %>", "quux": "<% COUNT[a] %>"},
+        }
+        result = post_process(yaml, input_, registry=registry)
+        assert result == {"foo": "a", "bar": ["a", "xa"], "baz": {"qux": "b", "quux": "a"}}
+        assert interpolator.calls == 2
+
+        post_process(yaml, input_, registry=registry)
+        assert interpolator.calls == 4
+
+    def test_lazy_config_memoizes_until_refresh(self):
+        registry = Registry()
+        interpolator = self.CountingInterpolator()
+        registry.register_interpolator("COUNT", interpolator)
+
+        content = "foo: <% COUNT[a] %>\nbar:\n  baz: <% COUNT[a] %>\n"
+        config = Config.from_yaml(content=content, registry=registry, lazy=True)
+        assert config.foo == "a"
+        assert config.bar.baz == "a"
+        assert interpolator.calls == 1
+
+        config.refresh()
+        assert config.to_dict() == {"foo": "a", "bar": {"baz": "a"}}
+        assert interpolator.calls == 2
+
+    def test_coercion_is_memoized(self):
+        class CountingLoader(YamlLoader):
+            calls = 0
+
+            def load_value(self, value):
+                self.calls += 1
+                return super().load_value(value)
+
+        loader = CountingLoader()
+        input_ = {"foo": "<% ENV[a, 5] %>", "bar": ["<% ENV[a, 5] %>", "<% ENV[b, c: 1] %>"]}
+        with patch("os.environ", new={}):
+            result = post_process(loader, input_)
+        assert result == {"foo": 5, "bar": [5, {"c": 1}]}
+        assert loader.calls == 2
+
+        # Mutable values aren't shared between the values they're coerced into.
+        input_ = {"foo": "<% ENV[b, c: 1] %>", "bar": "<% ENV[b, c: 1] %>"}
+        with patch("os.environ", new={}):
+            result = post_process(loader, input_)
+        assert result["foo"] == result["bar"] == {"c": 1}
+        assert result["foo"] is not result["bar"]
+        assert loader.calls == 4
+
+
+class Test_post_process_decoding:
+    class CountingLoader(YamlLoader):
+        calls = 0
+
+        def load_value(self, value):
+            self.calls += 1
+            return super().load_value(value)
+
+    @patch("os.environ", new={"foo": '{"a": [1, {"b": null}]}'})
+    def test_json_is_decoded_once(self):
+        loader = self.CountingLoader()
+        result = post_process(loader, {"foo": "<% ENV[foo] %>"})
+        assert result == {"foo": {"a": [1, {"b": None}]}}
+        assert loader.calls == 0
+
+    @patch("os.environ", new={"foo": '{"a": 1, "a": 2}'})
+    def test_non_strict_json_uses_loader(self):
+        loader = CountingJsonLoader()
+        result = post_process(loader, {"foo": "<% ENV[foo] %>"})
+        assert result == {"foo": {"a": 2}}
+        assert loader.values == ['{"a": 1, "a": 2}']
+
+    @patch("os.environ", new={"foo": ">x\U0001f600"})
+    def test_quoted_value(self):
+        loader = self.CountingLoader()
+        result = post_process(loader, {"foo": "<% ENV[foo] %>"})
+        assert result == {"foo": ">x\U0001f600"}
+        assert loader.calls == 0
+
+    @patch("os.environ", new={"foo": '[1, "a"]'})
+    def test_toml(self):
+        result = post_process(TomlLoader(), {"foo": "<% ENV[foo] %>"})
+        assert result == {"foo": [1, "a"]}
+
+
+class Test_post_process_structure:
+    def test_deep_nesting(self):
+        value = leaf = []
+        for _ in range(10_000):
+            leaf.append({"a": []})
+            leaf = leaf[0]["a"]
+        leaf.append("<% ENV[foo, 5] %>")
+
+        result = post_process(yaml, value)
+        for _ in range(10_000):
+            result = result[0]["a"]
+        assert result == [5]
+
+    def test_untouched_subtrees_are_shared(self):
+        value = {"a": {"b": [1, 2]}, "c": [{"d": "<% ENV[foo, 5] %>"}, {"e": 3}]}
+        result = post_process(yaml, value)
+        assert result == {"a": {"b": [1, 2]}, "c": [{"d": 5}, {"e": 3}]}
+        assert result is not value
+        assert result["a"] is value["a"]
+        assert result["c"] is not value["c"]
+        assert result["c"][1] is value["c"][1]
+        assert value["c"][0] == {"d": "<% ENV[foo, 5] %>"}
+
+    def test_other_containers_are_converted(self):
+        value = {"a": (1, 2), "b": frozenset([3])}
+        assert post_process(yaml, value) == {"a": [1, 2], "b": [3]}
+
+    @patch("os.environ", new={"foo": "1"})
+    def test_refresh_leaves_source_untouched(self):
+        config = Config.from_yaml(content="a:\n  b: <% ENV[foo] %>\nc:\n  d: 1\n")
+        with patch("os.environ", new={"foo": "2"}):
+            config.refresh()
+        assert config.to_dict() == {"a": {"b": 2}, "c": {"d": 1}}
+        assert config._src_input == {"a": {"b": "<% ENV[foo] %>"}, "c": {"d": 1}}
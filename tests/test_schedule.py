@@ -0,0 +1,129 @@
+import gc
+import time
+from unittest.mock import patch
+
+import pytest
+
+from configly.config import Config
+from configly.interpolators import EnvVarInterpolator
+from configly.registry import Registry
+from configly.schedule import Scheduler
+from tests.utils import wait_for
+
+
+class CountingInterpolator:
+    def __init__(self):
+        self.calls = 0
+        self.error = None
+
+    def __getitem__(self, name):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return "{}-{}".format(name, self.calls)
+
+    def get(self, name, default=None):
+        return self[name]
+
+
+@pytest.fixture
+def interpolator():
+    return CountingInterpolator()
+
+
+@pytest.fixture
+def registry(interpolator):
+    registry = Registry()
+    registry.register_interpolator("ENV", EnvVarInterpolator)
+    registry.register_interpolator("VAULT", interpolator)
+    return registry
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = Scheduler(jitter=0, backoff=0.01)
+    yield scheduler
+    scheduler._schedules.clear()
+
+
+@pytest.fixture
+def config(registry):
+    return Config.from_yaml(content="a: <% VAULT[a] %>\nb: <% ENV[B, 1] %>", registry=registry)
+
+
+def test_refresh_on_interval(monkeypatch, config, scheduler):
+    assert config.a == "a-1"
+
+    config.schedule({"VAULT": 0.01, "ENV": None}, scheduler)
+    monkeypatch.setenv("B", "2")
+    assert wait_for(lambda: config.a == "a-3")
+
+    # Values of unscheduled interpolators are left alone.
+    assert config.b == 1
+
+
+def test_failure_keeps_last_value(config, interpolator, scheduler):
+    interpolator.error = KeyError("a")
+    with patch("configly.schedule.logger") as logger:
+        config.schedule({"VAULT": 0.01}, scheduler)
+        assert wait_for(lambda: logger.exception.call_count >= 2)
+    assert config.a == "a-1"
+
+    interpolator.error = None
+    assert wait_for(lambda: config.a != "a-1")
+    assert wait_for(lambda: scheduler._schedules[id(config)]["VAULT"].failures == 0)
+
+
+def test_backoff(config, interpolator):
+    scheduler = Scheduler(jitter=0, backoff=1)
+    config.schedule({"VAULT": 60}, scheduler)
+    schedule = scheduler._schedules[id(config)]["VAULT"]
+    scheduler.unschedule(config)
+
+    interpolator.error = KeyError("a")
+    delays = []
+    with patch("configly.schedule.logger"):
+        for _ in range(8):
+            scheduler._refresh([schedule])
+            delays.append(round(schedule.due - time.monotonic()))
+    assert delays == [1, 2, 4, 8, 16, 32, 60, 60]
+
+    interpolator.error = None
+    scheduler._refresh([schedule])
+    assert round(schedule.due - time.monotonic()) == 60
+
+
+def test_jitter():
+    scheduler = Scheduler(jitter=0.5)
+    assert all(2.5 <= scheduler._delay(5) <= 7.5 for _ in range(100))
+
+
+def test_unschedule_stops_thread(config, scheduler):
+    config.schedule({"VAULT": 0.01}, scheduler)
+    assert config in scheduler
+
+    config.unschedule(scheduler)
+    assert config not in scheduler
+    assert wait_for(lambda: scheduler._thread is None)
+
+
+def test_collected_config_is_dropped(registry, scheduler):
+    config = Config.from_yaml(content="a: <% VAULT[a] %>", registry=registry)
+    config.schedule({"VAULT": 0.01}, scheduler)
+
+    del config
+    gc.collect()
+    assert wait_for(lambda: scheduler._thread is None)
+    assert scheduler._schedules == {}
+
+
+def test_unknown_interpolator(config, scheduler):
+    with pytest.raises(ValueError) as e:
+        config.schedule({"CONSUL": 1}, scheduler)
+    assert "CONSUL" in str(e.value)
+
+
+def test_lazy_config(registry, scheduler):
+    config = Config.from_yaml(content="a: <% VAULT[a] %>", registry=registry, lazy=True)
+    with pytest.raises(ValueError):
+        config.schedule({"VAULT": 1}, scheduler)
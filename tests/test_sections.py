@@ -0,0 +1,222 @@
+import codecs
+import json
+import os
+import textwrap
+from unittest.mock import patch
+
+import pytest
+
+from configly.config import Config
+from configly.interpolators import FileInterpolator
+from configly.loaders import JsonLoader, TomlLoader, YamlLoader
+from configly.sections import index_json, index_yaml, Sections
+from configly.watch import Watcher
+from tests.utils import CountingJsonLoader, wait_for, write
+
+
+class TestIndexJson:
+    @pytest.mark.parametrize(
+        "value",
+        [
+            {},
+            {"a": 1, "b": -1.5e3, "c": True, "d": None, "e": "f"},
+            {"a": {"b": ["}", "]", '"', "\\", {"c": "{["}], "d": []}},
+            {"a\u00e9": "\u00e9", 'b\\"': ["x"]},
+        ],
+    )
+    def test_sections(self, value):
+        for indent in (None, 2):
+            buffer = json.dumps(value, indent=indent, ensure_ascii=False).encode("utf-8")
+            spans = index_json(buffer, 0)
+            assert list(spans) == list(value)
+            for key, (start, end) in spans.items():
+                assert json.loads(buffer[start:end]) == value[key]
+
+    @pytest.mark.parametrize("value", [b"", b"[1]", b'{"a": 1', b'{"a" 1}', b'{"a": {"b": 1}'])
+    def test_unindexable(self, value):
+        assert index_json(value, 0) is None
+
+
+class TestIndexYaml:
+    def test_sections(self):
+        buffer = textwrap.dedent("""\
+            # comment
+            a:
+              b: 1
+            "c: d": |
+              text
+
+            # comment
+            1: [1,
+              2]
+            e: f # comment
+            """).encode("utf-8")
+        spans = index_yaml(buffer, 0, YamlLoader())
+        assert list(spans) == ["a", "c: d", 1, "e"]
+
+        sections = [buffer[start:end].decode("utf-8") for start, end in spans.values()]
+        assert sections[0] == "a:\n  b: 1\n"
+        assert sections[3] == "e: f # comment\n"
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            "a: &x 1\nb: *x\n",
+            "<<: {a: 1}\n",
+            "---\na: 1\n",
+            "a: 1\n---\nb: 1\n",
+            "- a\n- b\n",
+            "{a: 1}\n",
+            "a: 1\na: 2\n",
+        ],
+    )
+    def test_unindexable(self, value):
+        assert index_yaml(value.encode("utf-8"), 0, YamlLoader()) is None
+
+
+class TestSections:
+    content = {"foo": {"bar": [1, 2]}, "baz": "qux"}
+
+    def test_sections_are_parsed_on_access(self, tmp_path):
+        loader = CountingJsonLoader()
+        file = write(tmp_path / "config.json", json.dumps(self.content))
+        sections = Sections(loader, file)
+        assert list(sections) == ["foo", "baz"]
+        assert "baz" in sections
+        assert loader.calls == []
+
+        assert sections["baz"] == "qux"
+        assert sections["baz"] == "qux"
+        assert loader.calls == ['"qux"']
+
+        with pytest.raises(KeyError):
+            sections["missing"]
+
+    def test_yaml(self, tmp_path):
+        file = write(tmp_path / "config.yml", "foo:\n  bar: [1, 2]\nbaz: qux\n")
+        sections = Sections(YamlLoader(), file)
+        assert dict(sections) == self.content
+
+    def test_misindexed_yaml_falls_back(self, tmp_path):
+        file = write(tmp_path / "config.yml", "foo: {a: 1,\nb: 2}\n")
+        sections = Sections(YamlLoader(), file)
+        assert list(sections) == ["foo", "b"]
+        assert sections["foo"] == {"a": 1, "b": 2}
+        assert list(sections) == ["foo"]
+
+    def test_unindexable_documents_are_loaded_whole(self, tmp_path):
+        file = write(tmp_path / "config.yml", "a: &x 1\nb: *x\n")
+        assert dict(Sections(YamlLoader(), file)) == {"a": 1, "b": 1}
+
+        file = write(tmp_path / "empty.yml", "")
+        assert dict(Sections(YamlLoader(), file)) == {}
+
+    def test_byte_order_mark(self, tmp_path):
+        file = write(tmp_path / "config.json", codecs.BOM_UTF8 + b'{"a": 1}')
+        assert dict(Sections(JsonLoader(), file)) == {"a": 1}
+
+    def test_non_mapping(self, tmp_path):
+        file = write(tmp_path / "config.json", "[1, 2]")
+        with pytest.raises(ValueError):
+            Sections(JsonLoader(), file)
+
+    def test_unsupported_loader(self, tmp_path):
+        file = write(tmp_path / "config.toml", "a = 1")
+        with pytest.raises(ValueError):
+            Sections(TomlLoader(), file)
+
+    def test_modified_in_place(self, tmp_path):
+        file = write(tmp_path / "config.json", '{"a": 1, "b": 2}')
+        sections = Sections(JsonLoader(), file)
+        assert sections["a"] == 1
+
+        with open(file, "r+b") as f:
+            f.write(b'{"a": 3, "b": 4, "c": 5}')
+
+        assert sections["a"] == 1
+        with pytest.raises(ValueError) as e:
+            sections["b"]
+        assert "reloaded" in str(e.value)
+
+    def test_replaced(self, tmp_path):
+        file = write(tmp_path / "config.json", '{"a": 1, "b": 2}')
+        sections = Sections(JsonLoader(), file)
+
+        os.replace(write(tmp_path / "new.json", '{"a": 3, "b": 4}'), file)
+        assert dict(sections) == {"a": 1, "b": 2}
+
+
+class TestMappedConfig:
+    content = textwrap.dedent("""\
+        foo:
+          bar: <% ENV[bar] %>
+        baz:
+          - <% ENV[qux] %>
+        """)
+
+    @patch("os.environ", new={"bar": "1"})
+    def test_sections_are_loaded_on_access(self, tmp_path):
+        file = write(tmp_path / "config.yml", self.content)
+        config = Config.from_yaml(file, mmap=True)
+        assert config.foo.bar == 1
+        assert list(config._src_input._values) == ["foo"]
+
+        with pytest.raises(ValueError):
+            config.baz
+
+    @patch("os.environ", new={"bar": "1", "qux": "2"})
+    def test_whole_config_operations(self, tmp_path):
+        file = write(tmp_path / "config.yml", self.content)
+        config = Config.from_yaml(file, mmap=True)
+        assert config["foo.bar"] == 1
+        assert config.to_dict() == {"foo": {"bar": 1}, "baz": [2]}
+
+    @patch("os.environ", new={"bar": "1", "qux": "2"})
+    def test_reload(self, tmp_path):
+        file = write(tmp_path / "config.json", '{"a": "<% ENV[bar] %>"}')
+        config = Config.from_json(file, mmap=True)
+        assert config.a == 1
+
+        os.replace(write(tmp_path / "new.json", '{"a": "<% ENV[qux] %>"}'), file)
+        config.reload()
+        assert config.a == 2
+        assert isinstance(config._src_input, Sections)
+
+    @patch("os.environ", new={"bar": "1", "qux": "2"})
+    def test_refresh_only_parsed_sections(self, tmp_path):
+        file = write(tmp_path / "config.yml", self.content + "other: <% ENV[bar] %>\n")
+        config = Config.from_yaml(file, mmap=True)
+        assert config.foo.bar == 1
+
+        with patch("os.environ", new={"bar": "3", "qux": "2"}):
+            config.refresh(interpolators=["ENV"])
+            assert list(config._src_input.parsed) == ["foo"]
+            assert config.foo.bar == 3
+
+            config.refresh()
+            assert list(config._src_input.parsed) == ["foo"]
+
+    def test_watch_only_parsed_sections(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        FileInterpolator().cache.clear()
+        write(tmp_path / "secret.txt", "one")
+        file = write(tmp_path / "config.yml", "a: 1\nb:\n  secret: <% FILE[secret.txt] %>\nc: 2\n")
+        config = Config.from_yaml(file, mmap=True)
+        watcher = Watcher(interval=0.01, debounce=0.02, use_inotify=False)
+
+        config.watch(watcher)
+        assert list(config._src_input.parsed) == []
+        try:
+            assert config.b.secret == "one"
+
+            # Files interpolated into sections parsed since watching are watched too.
+            assert wait_for(lambda: "secret.txt" in watcher._watches[id(config)].targets)
+            write(tmp_path / "secret.txt", "two")
+            assert wait_for(lambda: config.b.secret == "two")
+            assert "c" not in config._src_input.parsed
+        finally:
+            config.unwatch(watcher)
+
+    def test_requires_file(self, tmp_path):
+        with pytest.raises(ValueError):
+            Config.from_json(content="{}", mmap=True)
@@ -0,0 +1,134 @@
+import os
+import subprocess  # nosec
+import sys
+
+import pytest
+
+import configly
+from configly.config import Config
+from configly.layers import Change
+from configly.shared import SharedSnapshot
+
+SOURCE_PATH = os.path.dirname(os.path.dirname(configly.__file__))
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "config.snapshot")
+
+
+class TestSharedSnapshot:
+    def test_generation_increments(self, path):
+        shared = SharedSnapshot(path)
+        assert shared.current_generation() is None
+        assert shared.publish({"a": 1}) == 1
+
+        # A new publisher continues from the published generation.
+        assert SharedSnapshot(path).publish({"a": 2}) == 2
+        assert shared.current_generation() == 2
+
+    def test_read_only_once_per_generation(self, path):
+        SharedSnapshot(path).publish({"a": 1})
+        reader = SharedSnapshot(path, attached=True)
+        assert reader.read() == (1, {"a": 1})
+        assert reader.read() is None
+
+    def test_invalid_file(self, path):
+        with open(path, "wb") as f:
+            f.write(b"not a snapshot at all")
+        with pytest.raises(ValueError):
+            SharedSnapshot(path).read()
+
+    def test_truncated_file(self, path):
+        SharedSnapshot(path).publish({"a": 1})
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 1)
+        with pytest.raises(ValueError):
+            SharedSnapshot(path).read()
+
+
+class TestPublish:
+    def test_attach(self, path):
+        config = Config.from_yaml(content="a:\n  b: [1, 2]\nc: <% ENV[C, 3] %>")
+        config.publish(path)
+
+        attached = Config.attach(path)
+        assert attached == {"a": {"b": [1, 2]}, "c": 3}
+        assert attached.a.b == [1, 2]
+        assert attached["a.b"] == [1, 2]
+
+    def test_attach_missing(self, path):
+        with pytest.raises(FileNotFoundError):
+            Config.attach(path)
+
+    def test_lazy(self, path):
+        config = Config.from_yaml(content="a:\n  b: <% ENV[B, 1] %>", lazy=True)
+        config.publish(path)
+        assert Config.attach(path).to_dict() == {"a": {"b": 1}}
+
+    def test_refresh_is_picked_up(self, path, monkeypatch):
+        monkeypatch.setenv("B", "1")
+        config = Config.from_yaml(content="a:\n  b: <% ENV[B] %>")
+        config.publish(path)
+
+        attached = Config.attach(path)
+        snapshot = attached.snapshot()
+        a = attached.a
+
+        # Unchanged, so nothing is swapped in.
+        attached.refresh()
+        assert attached.a is a
+        assert attached.snapshot() is snapshot
+
+        monkeypatch.setenv("B", "2")
+        config.refresh()
+        attached.refresh()
+        assert attached.a.b == 2
+        assert attached.snapshot()["a"]["b"] == 2
+
+    def test_attached_subscribers(self, path, monkeypatch):
+        monkeypatch.setenv("B", "1")
+        config = Config.from_yaml(content="a:\n  b: <% ENV[B] %>\nc: 1")
+        config.publish(path)
+
+        attached = Config.attach(path)
+        changes = []
+        attached.subscribe("a", changes.append)
+
+        monkeypatch.setenv("B", "2")
+        config.refresh()
+        attached.refresh()
+        assert changes == [[Change(("a", "b"), 1, 2)]]
+
+    def test_reload_is_picked_up(self, path, tmp_path):
+        file = tmp_path / "config.yml"
+        file.write_text("a: 1")
+        config = Config.from_yaml(str(file))
+        config.publish(path)
+        attached = Config.attach(path)
+
+        file.write_text("a: 2")
+        config.reload()
+        attached.reload()
+        assert attached.a == 2
+
+    def test_layered_reload_is_picked_up(self, path, tmp_path):
+        file = tmp_path / "config.json"
+        file.write_text('{"a": 1, "b": 1}')
+        config = Config.from_layers([str(file)])
+        config.publish(path)
+        attached = Config.attach(path)
+
+        file.write_text('{"a": 2, "b": 1}')
+        config.reload()
+        attached.refresh()
+        assert attached.to_dict() == {"a": 2, "b": 1}
+
+    def test_attach_from_another_process(self, path):
+        Config({"a": {"b": [1, "c"]}}).publish(path)
+
+        code = "from configly import Config; print(Config.attach({!r}).a.b)".format(path)
+        output = subprocess.check_output(  # nosec
+            [sys.executable, "-c", code], env=dict(os.environ, PYTHONPATH=SOURCE_PATH)
+        )
+        assert output.decode().strip() == "[1, 'c']"
@@ -0,0 +1,53 @@
+import pytest
+
+from configly.template import compile_template, Interpolation, Template
+
+
+def test_literal():
+    assert compile_template("foo bar") == Template(["foo bar"])
+
+
+def test_multiple_interpolations():
+    template = compile_template("<% ENV[a] %>+<% ENV[b, 2] %>=c")
+    assert template.segments == (
+        Interpolation("ENV", "a"),
+        "+",
+        Interpolation("ENV", "b", Template(["2"])),
+        "=c",
+    )
+
+
+def test_dotted_var_name_and_whitespace():
+    template = compile_template("<%FILE[foo.txt,   default value ]%>")
+    assert template.segments == (Interpolation("FILE", "foo.txt", Template(["default value "])),)
+
+
+def test_nested_default():
+    template = compile_template("a<% ENV[b, x<% ENV[c, 1] %>y] %>z")
+    assert template.segments == (
+        "a",
+        Interpolation(
+            "ENV",
+            "b",
+            Template(["x", Interpolation("ENV", "c", Template(["1"])), "y"]),
+        ),
+        "z",
+    )
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "<% ENV[] %>",
+        "<% ENV[a, %>",
+        "<% ENV[a,] %>",
+        "<% ENV a %>",
+        "100%> <%",
+    ],
+)
+def test_malformed_blocks_are_literal(value):
+    assert compile_template(value).literal == value
+
+
+def test_compiled_once():
+    assert compile_template("<% ENV[a] %>") is compile_template("<% ENV[a] %>")
@@ -0,0 +1,200 @@
+import dataclasses
+import operator
+import pickle
+import sys
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+import pytest
+
+from configly.config import Config
+from configly.typed import accessor_class, build
+
+
+@dataclasses.dataclass
+class Database:
+    host: str
+    port: int = 5432
+    replicas: List[str] = dataclasses.field(default_factory=list)
+
+
+@dataclasses.dataclass
+class Settings:
+    db: Database
+    debug: bool
+    timeout: Optional[float] = None
+    limits: Dict[str, int] = dataclasses.field(default_factory=dict)
+
+
+class Point(NamedTuple):
+    x: int
+    y: int = 0
+
+
+class TestAccessors:
+    def test_attributes(self):
+        value = build({"a": {"b": 1}, "c": [1, {"d": 2}]})
+        assert value.a.b == 1
+        assert value.c[1].d == 2
+        assert isinstance(value.c, tuple)
+
+    def test_mapping(self):
+        value = build({"a": 1, "b-c": 2, "items": 3, "class": 4})
+        assert value == {"a": 1, "b-c": 2, "items": 3, "class": 4}
+        assert list(value) == ["a", "b-c", "items", "class"]
+        assert value["b-c"] == 2
+        assert value["items"] == 3
+        assert value["class"] == 4
+        assert len(value) == 4
+
+    def test_missing_key(self):
+        with pytest.raises(KeyError):
+            build({"a": 1})["b"]
+        with pytest.raises(AttributeError):
+            build({"a": 1}).b
+
+    def test_read_only(self):
+        value = build({"a": 1})
+        with pytest.raises(AttributeError):
+            value.a = 2
+        with pytest.raises(AttributeError):
+            value.b = 2
+
+    def test_no_instance_dict(self):
+        value = build({"a": 1})
+        assert not hasattr(value, "__dict__")
+
+    def test_classes_are_shared(self):
+        assert type(build({"a": 1})) is type(build({"a": 2}))
+        assert accessor_class(("a",)) is type(build({"a": 1}))
+
+    def test_non_string_keys(self):
+        value = build({1: "a", None: "b"})
+        assert value[1] == "a"
+        assert value[None] == "b"
+
+    def test_pickle(self):
+        value = build({"a": {"b": [1, 2]}})
+        assert pickle.loads(pickle.dumps(value)) == value
+
+    def test_deep_nesting(self):
+        value = leaf = {}
+        for _ in range(10_000):
+            leaf["a"] = {}
+            leaf = leaf["a"]
+
+        result = build(value)
+        for _ in range(10_000):
+            result = result.a
+        assert result == {}
+
+
+class TestSchema:
+    def test_dataclass(self):
+        value = {
+            "db": {"host": "db", "port": "5433", "replicas": ["a"]},
+            "debug": "yes",
+            "timeout": 1,
+            "limits": {"a": "1"},
+            "unknown": 1,
+        }
+        assert build(value, Settings) == Settings(
+            db=Database(host="db", port=5433, replicas=["a"]),
+            debug=True,
+            timeout=1.0,
+            limits={"a": 1},
+        )
+
+    def test_defaults(self):
+        assert build({"db": {"host": "db"}, "debug": False}, Settings) == Settings(
+            db=Database(host="db"), debug=False
+        )
+
+    def test_namedtuple(self):
+        assert build({"x": "1"}, Point) == Point(1, 0)
+
+    def test_missing_field(self):
+        with pytest.raises(ValueError) as e:
+            build({"db": {}, "debug": True}, Settings)
+        assert "db.host" in str(e.value)
+
+    @pytest.mark.parametrize(
+        "value, tp",
+        [
+            ("a", int),
+            (1.5, int),
+            (True, int),
+            ([1], str),
+            ("maybe", bool),
+            ("a", List[int]),
+            ([1, 2], Tuple[int]),
+            ([1], Dict[str, int]),
+        ],
+    )
+    def test_invalid(self, value, tp):
+        with pytest.raises(ValueError):
+            build(value, tp)
+
+    @pytest.mark.parametrize(
+        "value, tp, expected",
+        [
+            ("1", int, 1),
+            (2.0, int, 2),
+            (1, float, 1.0),
+            (1, str, "1"),
+            ("off", bool, False),
+            ([1, "2"], Tuple[int, ...], (1, 2)),
+            ([1, "a"], Tuple[int, str], (1, "a")),
+            ("1", Union[int, str], 1),
+            ("a", Union[int, str], "a"),
+            (None, Optional[int], None),
+        ],
+    )
+    def test_coercion(self, value, tp, expected):
+        result = build(value, tp)
+        assert result == expected
+        assert type(result) is type(expected)
+
+    @pytest.mark.skipif(sys.version_info < (3, 10), reason="PEP 604 unions need python 3.10+")
+    def test_pep_604_union(self):
+        # `int | None`, without the syntax being a problem for older pythons.
+        optional_int = operator.or_(int, type(None))
+        Server = dataclasses.make_dataclass("Server", [("port", optional_int)])
+
+        assert build({"port": "5433"}, Server) == Server(port=5433)
+        assert build({"port": None}, Server) == Server(port=None)
+        with pytest.raises(ValueError):
+            build({"port": "a"}, Server)
+
+    def test_error_path(self):
+        with pytest.raises(ValueError) as e:
+            build({"db": {"host": "db", "replicas": ["a", [1]]}, "debug": True}, Settings)
+        assert "db.replicas.1" in str(e.value)
+
+
+class TestConfigTyped:
+    def test_typed(self):
+        config = Config.from_yaml(content="db:\n  host: <% ENV[HOST, localhost] %>\ndebug: true")
+        assert config.typed().db.host == "localhost"
+        assert config.typed(Settings).db == Database(host="localhost")
+
+    def test_cached_per_schema(self):
+        config = Config({"db": {"host": "db"}, "debug": True})
+        assert config.typed() is config.typed()
+        assert config.typed(Settings) is config.typed(Settings)
+        assert config.typed() is not config.typed(Settings)
+
+    def test_lazy(self):
+        config = Config.from_yaml(content="a:\n  b: <% ENV[B, 1] %>", lazy=True)
+        assert config.typed().a.b == 1
+
+    def test_rebuilt_on_refresh(self, monkeypatch):
+        monkeypatch.setenv("PORT", "1")
+        config = Config.from_yaml(content="db:\n  host: db\n  port: <% ENV[PORT] %>\ndebug: true")
+        typed, settings = config.typed(), config.typed(Settings)
+
+        monkeypatch.setenv("PORT", "2")
+        config.refresh()
+        assert typed.db.port == 1
+        assert config.typed().db.port == 2
+        assert config.typed(Settings).db.port == 2
+        assert config.typed(Settings) is not settings
@@ -0,0 +1,160 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+from configly.config import Config
+from configly.interpolators import FileInterpolator
+from configly.layers import Layer
+from configly.loaders import YamlLoader
+from configly.watch import digest, Inotify, Watcher
+from tests.utils import wait_for, write
+
+
+@pytest.fixture(params=[True, False], ids=["inotify", "polling"])
+def watcher(request):
+    watcher = Watcher(interval=0.01, debounce=0.02, use_inotify=request.param)
+    yield watcher
+    watcher._watches.clear()
+
+
+def test_reload_on_change(tmp_path, watcher):
+    path = tmp_path / "config.yml"
+    write(path, "foo: 1")
+
+    config = Config.from_yaml(str(path))
+    config.watch(watcher)
+
+    write(path, "foo: 2")
+    assert wait_for(lambda: config.foo == 2)
+
+
+def test_reload_on_interpolated_file_change(tmp_path, monkeypatch, watcher):
+    monkeypatch.chdir(tmp_path)
+    FileInterpolator().cache.clear()
+
+    secret = tmp_path / "secret.txt"
+    write(secret, "one")
+
+    path = tmp_path / "config.yml"
+    write(path, "foo: <% FILE[secret.txt] %>")
+
+    config = Config.from_yaml(str(path))
+    config.watch(watcher)
+    assert config.foo == "one"
+
+    write(secret, "two")
+    assert wait_for(lambda: config.foo == "two")
+
+
+def test_unchanged_content_is_not_reparsed(tmp_path, watcher):
+    path = tmp_path / "config.yml"
+    write(path, "foo: 1")
+
+    loader = YamlLoader()
+    config = Config.from_loader(loader, str(path))
+    config.watch(watcher)
+
+    with patch.object(loader, "load", wraps=loader.load) as load:
+        write(path, "foo: 1")
+        time.sleep(0.2)
+        load.assert_not_called()
+
+        write(path, "foo: 3")
+        assert wait_for(lambda: config.foo == 3)
+        load.assert_called_once()
+
+
+def test_invalid_content_keeps_last_config(tmp_path, watcher):
+    path = tmp_path / "config.yml"
+    write(path, "foo: 1")
+
+    config = Config.from_yaml(str(path))
+    config.watch(watcher)
+
+    with patch("configly.watch.logger") as logger:
+        write(path, "foo: [")
+        assert wait_for(lambda: logger.exception.called)
+    assert config.foo == 1
+
+    write(path, "foo: 4")
+    assert wait_for(lambda: config.foo == 4)
+
+
+def test_unwatch_stops_thread(tmp_path, watcher):
+    path = tmp_path / "config.yml"
+    write(path, "foo: 1")
+
+    config = Config.from_yaml(str(path))
+    config.watch(watcher)
+    assert config in watcher
+
+    config.unwatch(watcher)
+    assert wait_for(lambda: watcher._thread is None)
+
+
+def test_reload_layers_on_change(tmp_path, monkeypatch, watcher):
+    monkeypatch.chdir(tmp_path)
+    FileInterpolator().cache.clear()
+
+    secret = tmp_path / "secret.txt"
+    write(secret, "one")
+    base = tmp_path / "base.yml"
+    write(base, "foo: 1\nbar: <% FILE[secret.txt] %>")
+    override = tmp_path / "override.yml"
+
+    config = Config.from_layers([str(base), Layer(str(override), optional=True)])
+    config.watch(watcher)
+    assert config.bar == "one"
+
+    write(override, "foo: 2")
+    assert wait_for(lambda: config.foo == 2)
+
+    write(secret, "two")
+    assert wait_for(lambda: config.bar == "two")
+
+
+def test_attached_picks_up_published(tmp_path, watcher):
+    path = str(tmp_path / "config.snapshot")
+    config = Config({"foo": 1})
+    config.publish(path)
+
+    attached = Config.attach(path)
+    attached.watch(watcher)
+
+    config._value["foo"] = 2
+    config.refresh()
+    assert wait_for(lambda: attached.foo == 2)
+
+
+def test_watch_requires_file():
+    with pytest.raises(ValueError):
+        Config.from_yaml(content="foo: 1", watch=True)
+
+
+def test_inotify_wait(tmp_path):
+    inotify = Inotify.create()
+    if inotify is None:
+        pytest.skip("inotify is unavailable")
+
+    try:
+        inotify.add(str(tmp_path))
+        (tmp_path / "file").write_text("")
+
+        start = time.monotonic()
+        inotify.wait(5)
+        assert time.monotonic() - start < 5
+    finally:
+        inotify.close()
+
+
+def test_digest_in_chunks(tmp_path):
+    path = tmp_path / "config.yml"
+    path.write_text("a: 1\nb: 2")
+
+    with patch("configly.watch.DIGEST_CHUNK_SIZE", 3):
+        chunked = digest([str(path)])
+    assert chunked == digest([str(path)])
+
+    path.write_text("a: 1\nb: 3")
+    assert digest([str(path)]) != chunked
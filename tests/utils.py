@@ -0,0 +1,41 @@
+import os
+import time
+
+from configly.loaders import JsonLoader
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def write(path, content):
+    # Ensure the modification is observable through the file's mtime.
+    stat = os.stat(path) if os.path.exists(path) else None
+    path.write_bytes(content.encode("utf-8") if isinstance(content, str) else content)
+    if stat is not None:
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    return str(path)
+
+
+class CountingJsonLoader(JsonLoader):
+    def __init__(self):
+        super().__init__()
+        # The content of every parse, and every coerced value.
+        self.calls = []
+        self.values = []
+
+    def load(self, file):
+        return self.loads(file.read())
+
+    def loads(self, value):
+        self.calls.append(value)
+        return super().loads(value)
+
+    def load_value(self, value):
+        self.values.append(value)
+        return super().load_value(value)